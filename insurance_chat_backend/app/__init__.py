@@ -1,7 +1,9 @@
 import json
 import logging
 import psycopg2
+from psycopg2 import pool
 from . import config
+from .utils.db_pool import PostgresConnectionPool
 from flask_cors import CORS
 from flask import Flask, make_response, g
 
@@ -12,19 +14,30 @@ def insurance_chat_api_app():
     app.logger.setLevel(logging.INFO)
 
     CORS(app)
+
+    # uwsgi lazy-apps 설정으로 워커 프로세스마다 앱(과 커넥션 풀)이 따로 생성된다.
+    db_pool = PostgresConnectionPool(
+        minconn=app.config.get('POSTGRES_POOL_MIN_SIZE', 1),
+        maxconn=app.config.get('POSTGRES_POOL_MAX_SIZE', 10),
+        timeout=app.config.get('POSTGRES_POOL_TIMEOUT', 5.0),
+        health_check_interval=app.config.get('POSTGRES_POOL_HEALTH_CHECK_INTERVAL', 30.0),
+        host=app.config['POSTGRES_HOST'],
+        database=app.config['POSTGRES_DB'],
+        user=app.config['POSTGRES_USER'],
+        password=app.config['POSTGRES_PASSWORD'],
+    )
+    app.extensions['db_pool'] = db_pool
     
     def get_db():
         if 'db' not in g:
             try:
-                g.db = psycopg2.connect(
-                    host=app.config['POSTGRES_HOST'],
-                    database=app.config['POSTGRES_DB'],
-                    user=app.config['POSTGRES_USER'], 
-                    password=app.config['POSTGRES_PASSWORD'], 
-                )
-            except psycopg2.Error as e:
+                g.db, wait_time = db_pool.getconn()
+            except (psycopg2.Error, pool.PoolError) as e:
                 app.logger.error("Database connection error: %s", e)
                 raise
+            g.db_pool_wait = wait_time
+            if wait_time > app.config.get('POSTGRES_POOL_WAIT_WARNING', 0.1):
+                app.logger.warning("DB pool wait %.3fs (%s)", wait_time, db_pool.stats())
         return g.db
 
     @app.before_request
@@ -35,7 +48,7 @@ def insurance_chat_api_app():
     def teardown_request(exception):
         db = g.pop('db', None)
         if db is not None:
-            db.close()
+            db_pool.putconn(db)
 
     @app.errorhandler(500)
     def internal_server_error(error):
@@ -51,4 +64,10 @@ def insurance_chat_api_app():
         from .controllers.controllers import bp_controllers
         app.register_blueprint(bp_controllers)
 
+        from .const.constant import RERANK_BACKEND
+        if RERANK_BACKEND == "local":
+            # 첫 요청에서 모델 로딩 / 첫 추론 지연이 생기지 않도록 워커 시작 시 미리 실행한다.
+            from .utils.utils import local_reranker
+            app.logger.info("Reranker warmup %.2fs", local_reranker.warmup())
+
     return app
\ No newline at end of file
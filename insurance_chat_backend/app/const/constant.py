@@ -1,3 +1,32 @@
 API_KEYS = [
     "c6U9OFMWO7qOywgiXRKTdYaOvaabv3sSGyoB9BcjBJ1Srh8PYtavp36xfWY40BlYF4dW8nxE8atjxF4hKasBsOWhtxIMKYqR9nyDdVejsxoRv4RmlGaLMIORnDgfYuH4",
-]
\ No newline at end of file
+]
+
+
+# 벡터 검색 방식 (인덱스 생성: scripts/create_vector_index.py)
+# full: vector(3072) 전체를 비교 (HNSW는 vector 2000차원까지만 지원하므로 순차 탐색)
+# binary: binary_quantize(embedding) hamming 거리로 후보를 찾고 원본 벡터로 재정렬
+# halfvec: halfvec(float16) 코사인 거리로 후보를 찾고 원본 벡터로 재정렬
+VECTOR_SEARCH_MODE = "halfvec"
+# 후보 검색에 사용할 차원 수 (768이면 Matryoshka 방식으로 앞 768차원만 사용)
+VECTOR_SEARCH_DIMS = 3072
+# 원본 벡터로 재정렬할 후보 수
+VECTOR_RESCORE_CANDIDATES = 100
+# HNSW 검색 시 탐색 후보 수 (클수록 재현율이 높고 느리다, 재정렬 후보 수보다 작으면 후보 수로 맞춘다)
+VECTOR_EF_SEARCH = 100
+
+# 검색 단계 병렬 처리 (벡터 검색 / 키워드 검색 브랜치)
+RETRIEVAL_MAX_WORKERS = 8
+# 브랜치별 제한 시간(초), 초과하면 해당 브랜치 결과 없이 진행한다.
+VECTOR_BRANCH_TIMEOUT = 10
+KEYWORD_BRANCH_TIMEOUT = 10
+
+# 리랭크 방식 (cohere: Cohere rerank-v3.5 API, local: 로컬 cross-encoder, utils/reranker.py 참고)
+RERANK_BACKEND = "cohere"
+RERANK_MODEL = "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1"
+# torch 또는 onnx (int8 양자화 모델은 RERANK_ONNX_FILE에 onnx/model_qint8_avx512_vnni.onnx 등을 지정)
+RERANK_MODEL_BACKEND = "torch"
+RERANK_ONNX_FILE = None
+# 조문은 대부분 512 토큰보다 길어서 앞부분만으로 점수를 매긴다.
+RERANK_MAX_LENGTH = 512
+RERANK_BATCH_SIZE = 16
@@ -1,14 +1,88 @@
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor, Future, TimeoutError as FutureTimeoutError
 
+import psycopg2
 from flask import Blueprint, current_app, request, make_response, Response, g, stream_with_context
 
-from ..utils.utils import get_cosine_result, get_es_result, get_rerank_result, get_chat_result, get_keyword_in_query
+from ..utils.utils import get_embedding, get_cosine_result, get_es_result, get_rerank_result, get_chat_result, get_keyword_in_query
 
-from ..const.constant import API_KEYS
+from ..const.constant import API_KEYS, RETRIEVAL_MAX_WORKERS, VECTOR_BRANCH_TIMEOUT, KEYWORD_BRANCH_TIMEOUT
 
 
 bp_controllers = Blueprint('main', __name__)
 
+# 벡터 검색(임베딩 + pgvector)과 키워드 검색(키워드 추출 + ES)을 동시에 실행하는 스레드 풀
+retrieval_executor = ThreadPoolExecutor(max_workers=RETRIEVAL_MAX_WORKERS, thread_name_prefix="retrieval")
+
+
+def get_vector_documents(connection: psycopg2.extensions.connection, query: str, embedding: list[float], timeout: float) -> list[dict]:
+    """
+    요청 스레드에서 pgvector 검색 (요청 커넥션은 다른 스레드와 공유하지 않는다)
+    남은 제한 시간은 statement_timeout으로 걸어서 느린 쿼리는 DB에서 취소한다.
+    """
+    if timeout <= 0:
+        current_app.logger.warning('[Chat API] vector branch timed out')
+        return []
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL statement_timeout = %s", (max(1, int(timeout * 1000)),))
+            return get_cosine_result(cursor, query, embedding=embedding)
+    except psycopg2.Error as e:
+        current_app.logger.error('[Chat API] vector branch failed: %s', e)
+        connection.rollback()
+        return []
+
+
+def get_keyword_documents(query: str) -> tuple[str, list[dict]]:
+    keywords = " ".join(get_keyword_in_query(query))
+    return keywords, get_es_result(keywords)
+
+
+def get_branch_result(future: Future, timeout: float, name: str, default):
+    """브랜치 결과를 기다리고, 제한 시간 초과나 오류가 나면 default를 반환"""
+    try:
+        return future.result(timeout=max(0.0, timeout))
+    except FutureTimeoutError:
+        current_app.logger.warning('[Chat API] %s branch timed out', name)
+    except Exception as e:
+        current_app.logger.error('[Chat API] %s branch failed: %s', name, e)
+    return default
+
+
+def get_related_documents(query: str) -> list[str]:
+    """벡터 검색과 키워드 검색을 동시에 실행하고 제한 시간 안에 끝난 결과만 모은다."""
+    start = time.perf_counter()
+    # 브랜치 스레드에는 DB 커넥션을 넘기지 않는다. (제한 시간을 넘긴 스레드가 반납된 커넥션을 쓰지 않도록)
+    embedding_future = retrieval_executor.submit(get_embedding, query)
+    keyword_future = retrieval_executor.submit(get_keyword_documents, query)
+
+    embedding = get_branch_result(embedding_future, VECTOR_BRANCH_TIMEOUT, "embedding", None)
+    cosine_documents = []
+    if embedding is not None:
+        cosine_documents = get_vector_documents(g.db, query, embedding, VECTOR_BRANCH_TIMEOUT - (time.perf_counter() - start))
+    vector_time = time.perf_counter() - start
+
+    keywords, es_documents = get_branch_result(
+        keyword_future, KEYWORD_BRANCH_TIMEOUT - (time.perf_counter() - start), "keyword", ("", [])
+    )
+    # 아직 시작하지 않은 브랜치는 취소해서 워커를 비운다. (실행 중인 호출은 중단할 수 없어 끝나면 버린다)
+    embedding_future.cancel()
+    keyword_future.cancel()
+    current_app.logger.info('[Chat API] Query: %s', query)
+    current_app.logger.info('[Chat API] Keywords: %s', keywords)
+    current_app.logger.info(
+        '[Chat API] Retrieval vector=%d docs (%.2fs) keyword=%d docs, total %.2fs',
+        len(cosine_documents), vector_time, len(es_documents), time.perf_counter() - start
+    )
+
+    documents = []
+    for cosine_document in cosine_documents:
+        documents.append(json.dumps(cosine_document, ensure_ascii=False))
+    for es_document in es_documents:
+        documents.append(json.dumps(es_document, ensure_ascii=False))
+    return documents
+
 
 def get_chat_event_stream(query: str):
     stream_id = 0
@@ -17,25 +91,13 @@ def get_chat_event_stream(query: str):
         stream_id += 1
         return stream_id
     
-    documents = []
-    cosine_documents = get_cosine_result(g.db.cursor(), query)
-    for cosine_document in cosine_documents:
-        documents.append(json.dumps(cosine_document, ensure_ascii=False))
-
-    keywords = get_keyword_in_query(query)
-    keywords = " ".join(keywords)
-
-    current_app.logger.info('[Chat API] Query: %s', query)
-    current_app.logger.info('[Chat API] Keywords: %s', keywords)
-    
-    es_documents = get_es_result(keywords)
-    for es_document in es_documents:
-        documents.append(json.dumps(es_document, ensure_ascii=False))
+    documents = get_related_documents(query)
     # st1 = json.dumps({"type": "processing", "code": "1", "message": "FETCH RELATED DOCUMENTS"})
     # yield f"id: {get_stream_id()}\n"
     # yield f"data: {st1}\n\n"
 
-    rerank_result = get_rerank_result(query, documents)
+    # 한 브랜치가 실패하면 문서가 3개보다 적을 수 있다.
+    rerank_result = get_rerank_result(query, documents, top_n=min(3, len(documents))) if documents else []
 
     # st2 = json.dumps({"type": "processing", "code": "2", "message": "RE-RANKING"})
     # yield f"id: {get_stream_id()}\n"
@@ -73,3 +135,9 @@ def chat_response():
     response.headers["Cache-Control"] = "no-cache"
     return response
 
+
+
+# DB 커넥션 풀 상태 (대기 시간 등)
+@bp_controllers.route("/db-pool/stats", methods=['GET'])
+def db_pool_stats():
+    return make_response(json.dumps(current_app.extensions['db_pool'].stats()), 200)
@@ -0,0 +1,114 @@
+import time
+import logging
+import threading
+import psycopg2
+from psycopg2 import pool
+
+
+logger = logging.getLogger(__name__)
+
+
+class PostgresConnectionPool:
+    """
+    ThreadedConnectionPool 래퍼
+    - 커넥션이 모두 사용 중이면 PoolError 대신 timeout까지 기다린다.
+    - 오래 쉬었던 커넥션은 SELECT 1로 상태를 확인하고, 끊어졌으면 새 커넥션으로 바꾼다.
+    - 커넥션을 얻기까지 기다린 시간을 집계한다.
+    """
+
+    def __init__(self, minconn: int, maxconn: int, timeout: float = 5.0, health_check_interval: float = 30.0, **connect_kwargs):
+        self._pool = pool.ThreadedConnectionPool(minconn, maxconn, **connect_kwargs)
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._lock = threading.Lock()
+        self._last_used = {}
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.in_use = 0
+        self.wait_count = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.timeouts = 0
+        self.reconnects = 0
+
+    def getconn(self) -> tuple[psycopg2.extensions.connection, float]:
+        """
+        커넥션을 빌린다.
+
+        Returns:
+            (커넥션, 대기 시간(초))
+        """
+        start = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self.timeouts += 1
+            raise pool.PoolError(f"{self.timeout}초 안에 사용 가능한 DB 커넥션이 없습니다.")
+        wait_time = time.perf_counter() - start
+
+        try:
+            connection = self._get_healthy_connection()
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self.in_use += 1
+            self.wait_count += 1
+            self.wait_time_total += wait_time
+            self.wait_time_max = max(self.wait_time_max, wait_time)
+        return connection, wait_time
+
+    def _get_healthy_connection(self) -> psycopg2.extensions.connection:
+        # DB 재시작 등으로 풀에 남은 커넥션이 모두 끊어졌을 수 있으므로, 새로 받은 커넥션도 확인하며 풀 크기만큼 다시 시도한다.
+        for _ in range(self.maxconn + 1):
+            connection = self._pool.getconn()
+            idle_time = time.monotonic() - self._last_used.get(id(connection), 0.0)
+            if not connection.closed and idle_time < self.health_check_interval:
+                return connection
+            try:
+                if connection.closed:
+                    raise psycopg2.InterfaceError("connection already closed")
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                connection.rollback()
+                return connection
+            except psycopg2.Error as e:
+                logger.warning("DB 커넥션 상태 확인 실패, 다시 연결합니다: %s", e)
+                error = e
+                self._pool.putconn(connection, close=True)
+                self._last_used.pop(id(connection), None)
+                with self._lock:
+                    self.reconnects += 1
+        raise error
+
+    def putconn(self, connection: psycopg2.extensions.connection):
+        """커넥션을 반납한다. (진행 중인 트랜잭션은 롤백)"""
+        close = bool(connection.closed)
+        if not close:
+            try:
+                # SET LOCAL 등 요청 중 설정이 다음 요청에 남지 않도록 트랜잭션을 정리한다.
+                connection.rollback()
+            except psycopg2.Error:
+                close = True
+        self._last_used[id(connection)] = time.monotonic()
+        self._pool.putconn(connection, close=close)
+        if close:
+            self._last_used.pop(id(connection), None)
+        with self._lock:
+            self.in_use -= 1
+        self._slots.release()
+
+    def closeall(self):
+        self._pool.closeall()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_size": self.maxconn,
+                "in_use": self.in_use,
+                "wait_count": self.wait_count,
+                "wait_time_avg_ms": self.wait_time_total / self.wait_count * 1000 if self.wait_count else 0.0,
+                "wait_time_max_ms": self.wait_time_max * 1000,
+                "timeouts": self.timeouts,
+                "reconnects": self.reconnects,
+            }
@@ -0,0 +1,80 @@
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from google import genai
+
+
+class EmbeddingService:
+    """
+    Gemini 임베딩 공용 서비스
+    - 프로세스 단위 LRU 캐시로 같은 질문은 다시 임베딩하지 않는다.
+    - 같은 질문을 동시에 요청하면 진행 중인 한 번의 API 호출 결과를 함께 기다린다.
+    """
+
+    def __init__(self, client: genai.Client, model: str = "gemini-embedding-exp-03-07", max_size: int = 1000):
+        self.client = client
+        self.model = model
+        self.max_size = max_size
+        self._cache: OrderedDict[str, list[float]] = OrderedDict()
+        self._inflight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def _key(self, content: str, model: str) -> str:
+        return model + ":" + re.sub(r"\s+", " ", content).strip()
+
+    def get_embedding(self, content: str, model: str = None) -> list[float]:
+        """
+        벡터 생성 (캐시 또는 진행 중인 호출이 있으면 재사용)
+        """
+        model = model or self.model
+        key = self._key(content, model)
+        with self._lock:
+            embedding = self._cache.get(key)
+            if embedding is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return embedding
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            result = self.client.models.embed_content(model=model, contents=content)
+            embedding = result.embeddings[0].values
+        except Exception as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._cache[key] = embedding
+            if len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+            self._inflight.pop(key, None)
+        future.set_result(embedding)
+        return embedding
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._cache),
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
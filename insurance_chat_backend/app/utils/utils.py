@@ -6,12 +6,29 @@ from openai import OpenAI
 from google import genai
 import psycopg2
 
+from .embedding_service import EmbeddingService
+from .reranker import Reranker
+from .vector_search import build_vector_search_sql
+from ..const.constant import VECTOR_SEARCH_MODE, VECTOR_SEARCH_DIMS, VECTOR_RESCORE_CANDIDATES, VECTOR_EF_SEARCH
+from ..const.constant import RERANK_BACKEND, RERANK_MODEL, RERANK_MODEL_BACKEND, RERANK_ONNX_FILE, RERANK_MAX_LENGTH, RERANK_BATCH_SIZE
 from ..config import GEMINI_API_KEY, OPENAI_API_KEY, COHERE_API_KEY, ES_HOST, ES_PORT, ES_USERNAME, ES_PASSWORD, ES_CA_CERT
 
 genai_client = genai.Client(api_key=GEMINI_API_KEY)
 
+# 같은 질문의 임베딩은 프로세스 안에서 한 번만 생성한다.
+embedding_service = EmbeddingService(genai_client)
+
 cohere_client = cohere.ClientV2(api_key=COHERE_API_KEY)
 
+# 모델은 처음 사용할 때 로드한다. (앱 생성 시 warmup)
+local_reranker = Reranker(
+    model_name=RERANK_MODEL,
+    backend=RERANK_MODEL_BACKEND,
+    onnx_file=RERANK_ONNX_FILE,
+    max_length=RERANK_MAX_LENGTH,
+    batch_size=RERANK_BATCH_SIZE,
+)
+
 openai_client = OpenAI(api_key=OPENAI_API_KEY)
 
 elasticsearch_client = Elasticsearch(
@@ -25,23 +42,38 @@ elasticsearch_client = Elasticsearch(
     )
 
 
+# 문서 변환에 필요한 필드만 가져온다. (embedding 벡터는 응답에서 제외)
+ARTICLE_SOURCE_FIELDS = [
+    "company_name",
+    "category",
+    "insurance_name",
+    "insurance_type",
+    "sales_date",
+    "index_title",
+    "file_path",
+    "chapter_title",
+    "article_title",
+    "article_content",
+    "page_number",
+]
+
+
 def get_embedding(content: str, model: str = "gemini-embedding-exp-03-07") -> list[float]:
     """
-    벡터 생성
+    벡터 생성 (캐시 / 동시 요청 병합은 EmbeddingService 참고)
     """
-    result = genai_client.models.embed_content(
-        model=model,
-        contents=content,
-    )
-    return result.embeddings[0].values
+    return embedding_service.get_embedding(content, model)
 
 
-def get_cosine_result(cursor: psycopg2.extensions.cursor, query: str, top_n: int = 5) -> list[str]:
+def get_cosine_result(cursor: psycopg2.extensions.cursor, query: str, top_n: int = 5, embedding: list[float] = None) -> list[str]:
     """
-    코사인 결과 반환
+    코사인 결과 반환 (이미 계산한 질문 벡터가 있으면 embedding으로 전달)
     """
-    embedding = get_embedding(query)
-    cursor.execute("SELECT company_name, category, insurance_name, insurance_type, sales_date, index_title, file_path, chapter_title, article_title, article_content, page_number FROM embedding_article ORDER BY embedding <-> %s::vector LIMIT %s", (embedding, top_n))
+    if embedding is None:
+        embedding = get_embedding(query)
+    # HNSW 인덱스는 ef_search개까지만 후보를 반환하므로 재정렬 후보 수 이상으로 설정한다. (현재 트랜잭션에만 적용)
+    cursor.execute("SET LOCAL hnsw.ef_search = %s", (max(VECTOR_EF_SEARCH, VECTOR_RESCORE_CANDIDATES),))
+    cursor.execute(build_vector_search_sql(VECTOR_SEARCH_MODE, VECTOR_SEARCH_DIMS), {"embedding": embedding, "candidates": VECTOR_RESCORE_CANDIDATES, "top_n": top_n})
     return [{
         "보험회사명": company_name, 
         "보험분류": category, 
@@ -84,8 +116,16 @@ def get_es_result(keyword: str, top_n: int = 5) -> list[str]:
         }
     }
     
-    result = elasticsearch_client.search(index="insurance_article", query=query, size=top_n)
-    sources = [hits["_source"] for hits in result["hits"]["hits"][:top_n]]
+    result = elasticsearch_client.search(
+        index="insurance_article",
+        query=query,
+        size=top_n,
+        source_includes=ARTICLE_SOURCE_FIELDS,
+        source_excludes=["embedding"],
+        filter_path=["hits.hits._source"],
+    )
+    # filter_path로 줄인 응답은 결과가 없으면 hits 키가 없다.
+    sources = [hits["_source"] for hits in result.get("hits", {}).get("hits", [])[:top_n]]
 
     documents = []
     for source in sources:
@@ -108,8 +148,10 @@ def get_es_result(keyword: str, top_n: int = 5) -> list[str]:
 
 def get_rerank_result(query: str, documents: list[str], top_n: int = 3) -> list[str]:
     """
-    리랭크 결과 반환
+    리랭크 결과 반환 (RERANK_BACKEND가 local이면 로컬 cross-encoder 사용)
     """
+    if RERANK_BACKEND == "local":
+        return local_reranker.rerank(query, documents, top_k=top_n)
     result = cohere_client.rerank(
         model="rerank-v3.5",
         query=query,
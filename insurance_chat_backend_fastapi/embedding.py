@@ -1,26 +1,89 @@
 import os
+import asyncio
+import threading
 from google import genai
 from dotenv import load_dotenv
+from gh.cache import LRUTTLCache, normalize_query
 
 """
 	pip install google-genai
 """
 class GoogleEmbeddingProcessor:
     MODEL_NAME = "gemini-embedding-exp-03-07"
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+        return cls._instance
     
     def __init__(self):
-        load_dotenv()
-        api_key = os.getenv("gemini.api.key")
-        if not api_key:
-            raise ValueError("gemini.api.key 환경 변수가 설정되지 않았습니다.")
-        client = genai.Client(api_key=api_key)
-        self.client = client
+        if not hasattr(self, 'initialized'):
+            self.initialized = True
+            load_dotenv()
+            api_key = os.getenv("gemini.api.key")
+            if not api_key:
+                raise ValueError("gemini.api.key 환경 변수가 설정되지 않았습니다.")
+            # 하나의 Client를 공유해야 내부 HTTP 커넥션 풀이 재사용된다.
+            client = genai.Client(api_key=api_key)
+            self.client = client
+            # EMBEDDING_CACHE_PATH를 지정하면 자주 묻는 질문의 임베딩이 재시작 후에도 유지된다.
+            self.cache = LRUTTLCache(
+                max_size=int(os.getenv("EMBEDDING_CACHE_SIZE", "1000")),
+                ttl=int(os.getenv("EMBEDDING_CACHE_TTL", "3600")),
+                disk_path=os.getenv("EMBEDDING_CACHE_PATH") or None,
+            )
+            # 같은 질문에 대한 동시 요청은 하나의 API 호출을 함께 기다린다.
+            self._inflight = {}
+
+    def _cache_key(self, content: str) -> str:
+        return f"{self.MODEL_NAME}:{normalize_query(content)}"
 
     async def get_embedding(self, content: str) -> list[float]:
         """
         벡터 테이블 생성 쿼리
         """
-        return self.client.models.embed_content(
+        key = self._cache_key(content)
+        cached = await self.cache.aget(key)
+        if cached is not None:
+            return cached
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._embed(key, content))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(future)
+
+    async def get_embeddings(self, contents: list[str]) -> list[list[float]]:
+        """
+        여러 텍스트를 한 번의 embed_content 호출로 임베딩합니다.
+        캐시에 있는 텍스트는 제외하고 나머지만 요청합니다.
+        """
+        keys = [self._cache_key(content) for content in contents]
+        embeddings = list(await asyncio.gather(*(self.cache.aget(key) for key in keys)))
+        missing = {}
+        for idx, (key, embedding) in enumerate(zip(keys, embeddings)):
+            if embedding is None:
+                missing.setdefault(key, []).append(idx)
+        if missing:
+            response = await self.client.aio.models.embed_content(
+                model=self.MODEL_NAME,
+                contents=[contents[indexes[0]] for indexes in missing.values()],
+            )
+            for (key, indexes), result in zip(missing.items(), response.embeddings):
+                await self.cache.aset(key, result.values)
+                for idx in indexes:
+                    embeddings[idx] = result.values
+        return embeddings
+
+    async def _embed(self, key: str, content: str) -> list[float]:
+        response = await self.client.aio.models.embed_content(
             model=self.MODEL_NAME,
             contents=content,
-        ).embeddings[0].values
+        )
+        embedding = response.embeddings[0].values
+        await self.cache.aset(key, embedding)
+        return embedding
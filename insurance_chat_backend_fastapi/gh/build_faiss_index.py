@@ -0,0 +1,115 @@
+"""
+Elasticsearch에 색인된 임베딩으로 FAISS 인덱스를 생성합니다.
+
+    python -m gh.build_faiss_index --output data/faiss/insurance.index                 # HNSW
+    python -m gh.build_faiss_index --output data/faiss/insurance.index --type ivfpq    # IVF-PQ
+    python -m gh.build_faiss_index --output data/faiss/insurance-768.index --type hnsw_sq8 --dims 768  # int8 + Matryoshka 768
+
+인덱스 파일과 함께 같은 순서의 문서 _id 목록(<output>.ids.txt)을 저장합니다.
+FaissVectorRetriever는 _id만 반환하고, 본문 필드는 SearchProcessor가 상위 결과에 대해서만 mget으로 조회합니다.
+"""
+import os
+import time
+import asyncio
+import argparse
+import numpy as np
+from typing import IO
+from elasticsearch import AsyncElasticsearch
+from elasticsearch.helpers import async_scan
+
+from .retriever import FAISS_IDS_SUFFIX
+from .quantization import truncate_embeddings
+
+
+async def load_embeddings(es_host: str, index_name: str, batch_size: int, ids_file: IO[str]) -> np.ndarray:
+    """
+    Elasticsearch 인덱스의 모든 문서 임베딩을 읽고, 문서 _id는 읽는 대로 ids_file에 한 줄씩 씁니다.
+    벡터는 문서 수만큼 미리 할당한 배열에 채워서 목록 + vstack으로 메모리가 두 배가 되지 않게 합니다.
+    """
+    es = AsyncElasticsearch(es_host, request_timeout=120)
+    vectors = None
+    count = 0
+    try:
+        total = (await es.count(index=index_name))["count"]
+        async for hit in async_scan(
+            es,
+            index=index_name,
+            query={"query": {"match_all": {}}, "_source": ["embedding"]},
+            size=batch_size,
+        ):
+            embedding = hit["_source"].get("embedding")
+            if not embedding:
+                continue
+            if vectors is None:
+                vectors = np.empty((total, len(embedding)), dtype=np.float32)
+            elif count == len(vectors):
+                # 스캔 중에 추가된 문서가 있으면 배열을 늘린다.
+                vectors = np.resize(vectors, (count * 2, vectors.shape[1]))
+            vectors[count] = embedding
+            count += 1
+            ids_file.write(hit["_id"] + "\n")
+    finally:
+        await es.close()
+    if vectors is None:
+        raise ValueError("임베딩이 있는 문서가 없습니다: {}".format(index_name))
+    return vectors[:count]
+
+
+def build_index(vectors: np.ndarray, index_type: str, m: int, ef_construction: int, nlist: int, pq_m: int, dimensions: int = 0):
+    import faiss
+
+    vectors = np.ascontiguousarray(truncate_embeddings(vectors, dimensions), dtype=np.float32)
+    dimension = vectors.shape[1]
+    faiss.normalize_L2(vectors)
+    if index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dimension, m, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = ef_construction
+    elif index_type == "hnsw_sq8":
+        # 벡터를 차원당 1바이트(int8)로 저장하는 HNSW
+        index = faiss.IndexHNSWSQ(dimension, faiss.ScalarQuantizer.QT_8bit, m, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = ef_construction
+        index.train(vectors)
+    elif index_type == "ivfpq":
+        # 문서 수보다 클러스터가 많으면 학습할 수 없으므로 줄인다.
+        nlist = min(nlist, max(1, len(vectors) // 39))
+        index = faiss.index_factory(dimension, "IVF{},PQ{}".format(nlist, pq_m), faiss.METRIC_INNER_PRODUCT)
+        index.train(vectors)
+    else:
+        raise ValueError("지원하지 않는 인덱스 타입입니다: {}".format(index_type))
+    index.add(vectors)
+    return index
+
+
+def main(args):
+    import faiss
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    # 인덱스 저장이 끝난 뒤에 _id 파일을 바꿔서 기존 인덱스와 순서가 어긋나지 않게 한다.
+    ids_path = args.output + FAISS_IDS_SUFFIX
+    start = time.time()
+    with open(ids_path + ".tmp", "w", encoding="utf-8") as f:
+        vectors = asyncio.run(load_embeddings(args.es_host, args.index, args.batch_size, f))
+    print(f"Loaded {len(vectors)} embeddings (dim={vectors.shape[1]}) in {time.time() - start:.1f}s")
+
+    start = time.time()
+    index = build_index(vectors, args.type, args.m, args.ef_construction, args.nlist, args.pq_m, args.dims)
+    print(f"Built {args.type} index in {time.time() - start:.1f}s")
+
+    faiss.write_index(index, args.output)
+    os.replace(ids_path + ".tmp", ids_path)
+    print(f"Saved {args.output} ({os.path.getsize(args.output) / 1024 / 1024:.1f}MB)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--es-host", default=os.getenv("ES_HOST", "http://localhost:9200"))
+    parser.add_argument("--index", default="insurance-data1")
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--type", choices=["hnsw", "hnsw_sq8", "ivfpq"], default="hnsw")
+    parser.add_argument("--dims", type=int, default=0, help="Matryoshka 방식으로 줄일 차원 수 (0이면 전체)")
+    parser.add_argument("--m", type=int, default=32, help="HNSW 노드당 연결 수")
+    parser.add_argument("--ef-construction", type=int, default=200)
+    parser.add_argument("--nlist", type=int, default=1024, help="IVF 클러스터 수")
+    parser.add_argument("--pq-m", type=int, default=96, help="PQ 서브벡터 수 (차원의 약수)")
+    parser.add_argument("--batch-size", type=int, default=500)
+    main(parser.parse_args())
@@ -0,0 +1,189 @@
+import os
+import re
+import asyncio
+import json
+import time
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = re.compile(r"[\s?!.。？！~]+$")
+
+
+def normalize_query(text: str) -> str:
+    """
+    캐시 키로 사용할 수 있도록 질문을 정규화합니다.
+    유니코드 정규화(NFKC), 소문자 변환, 연속 공백 제거, 끝 문장부호 제거를 수행합니다.
+
+    Args:
+        text: 원본 질문
+
+    Returns:
+        정규화된 질문
+    """
+    text = unicodedata.normalize("NFKC", text).lower()
+    text = _WHITESPACE.sub(" ", text).strip()
+    return _TRAILING_PUNCTUATION.sub("", text)
+
+
+class DiskCache:
+    """
+    재시작 후에도 유지되는 SQLite 기반 2차 캐시
+    값은 JSON으로 직렬화하여 저장합니다.
+    쓰기는 commit_every건마다 한 번씩 커밋하고, 읽기에서는 커밋하지 않습니다.
+    """
+
+    def __init__(self, path: str, ttl: int = 7 * 24 * 3600, commit_every: int = 32):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.ttl = ttl
+        self.commit_every = commit_every
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute("SELECT value, created_at FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        value, created_at = row
+        # 만료된 행은 지우지 않고 미스로 처리한다. 다음 set에서 덮어쓴다.
+        if time.time() - created_at > self.ttl:
+            return None
+        return json.loads(value)
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, created_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time())
+            )
+            self._pending += 1
+            if self._pending >= self.commit_every:
+                self._conn.commit()
+                self._pending = 0
+
+    def flush(self):
+        """커밋되지 않은 쓰기를 디스크에 반영합니다."""
+        with self._lock:
+            self._conn.commit()
+            self._pending = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+
+class LRUTTLCache:
+    """
+    최대 크기(LRU)와 유효 시간(TTL)을 함께 갖는 메모리 캐시
+    disk_path가 주어지면 메모리에서 빠진 항목을 디스크 캐시에서 다시 읽어옵니다.
+    """
+
+    def __init__(self, max_size: int = 1000, ttl: int = 3600, disk_path: Optional[str] = None, disk_ttl: int = 7 * 24 * 3600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.disk = DiskCache(disk_path, ttl=disk_ttl) if disk_path else None
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """캐시된 값을 반환합니다. 없거나 만료된 경우 None을 반환합니다."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+
+        if self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self._put(key, value)
+                with self._lock:
+                    self.hits += 1
+                    self.disk_hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, value: Any):
+        """값을 캐시에 저장합니다."""
+        self._put(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """
+        get의 비동기 버전
+        메모리 캐시는 바로 확인하고, 디스크 조회만 스레드에서 수행해 이벤트 루프를 막지 않습니다.
+        """
+        if self.disk is None or self._get_memory(key) is not None:
+            return self.get(key)
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value: Any):
+        """set의 비동기 버전. 디스크 쓰기는 스레드에서 수행합니다."""
+        self._put(key, value)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.set, key, value)
+
+    def _get_memory(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                return entry[0]
+        return None
+
+    def _put(self, key: str, value: Any):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """적중/미스 카운터를 반환합니다."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._data)
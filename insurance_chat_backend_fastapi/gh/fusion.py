@@ -0,0 +1,71 @@
+from dataclasses import replace
+from typing import List, Dict, Any, Optional
+
+# RRF의 순위 완화 상수 (Cormack et al. 2009에서 사용한 기본값)
+RRF_K = 60
+
+
+def reciprocal_rank_fusion(result_lists: List[List[Any]], k: int = RRF_K, limit: Optional[int] = None) -> List[Any]:
+    """
+    여러 검색 결과 리스트를 Reciprocal Rank Fusion으로 합칩니다.
+    각 결과는 순위 r에 대해 1 / (k + r) 점수를 받고, 같은 id의 점수는 더해집니다.
+
+    Args:
+        result_lists: 검색기별 SearchResult 리스트 (순위 순으로 정렬)
+        k: 순위 완화 상수
+        limit: 반환할 최대 결과 수
+
+    Returns:
+        RRF 점수를 score로 가진 SearchResult 리스트
+    """
+    scores: Dict[str, float] = {}
+    results: Dict[str, Any] = {}
+    for result_list in result_lists:
+        for rank, result in enumerate(result_list, start=1):
+            scores[result.id] = scores.get(result.id, 0.0) + 1.0 / (k + rank)
+            # 먼저 나온 검색기의 결과 객체를 유지한다. (BM25 결과에 본문 필드가 있다)
+            results.setdefault(result.id, result)
+
+    ranked = sorted(scores, key=scores.get, reverse=True)[:limit]
+    return [replace(results[doc_id], score=scores[doc_id]) for doc_id in ranked]
+
+
+def linear_fusion(result_lists: List[List[Any]], weights: Optional[List[float]] = None, limit: Optional[int] = None) -> List[Any]:
+    """
+    검색기별 점수를 min-max 정규화한 뒤 가중합으로 합칩니다.
+    BM25 점수와 코사인 유사도처럼 범위가 다른 점수를 같은 [0, 1] 범위로 맞춰 더합니다.
+
+    Args:
+        result_lists: 검색기별 SearchResult 리스트
+        weights: 검색기별 가중치 (기본값은 모두 같은 가중치)
+        limit: 반환할 최대 결과 수
+
+    Returns:
+        정규화 점수의 가중합을 score로 가진 SearchResult 리스트
+    """
+    if weights is None:
+        weights = [1.0 / len(result_lists)] * len(result_lists) if result_lists else []
+    scores: Dict[str, float] = {}
+    results: Dict[str, Any] = {}
+    for result_list, weight in zip(result_lists, weights):
+        if not result_list:
+            continue
+        raw_scores = [result.score for result in result_list]
+        low, high = min(raw_scores), max(raw_scores)
+        for result in result_list:
+            # 결과가 하나뿐이거나 점수가 모두 같으면 1로 본다.
+            normalized = (result.score - low) / (high - low) if high > low else 1.0
+            scores[result.id] = scores.get(result.id, 0.0) + weight * normalized
+            results.setdefault(result.id, result)
+
+    ranked = sorted(scores, key=scores.get, reverse=True)[:limit]
+    return [replace(results[doc_id], score=scores[doc_id]) for doc_id in ranked]
+
+
+def fuse(result_lists: List[List[Any]], method: str = "rrf", weights: Optional[List[float]] = None, limit: Optional[int] = None) -> List[Any]:
+    """method("rrf" 또는 "linear")에 맞는 방식으로 검색 결과를 합칩니다."""
+    if method == "rrf":
+        return reciprocal_rank_fusion(result_lists, limit=limit)
+    if method == "linear":
+        return linear_fusion(result_lists, weights=weights, limit=limit)
+    raise ValueError("지원하지 않는 fusion 방식입니다: {}".format(method))
@@ -1,13 +1,38 @@
 import os
-from openai import OpenAI
-from typing import List
+import httpx
+from openai import OpenAI, AsyncOpenAI
+from typing import List, AsyncIterator
 import time
 from dotenv import load_dotenv
 import tiktoken
 import logging
 import threading
+from .request_log import log_stage
 
 logger = logging.getLogger(__name__)
+
+_async_client = None
+_async_client_lock = threading.Lock()
+
+def get_async_openai_client(api_key: str) -> AsyncOpenAI:
+    """
+    프로세스 전체에서 공유하는 AsyncOpenAI 클라이언트를 반환합니다.
+    답변 생성과 키워드 추출이 같은 커넥션 풀을 사용하도록 한 번만 생성합니다.
+    """
+    global _async_client
+    if _async_client is None:
+        with _async_client_lock:
+            if _async_client is None:
+                limits = httpx.Limits(
+                    max_connections=int(os.getenv("OPENAI_MAX_CONNECTIONS", "100")),
+                    max_keepalive_connections=int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "20")),
+                )
+                _async_client = AsyncOpenAI(
+                    api_key=api_key,
+                    http_client=httpx.AsyncClient(limits=limits, timeout=httpx.Timeout(120.0, connect=5.0)),
+                )
+    return _async_client
+
 class OpenAIAnswerProcessor:
     _instance = None
     _lock = threading.Lock()
@@ -26,19 +51,37 @@ class OpenAIAnswerProcessor:
             api_key = os.getenv("openai.api.key")
             if not api_key:
                 raise ValueError("openai.api.key 환경 변수가 설정되지 않았습니다.")
-            client = OpenAI(api_key=api_key)
+            client = get_async_openai_client(api_key)
             print("Open AI is ready")
             self.client = client
             
-    def question(self, query: str) -> str:
-        response = self.client.chat.completions.create(
+    async def question(self, query: str) -> str:
+        response = await self.client.chat.completions.create(
             model="o4-mini",  # 사용할 OpenAI 모델
             messages=[
                 {"role": "user", "content": query}
             ],
         )
-        logger.info("[R] response: {}".format(response.choices[0].message.content))
-        return response.choices[0].message.content
+        answer = response.choices[0].message.content
+        log_stage(logger, "llm.answer", model=response.model, chars=len(answer or ""), usage=getattr(response.usage, "total_tokens", None))
+        log_stage(logger, "llm.answer.body", sampled=True, answer=answer)
+        return answer
+
+    async def question_stream(self, query: str) -> AsyncIterator[str]:
+        """답변 토큰을 생성되는 즉시 하나씩 반환합니다."""
+        stream = await self.client.chat.completions.create(
+            model="o4-mini",
+            messages=[
+                {"role": "user", "content": query}
+            ],
+            stream=True,
+        )
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            chunk_text = chunk.choices[0].delta.content
+            if chunk_text:
+                yield chunk_text
 
 
 class OpenAIEmbeddingProcessor:
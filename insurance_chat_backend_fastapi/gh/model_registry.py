@@ -0,0 +1,134 @@
+"""
+재정렬 / 인코더 모델 레지스트리
+
+모델은 처음 사용할 때 로드하고, 로드 시간과 로드 전후 RSS(resident memory) 증가량을 기록한다.
+로더는 "모듈:함수" 경로로도 등록할 수 있어서 모델을 쓰지 않는 프로세스는 ragatouille / torch 같은
+무거운 패키지를 import 하지 않는다.
+
+미리 로드 (워커별 startup):
+    MODEL_PRELOAD=crossencoder gunicorn main:app -k uvicorn.workers.UvicornWorker -w 4
+    각 워커의 startup 단계에서 로드한다. (JVM / asyncio 클라이언트는 fork 후 안전하지 않으므로 --preload는 쓰지 않는다)
+    꺼져 있는 모델(RERANKER_ENABLED=false 등)은 MODEL_PRELOAD에 있어도 로드하지 않는다.
+"""
+import os
+import sys
+import time
+import logging
+import resource
+import importlib
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+def current_rss_bytes() -> int:
+    """현재 프로세스의 RSS (/proc이 없으면 최대 RSS로 대신한다)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except (OSError, IndexError, ValueError):
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS는 바이트, 그 외는 KB 단위
+        return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+@dataclass
+class ModelEntry:
+    loader: Union[str, Callable[[], Any]]
+    enabled: bool = True
+    model: Any = None
+    loaded: bool = False
+    load_time: float = 0.0
+    rss_delta: int = 0
+
+
+class ModelRegistry:
+    """이름별로 모델을 한 번만 로드해서 공유하는 레지스트리"""
+
+    def __init__(self):
+        self._entries: Dict[str, ModelEntry] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+
+    def register(self, name: str, loader: Union[str, Callable[[], Any]], enabled: bool = True):
+        """
+        Args:
+            name: 모델 이름
+            loader: 모델을 반환하는 함수 또는 "모듈:함수" 경로
+            enabled: False이면 get / preload 해도 로드하지 않는다.
+        """
+        self._entries[name] = ModelEntry(loader, enabled)
+        self._locks[name] = threading.Lock()
+
+    def _resolve(self, loader: Union[str, Callable[[], Any]]) -> Callable[[], Any]:
+        if callable(loader):
+            return loader
+        module_name, function_name = loader.split(":")
+        return getattr(importlib.import_module(module_name), function_name)
+
+    def get(self, name: str) -> Any:
+        """모델을 반환 (처음 호출할 때 로드)"""
+        entry = self._entries.get(name)
+        if entry is None:
+            raise KeyError(f"등록되지 않은 모델입니다: {name}")
+        if not entry.enabled:
+            raise RuntimeError(f"사용하지 않도록 설정된 모델입니다: {name}")
+        if entry.loaded:
+            return entry.model
+        with self._locks[name]:
+            if not entry.loaded:
+                rss_before = current_rss_bytes()
+                start = time.perf_counter()
+                entry.model = self._resolve(entry.loader)()
+                entry.load_time = time.perf_counter() - start
+                entry.rss_delta = current_rss_bytes() - rss_before
+                entry.loaded = True
+                logger.info(
+                    "Loaded model %s in %.2fs (RSS +%.1fMB)", name, entry.load_time, entry.rss_delta / 1024 / 1024
+                )
+        return entry.model
+
+    def is_loaded(self, name: str) -> bool:
+        entry = self._entries.get(name)
+        return entry is not None and entry.loaded
+
+    def is_enabled(self, name: str) -> bool:
+        entry = self._entries.get(name)
+        return entry is not None and entry.enabled
+
+    def preload(self, names: Iterable[str]):
+        """워커 startup에서 미리 로드할 모델 (꺼져 있는 모델은 건너뛴다)"""
+        for name in names:
+            if name in self._entries and not self._entries[name].enabled:
+                logger.info("Skipping preload of disabled model %s", name)
+                continue
+            self.get(name)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rss_mb": current_rss_bytes() / 1024 / 1024,
+            "models": {
+                name: {
+                    "enabled": entry.enabled,
+                    "loaded": entry.loaded,
+                    "load_time_s": entry.load_time,
+                    "rss_delta_mb": entry.rss_delta / 1024 / 1024,
+                }
+                for name, entry in self._entries.items()
+            },
+        }
+
+
+def parse_model_names(value: Optional[str]) -> list:
+    """MODEL_PRELOAD 같은 쉼표 구분 목록"""
+    return [name.strip() for name in (value or "").split(",") if name.strip()]
+
+
+model_registry = ModelRegistry()
+model_registry.register("colbert", "gh.reranker_colbert:load_colbert_model")
+model_registry.register(
+    "crossencoder",
+    "gh.reranker_crossencoder:load_reranker_model",
+    enabled=os.getenv("RERANKER_ENABLED", "false").lower() == "true",
+)
@@ -1,9 +1,11 @@
 import os
+import json
+import asyncio
 from typing import List, Dict, Any
-from openai import OpenAI
 from dotenv import load_dotenv
 import threading
 from .keyword import KeywordExtractor
+from .model import get_async_openai_client
 
 class OpenAIKeywordExtractor(KeywordExtractor):
     """
@@ -33,7 +35,7 @@ class OpenAIKeywordExtractor(KeywordExtractor):
             if not api_key:
                 raise ValueError("openai.api.key 환경 변수가 설정되지 않았습니다.")
                 
-            self.client = OpenAI(api_key=api_key)
+            self.client = get_async_openai_client(api_key)
             self.model = model
             print(f"OpenAI Keyword Extractor initialized with model: {model}")
     
@@ -68,7 +70,7 @@ class OpenAIKeywordExtractor(KeywordExtractor):
         
         try:
             # OpenAI API 호출
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model=self.model,
                 messages=[
                     {"role": "user", "content": user_prompt}
@@ -86,6 +88,57 @@ class OpenAIKeywordExtractor(KeywordExtractor):
             print(f"OpenAI 키워드 추출 중 오류 발생: {e}")
             return []
     
+    async def extract_keywords_batch(self, texts: List[str], top_n: int = 5) -> List[List[str]]:
+        """
+        여러 텍스트의 키워드를 한 번의 API 호출로 추출합니다.
+        응답을 JSON으로 해석할 수 없으면 텍스트별 개별 호출로 대체합니다.
+        
+        Args:
+            texts: 분석할 자연어 텍스트 리스트
+            top_n: 텍스트별로 반환할 키워드의 수 (기본값: 5)
+            
+        Returns:
+            입력 순서와 같은 순서의 키워드 리스트
+        """
+        if not texts:
+            return []
+        if len(texts) == 1:
+            return [await self.extract_keywords(texts[0], top_n)]
+
+        numbered_texts = "\n".join(f"{i}. {text}" for i, text in enumerate(texts))
+        user_prompt = f"""
+        Temperature: 0.3
+        당신은 SEO 전문가입니다. 주어진 각 텍스트에서 웹 검색에 최적화된 키워드를 추출해주세요.
+        키워드는 검색량이 많고, 경쟁이 적으며, 사용자의 검색 의도와 일치해야 합니다.
+        각 텍스트마다 가장 적합한 {top_n}개의 SEO 키워드를 추출해주세요.
+        답변은 다른 설명 없이 JSON만 반환해주세요. 형식: {{"keywords": [["텍스트0 키워드1", "텍스트0 키워드2"], ["텍스트1 키워드1"]]}}
+        "keywords" 리스트의 길이는 텍스트 수({len(texts)})와 같아야 하고 순서도 같아야 합니다.
+        
+        텍스트:
+        {numbered_texts}
+        
+        키워드 (JSON):
+        """
+
+        try:
+            response = await self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "user", "content": user_prompt}
+                ],
+            )
+            result = response.choices[0].message.content.strip()
+            # 코드 블록으로 감싸서 응답하는 경우 제거
+            result = result.strip("`").removeprefix("json").strip()
+            keywords = json.loads(result)["keywords"]
+            if len(keywords) != len(texts):
+                raise ValueError(f"expected {len(texts)} keyword lists, got {len(keywords)}")
+            return [[str(k).strip() for k in group if str(k).strip()][:top_n] for group in keywords]
+
+        except Exception as e:
+            print(f"OpenAI 키워드 일괄 추출 중 오류 발생, 개별 추출로 대체합니다: {e}")
+            return list(await asyncio.gather(*(self.extract_keywords(text, top_n) for text in texts)))
+    
     def __call__(self, text: str, top_n: int = 5) -> List[str]:
         """
         클래스를 함수처럼 호출할 수 있도록 합니다.
@@ -0,0 +1,49 @@
+from typing import List, Tuple
+import numpy as np
+
+# Gemini 임베딩 전체 차원 수
+FULL_DIMENSIONS = 3072
+
+
+def truncate_embedding(embedding: List[float], dimensions: int) -> List[float]:
+    """
+    Matryoshka 방식으로 앞쪽 dimensions 차원만 남기고 다시 정규화합니다.
+    (Gemini 임베딩은 앞부분 차원만으로도 의미를 유지하도록 학습되어 있다)
+    """
+    if not dimensions or dimensions >= len(embedding):
+        return embedding
+    vector = np.asarray(embedding[:dimensions], dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return (vector / norm if norm > 0 else vector).tolist()
+
+
+def truncate_embeddings(vectors: np.ndarray, dimensions: int) -> np.ndarray:
+    """2차원 배열의 각 행을 앞쪽 dimensions 차원으로 자르고 다시 정규화합니다."""
+    if not dimensions or dimensions >= vectors.shape[1]:
+        return vectors
+    truncated = np.ascontiguousarray(vectors[:, :dimensions], dtype=np.float32)
+    norms = np.linalg.norm(truncated, axis=1, keepdims=True)
+    return truncated / np.where(norms > 0, norms, 1.0)
+
+
+def quantize_int8(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    차원별 최대 절댓값으로 스케일링한 대칭 int8 양자화 (벡터당 1바이트/차원)
+
+    Returns:
+        (int8 벡터, 차원별 스케일) - 원래 값은 int8 * 스케일로 근사된다.
+    """
+    scale = np.abs(vectors).max(axis=0) / 127.0
+    scale[scale == 0] = 1.0
+    quantized = np.clip(np.round(vectors / scale), -127, 127).astype(np.int8)
+    return quantized, scale.astype(np.float32)
+
+
+def quantize_binary(vectors: np.ndarray) -> np.ndarray:
+    """부호 비트만 남기는 binary 양자화 (벡터당 1비트/차원, pgvector binary_quantize와 같은 규칙)"""
+    return np.packbits(vectors > 0, axis=-1)
+
+
+def hamming_distances(query_bits: np.ndarray, vector_bits: np.ndarray) -> np.ndarray:
+    """packbits된 질의 벡터와 문서 벡터들 사이의 hamming 거리"""
+    return np.unpackbits(np.bitwise_xor(vector_bits, query_bits), axis=-1).sum(axis=-1)
@@ -0,0 +1,139 @@
+import re
+from typing import List, Tuple
+from .keyword import RuleBasedKeywordExtractor
+
+# 문장 경계: 물음표/느낌표 뒤, 또는 마침표 뒤 공백
+SENTENCE_BOUNDARY = re.compile(r"(?<=[?？!])\s*|(?<=[.。])\s+")
+# 문장 안에서 새 질문을 시작하는 접속사
+CLAUSE_CONJUNCTION = re.compile(r"(?:^|,?\s+)(?:그리고|또한|아울러|더불어|추가로)\s+")
+# "~알려주고, ~" 처럼 연결어미 '고'로 이어진 요청
+CONNECTIVE_CLAUSE = re.compile(r"(\S+고),\s+")
+# 앞 문장의 대안을 묻는 문장이나 괄호 보충 설명은 앞 질문에 붙인다.
+CONTINUATION_STARTS = ("아니면", "혹은", "또는", "(", "[")
+# 앞 문장을 가리키는 표현이 있으면 LLM이 문맥을 풀어 써야 한다.
+ANAPHORA_STARTS = ("해당", "이런", "그런", "이러한", "그러한", "이", "그", "위", "각", "이때", "그때")
+ANAPHORA_PHRASES = ("이 경우", "그 경우", "해당 ", "이런 ", "그런 ", "이러한 ", "그러한 ")
+# 답변 형식을 지정하는 문장의 끝맺음
+FORMAT_ENDINGS = ("답변해주세요", "답변해 주세요", "답해주세요", "답해 주세요")
+# 답변 형식만 지정하는 문장의 명사 (앞 질문의 조건으로 취급)
+FORMAT_NOUNS = {
+    "답변", "단위", "수치", "금액", "정확", "만원", "일수", "년수", "한줄", "요약",
+    "나열", "설명", "형식", "모든", "모두", "각각", "평균",
+}
+
+BASE_CONFIDENCE = 0.9
+SINGLE_QUESTION_CONFIDENCE = 0.95
+ANAPHORA_PENALTY = 0.35
+FRAGMENT_PENALTY = 0.3
+LONG_SEGMENT_PENALTY = 0.15
+MANY_SEGMENTS_PENALTY = 0.1
+LONG_SEGMENT_LENGTH = 120
+MANY_SEGMENTS = 4
+
+
+class RuleBasedQuestionSplitter:
+    """
+    한국어 접속사/문장 경계 규칙과 Okt 형태소 분석으로 복합 질문을 분해하는 로컬 분해기
+    분해 결과와 함께 신뢰도(0~1)를 반환하며, 신뢰도가 낮으면 호출하는 쪽에서 LLM 분해로 넘깁니다.
+    """
+
+    def __init__(self, keyword_extractor: RuleBasedKeywordExtractor = None):
+        self.keyword_extractor = keyword_extractor or RuleBasedKeywordExtractor()
+        self.okt = self.keyword_extractor.okt
+
+    def split(self, text: str) -> Tuple[List[str], float]:
+        """
+        복합 질문을 개별 질문으로 분해합니다.
+
+        Args:
+            text: 사용자 질문
+
+        Returns:
+            (분해된 질문 리스트, 신뢰도)
+        """
+        text = re.sub(r"\s+", " ", text).strip()
+        if not text:
+            return [], 1.0
+
+        segments = []
+        for sentence in SENTENCE_BOUNDARY.split(text):
+            sentence = sentence.strip()
+            if sentence:
+                segments.extend(self._split_clauses(sentence))
+
+        questions, fragments = self._merge_fragments(segments)
+        confidence = SINGLE_QUESTION_CONFIDENCE if len(questions) <= 1 else BASE_CONFIDENCE
+        confidence -= FRAGMENT_PENALTY * fragments
+        if len(questions) <= 1:
+            return questions or [text], max(0.0, confidence)
+
+        for question in questions[1:]:
+            if self._is_anaphoric(question):
+                confidence -= ANAPHORA_PENALTY
+        if any(len(question) > LONG_SEGMENT_LENGTH for question in questions):
+            confidence -= LONG_SEGMENT_PENALTY
+        if len(questions) > MANY_SEGMENTS:
+            confidence -= MANY_SEGMENTS_PENALTY
+        return questions, max(0.0, min(1.0, confidence))
+
+    def _split_clauses(self, sentence: str) -> List[str]:
+        """문장 안의 접속사와 연결어미('~고,')를 기준으로 절을 나눕니다."""
+        clauses = []
+        for part in CLAUSE_CONJUNCTION.split(sentence):
+            start = 0
+            for match in CONNECTIVE_CLAUSE.finditer(part):
+                word = match.group(1)
+                if not self._is_verb(word):
+                    continue
+                # "알려주고" -> "알려주세요"
+                clauses.append(part[start:match.start(1)] + word[:-1] + "세요")
+                start = match.end()
+            clauses.append(part[start:])
+        return [clause.strip(" ,") for clause in clauses if clause.strip(" ,")]
+
+    def _merge_fragments(self, segments: List[str]) -> Tuple[List[str], int]:
+        """
+        독립 질문이 아닌 조각(대안 질문, 보충 설명, 형식 조건, 서술어 없는 명사구)을 앞 질문에 합칩니다.
+
+        Returns:
+            (질문 리스트, 서술어 없는 명사구 조각 수)
+        """
+        questions = []
+        fragments = 0
+        pending = ""
+        for segment in segments:
+            nouns, has_predicate = self._analyze(segment)
+            is_continuation = segment.startswith(CONTINUATION_STARTS)
+            is_format = segment.rstrip(" .").endswith(FORMAT_ENDINGS) or (bool(nouns) and all(noun in FORMAT_NOUNS for noun in nouns))
+            if not has_predicate and nouns:
+                fragments += 1
+            if questions and (is_continuation or is_format or not nouns or not has_predicate):
+                questions[-1] = f"{questions[-1]} {segment}"
+            elif not nouns or not has_predicate:
+                # 첫 조각이 독립 질문이 아니면 다음 질문 앞에 붙인다.
+                pending = f"{pending} {segment}".strip()
+            else:
+                questions.append(f"{pending} {segment}".strip())
+                pending = ""
+        if pending:
+            if questions:
+                questions[-1] = f"{questions[-1]} {pending}"
+            else:
+                questions.append(pending)
+        return questions, fragments
+
+    def _analyze(self, segment: str) -> Tuple[List[str], bool]:
+        """세그먼트의 내용 명사와 서술어(동사/형용사) 존재 여부를 반환합니다."""
+        pos_tags = self.okt.pos(self.keyword_extractor._preprocess_text(segment))
+        nouns = [word for word, pos in pos_tags if pos == "Noun" and word not in self.keyword_extractor.stop_words]
+        has_predicate = any(pos in ("Verb", "Adjective") for _, pos in pos_tags)
+        return nouns, has_predicate
+
+    def _is_verb(self, word: str) -> bool:
+        pos_tags = self.okt.pos(word)
+        return bool(pos_tags) and pos_tags[-1][1] == "Verb"
+
+    @staticmethod
+    def _is_anaphoric(question: str) -> bool:
+        first_word = question.split(" ", 1)[0]
+        return first_word in ANAPHORA_STARTS or any(phrase in question for phrase in ANAPHORA_PHRASES)
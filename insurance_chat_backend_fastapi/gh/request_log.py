@@ -0,0 +1,96 @@
+import os
+import uuid
+import random
+import logging
+import contextvars
+from numbers import Number
+from typing import Any, Dict, Optional
+
+# 요청 중 이 비율만 프롬프트/검색 쿼리 본문 같은 큰 값을 기록한다.
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "0.01"))
+# 로그에 남길 문자열 최대 길이 (초과분은 잘라낸다)
+LOG_MAX_TEXT_LENGTH = int(os.getenv("LOG_MAX_TEXT_LENGTH", "200"))
+# 이 길이 이상인 숫자 리스트는 임베딩 벡터로 보고 차원 수만 남긴다.
+VECTOR_MIN_LENGTH = 16
+
+_request_context: contextvars.ContextVar[Optional[Dict[str, Any]]] = contextvars.ContextVar("request_log_context", default=None)
+
+
+def start_request(sample_rate: float = None, request_id: str = None) -> Dict[str, Any]:
+    """
+    요청 단위 로그 컨텍스트(request_id, 샘플링 여부)를 설정합니다.
+    이후 생성되는 asyncio 태스크는 같은 컨텍스트를 물려받습니다.
+    """
+    rate = LOG_SAMPLE_RATE if sample_rate is None else sample_rate
+    context = {
+        "request_id": request_id or uuid.uuid4().hex[:12],
+        "sampled": random.random() < rate,
+    }
+    _request_context.set(context)
+    return context
+
+
+def is_sampled() -> bool:
+    """현재 요청이 상세 로그 샘플링 대상인지 반환합니다. (요청 컨텍스트가 없으면 호출마다 추첨)"""
+    context = _request_context.get()
+    if context is None:
+        return random.random() < LOG_SAMPLE_RATE
+    return context["sampled"]
+
+
+def redact(value: Any, max_length: int = None) -> Any:
+    """벡터는 차원 수로 바꾸고 긴 문자열은 잘라낸 사본을 반환합니다."""
+    max_length = LOG_MAX_TEXT_LENGTH if max_length is None else max_length
+    if isinstance(value, str):
+        if len(value) > max_length:
+            return "{}...(+{} chars)".format(value[:max_length], len(value) - max_length)
+        return value
+    if isinstance(value, dict):
+        return {key: redact(item, max_length) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        if len(value) >= VECTOR_MIN_LENGTH and all(isinstance(item, Number) for item in value[:VECTOR_MIN_LENGTH]):
+            return "<vector dim={}>".format(len(value))
+        return [redact(item, max_length) for item in value]
+    if hasattr(value, "shape") and hasattr(value, "dtype"):
+        return "<array shape={}>".format(tuple(value.shape))
+    return value
+
+
+class _StageFields:
+    """로그 레코드가 실제로 출력될 때만 필드를 문자열로 만든다."""
+
+    __slots__ = ("stage", "fields", "context")
+
+    def __init__(self, stage: str, fields: Dict[str, Any], context: Optional[Dict[str, Any]]):
+        self.stage = stage
+        self.fields = fields
+        self.context = context
+
+    def __str__(self) -> str:
+        parts = ["stage={}".format(self.stage)]
+        if self.context is not None:
+            parts.append("request_id={}".format(self.context["request_id"]))
+        for key, value in self.fields.items():
+            if isinstance(value, float):
+                parts.append("{}={:.3f}".format(key, value))
+            else:
+                parts.append("{}={}".format(key, redact(value)))
+        return " ".join(parts)
+
+
+def log_stage(logger: logging.Logger, stage: str, level: int = logging.INFO, sampled: bool = False, **fields):
+    """
+    처리 단계 로그를 key=value 형식으로 남깁니다.
+
+    Args:
+        logger: 사용할 로거
+        stage: 처리 단계 이름 (예: "search", "llm.answer")
+        level: 로그 레벨
+        sampled: True이면 샘플링된 요청에서만 기록 (프롬프트, 쿼리 본문 등 큰 값)
+        **fields: 기록할 필드 (벡터는 차원 수로, 긴 문자열은 잘라서 기록)
+    """
+    if not logger.isEnabledFor(level):
+        return
+    if sampled and not is_sampled():
+        return
+    logger.log(level, "%s", _StageFields(stage, fields, _request_context.get()))
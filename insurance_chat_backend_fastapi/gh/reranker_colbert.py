@@ -1,23 +1,23 @@
-from ragatouille import RAGPretrainedModel
 from typing import List
 import logging
 from gh.search import SearchResult
+from gh.model_registry import model_registry
 
 logger = logging.getLogger(__name__)
 
-import torch
 
-# Check if MPS is available and use it if possible
-if torch.backends.mps.is_available():
-    device = torch.device("mps")
-    logger.info("Using MPS device")
-else:
-    device = torch.device("cpu")
-    logger.info("Using CPU")
+def load_colbert_model():
+    """jina-colbert-v2 로드 (model_registry의 "colbert" 로더, 처음 사용할 때만 실행)"""
+    import torch
+    from ragatouille import RAGPretrainedModel
+
+    # Check if MPS is available and use it if possible
+    if torch.backends.mps.is_available():
+        logger.info("Using MPS device")
+    else:
+        logger.info("Using CPU")
+    return RAGPretrainedModel.from_pretrained("jinaai/jina-colbert-v2")
 
-reranker_model = RAGPretrainedModel.from_pretrained("jinaai/jina-colbert-v2")
-# Move model to device
-# reranker_model.to(device)
 
 def reranker_ranking(docs:List[SearchResult], query:str, k:int=3) -> List[str]:
     # 문서 인덱싱 (한 번만 수행)
@@ -29,7 +29,7 @@ def reranker_ranking(docs:List[SearchResult], query:str, k:int=3) -> List[str]:
         + "content:" + doc.content + "}")
     
     # 검색 및 reranking
-    results = reranker_model.rerank(
+    results = model_registry.get("colbert").rerank(
         query=query,
         documents=contents,
         k=len(contents)
@@ -0,0 +1,123 @@
+import os
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import List, Dict, Any, Optional
+import numpy as np
+from .quantization import truncate_embeddings
+
+logger = logging.getLogger(__name__)
+
+# 인덱스 파일 옆에 같은 순서로 저장되는 문서 _id 목록 (한 줄에 하나)
+FAISS_IDS_SUFFIX = ".ids.txt"
+
+
+class VectorRetriever(ABC):
+    """
+    hybrid search의 벡터(kNN) 검색을 담당하는 검색기의 추상 클래스
+    결과는 Elasticsearch hit과 같은 형식({"_id", "_score"})으로 반환합니다.
+    _source는 포함하지 않으므로 본문 필드는 호출하는 쪽에서 상위 결과에 대해서만 조회합니다.
+    """
+
+    @abstractmethod
+    async def search(self, embedding_vector: List[float], k: int) -> List[Dict[str, Any]]:
+        """임베딩 벡터와 가장 가까운 문서 k개를 반환"""
+        pass
+
+    async def search_many(self, embedding_vectors: List[List[float]], k: int) -> List[List[Dict[str, Any]]]:
+        """여러 벡터를 검색 (기본 구현은 벡터별 검색을 동시에 실행)"""
+        return list(await asyncio.gather(*(self.search(vector, k) for vector in embedding_vectors)))
+
+    async def close(self):
+        """검색기가 보유한 자원을 정리"""
+        pass
+
+
+class FaissVectorRetriever(VectorRetriever):
+    """
+    메모리 매핑된 FAISS 인덱스(HNSW, HNSW-SQ8 또는 IVF-PQ)로 네트워크 호출 없이 kNN 검색을 수행하는 검색기
+    인덱스는 gh/build_faiss_index.py로 Elasticsearch에 색인된 임베딩에서 생성합니다.
+    """
+
+    def __init__(self, index_path: str, ef_search: int = 64, nprobe: int = 16, use_mmap: bool = True):
+        """
+        Args:
+            index_path: FAISS 인덱스 파일 경로 (문서 _id 목록은 index_path + ".ids.txt")
+            ef_search: HNSW 검색 시 탐색 후보 수 (클수록 재현율이 높고 느리다)
+            nprobe: IVF 검색 시 탐색할 클러스터 수
+            use_mmap: 인덱스 파일을 메모리 매핑으로 읽을지 여부
+        """
+        import faiss
+
+        self.index_path = index_path
+        try:
+            self.index = faiss.read_index(index_path, faiss.IO_FLAG_MMAP if use_mmap else 0)
+        except RuntimeError as e:
+            # 메모리 매핑을 지원하지 않는 인덱스 타입은 일반 로드로 대체한다.
+            logger.warning("FAISS 인덱스 mmap 로드 실패, 메모리로 읽습니다: %s", e)
+            self.index = faiss.read_index(index_path)
+
+        parameters = faiss.ParameterSpace()
+        for name, value in (("efSearch", ef_search), ("nprobe", nprobe)):
+            try:
+                parameters.set_index_parameter(self.index, name, value)
+            except RuntimeError:
+                pass  # 인덱스 타입에 없는 파라미터
+
+        # 문서 본문(_source)은 메모리에 올리지 않고 _id만 고정 길이 문자열 배열로 보관한다.
+        with open(index_path + FAISS_IDS_SUFFIX, "r", encoding="utf-8") as f:
+            self.doc_ids = np.array(f.read().splitlines())
+        if len(self.doc_ids) != self.index.ntotal:
+            raise ValueError(
+                "FAISS _id 수({})와 인덱스 벡터 수({})가 다릅니다.".format(len(self.doc_ids), self.index.ntotal)
+            )
+        logger.info("Loaded FAISS index %s (%d vectors, dim=%d)", index_path, self.index.ntotal, self.index.d)
+
+    def _search(self, embedding_vectors: List[List[float]], k: int) -> List[List[Dict[str, Any]]]:
+        vectors = np.asarray(embedding_vectors, dtype=np.float32)
+        # Matryoshka 방식으로 차원을 줄여 만든 인덱스면 질의 벡터도 같은 차원으로 자른다.
+        vectors = truncate_embeddings(vectors, self.index.d)
+        # 인덱스는 정규화된 벡터의 내적(=코사인 유사도)으로 구성된다.
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms > 0, norms, 1.0)
+        scores, ids = self.index.search(vectors, k)
+
+        results = []
+        for row_scores, row_ids in zip(scores, ids):
+            hits = []
+            for score, doc_idx in zip(row_scores, row_ids):
+                if doc_idx < 0:
+                    continue  # 결과가 k개보다 적은 경우
+                hits.append({"_id": str(self.doc_ids[doc_idx]), "_score": float(score)})
+            results.append(hits)
+        return results
+
+    async def search(self, embedding_vector: List[float], k: int) -> List[Dict[str, Any]]:
+        return (await self.search_many([embedding_vector], k))[0]
+
+    async def search_many(self, embedding_vectors: List[List[float]], k: int) -> List[List[Dict[str, Any]]]:
+        if not embedding_vectors:
+            return []
+        # FAISS 검색은 GIL을 놓으므로 스레드에서 실행해 이벤트 루프를 막지 않는다.
+        return await asyncio.to_thread(self._search, embedding_vectors, k)
+
+
+def create_vector_retriever() -> Optional[VectorRetriever]:
+    """
+    VECTOR_BACKEND 환경 변수에 따라 벡터 검색기를 생성합니다.
+    "elasticsearch"(기본값)이면 None을 반환하며, 이 경우 kNN은 Elasticsearch 쿼리 안에서 수행됩니다.
+    """
+    backend = os.getenv("VECTOR_BACKEND", "elasticsearch").lower()
+    if backend == "elasticsearch":
+        return None
+    if backend == "faiss":
+        index_path = os.getenv("FAISS_INDEX_PATH")
+        if not index_path:
+            raise ValueError("VECTOR_BACKEND=faiss 사용 시 FAISS_INDEX_PATH 환경 변수가 필요합니다.")
+        return FaissVectorRetriever(
+            index_path,
+            ef_search=int(os.getenv("FAISS_EF_SEARCH", "64")),
+            nprobe=int(os.getenv("FAISS_NPROBE", "16")),
+            use_mmap=os.getenv("FAISS_MMAP", "true").lower() == "true",
+        )
+    raise ValueError("지원하지 않는 VECTOR_BACKEND입니다: {}".format(backend))
@@ -1,8 +1,17 @@
-from elasticsearch import Elasticsearch
-from typing import List, Dict, Any
+import os
+import math
+import threading
+from elasticsearch import AsyncElasticsearch
+from typing import List, Dict, Any, Optional
+import time
+import asyncio
 import numpy as np
 from dataclasses import dataclass
 import logging
+from .request_log import log_stage
+from .retriever import create_vector_retriever
+from .fusion import fuse
+from .quantization import truncate_embedding
 
 logger = logging.getLogger(__name__)
 
@@ -34,46 +43,123 @@ class SearchResult:
             "content": self.content
         }
 
+# SearchResult를 만드는 데 필요한 필드만 가져온다. (3072차원 embedding 필드는 제외)
+SOURCE_FIELDS = [
+    "insurance_name",
+    "insurance_type",
+    "index_title",
+    "chapter_title",
+    "article_title",
+    "article_content",
+]
+SOURCE_EXCLUDES = ["embedding", "embedding_*"]
+# 응답 JSON에서 hits 이외의 메타데이터를 제거한다.
+SEARCH_FILTER_PATH = ["hits.hits._id", "hits.hits._score", "hits.hits._source", "hits.hits.fields"]
+# 결과가 없는 항목도 빈 객체로 사라지지 않도록 status를 남겨 질문 순서를 유지한다.
+MSEARCH_FILTER_PATH = ["responses." + path for path in SEARCH_FILTER_PATH] + ["responses.status", "responses.error"]
+MGET_FILTER_PATH = ["docs._id", "docs.found", "docs._source", "docs.fields"]
+
 class SearchProcessor:
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+        return cls._instance
+
     def __init__(self, es_host: str = "http://localhost:9200"):
-        self.es = Elasticsearch(es_host)
-        self.index_name = "insurance-data1"
-        
-    def hybrid_search(self, query: str, embedding_vector: List[float], k: int = 5) -> List[SearchResult]:
+        if not hasattr(self, 'initialized'):
+            self.initialized = True
+            self.es = AsyncElasticsearch(
+                es_host,
+                connections_per_node=int(os.getenv("ES_CONNECTIONS_PER_NODE", "50")),
+                request_timeout=30,
+            )
+            self.index_name = "insurance-data1"
+            # 매핑에서 필드를 store: true로 저장한 경우 _source 대신 stored_fields로 읽을 수 있다.
+            self.use_stored_fields = os.getenv("ES_USE_STORED_FIELDS", "false").lower() == "true"
+            # FAISS 등 별도 벡터 검색기를 쓰면 kNN은 그 검색기로, BM25만 ES로 요청한다.
+            self.vector_retriever = create_vector_retriever()
+            # rrf / linear: BM25와 kNN을 따로 검색해 클라이언트에서 합친다.
+            # sum: 기존 방식 (하나의 bool.should 쿼리에서 점수를 더함, ES kNN에서만 사용 가능)
+            self.fusion_method = os.getenv("SEARCH_FUSION", "rrf").lower()
+            if self.fusion_method == "sum" and self.vector_retriever is not None:
+                logger.warning("SEARCH_FUSION=sum은 별도 벡터 검색기와 함께 쓸 수 없어 rrf를 사용합니다.")
+                self.fusion_method = "rrf"
+            # linear fusion에서 kNN 점수의 가중치 (BM25는 1 - alpha)
+            self.fusion_alpha = float(os.getenv("SEARCH_FUSION_ALPHA", "0.5"))
+            # 합치기 전 검색기별로 가져올 후보 수 (최소 k)
+            self.fusion_candidates = int(os.getenv("SEARCH_FUSION_CANDIDATES", "50"))
+            self.knn_num_candidates = int(os.getenv("ES_KNN_NUM_CANDIDATES", "100"))
+            # 양자화(int8_hnsw / bbq_hnsw)된 kNN 필드와 차원 수 (768이면 Matryoshka 방식으로 앞 768차원만 사용)
+            self.knn_field = os.getenv("ES_KNN_FIELD", "embedding")
+            self.knn_dimensions = int(os.getenv("ES_KNN_DIMS", "0"))
+            # 0보다 크면 k * oversample개의 후보를 원본 embedding 필드의 코사인 유사도로 다시 정렬한다.
+            self.knn_rescore_oversample = float(os.getenv("ES_KNN_RESCORE_OVERSAMPLE", "0"))
+
+    def _source_options(self) -> Dict[str, Any]:
+        """검색 요청 본문에 추가할 _source / stored_fields 옵션"""
+        if self.use_stored_fields:
+            return {"_source": False, "stored_fields": SOURCE_FIELDS}
+        return {"_source": {"includes": SOURCE_FIELDS, "excludes": SOURCE_EXCLUDES}}
+
+    def _mget_options(self) -> Dict[str, Any]:
+        """mget 요청에 추가할 _source / stored_fields 옵션"""
+        if self.use_stored_fields:
+            return {"source": False, "stored_fields": SOURCE_FIELDS}
+        return {"source_includes": SOURCE_FIELDS}
+
+    async def close(self):
+        """커넥션 풀을 정리합니다."""
+        await self.es.close()
+        if self.vector_retriever is not None:
+            await self.vector_retriever.close()
+
+    async def get_corpus_version(self) -> str:
         """
-        질문과 임베딩 벡터를 사용하여 hybrid search를 수행합니다.
-        
-        Args:
-            query: 사용자의 질문
-            embedding_vector: 질문의 임베딩 벡터
-            k: 반환할 결과의 수
-            
-        Returns:
-            SearchResult 객체 리스트
+        색인된 문서 집합의 버전을 반환합니다.
+        인덱스 매핑의 _meta.corpus_version이 있으면 그 값을, 없으면 인덱스 uuid와 문서 수를 조합해 사용합니다.
         """
-        # Hybrid search 쿼리 구성
-        search_query = {
+        index_info = await self.es.indices.get(index=self.index_name)
+        index = next(iter(index_info.values()))
+        version = index.get("mappings", {}).get("_meta", {}).get("corpus_version")
+        if version:
+            return str(version)
+        count = await self.es.count(index=self.index_name)
+        return "{}:{}".format(index["settings"]["index"]["uuid"], count["count"])
+        
+    def _build_bm25_query(self, query: str) -> Dict[str, Any]:
+        """BM25F 기반 multi_match 쿼리"""
+        return {
+            "multi_match": {
+                "query": query,
+                "type": "most_fields",
+                "fields": [
+                    # "insurance_name",
+                    # "insurance_type",
+                    "index_title^1",
+                    "chapter_title^2",
+                    "article_title^3",
+                    "article_content^0.5"
+                ],
+                "operator": "OR",
+                "boost": 0.005
+            }
+        }
+
+    def _build_hybrid_query(self, query: str, embedding_vector: List[float], k: int) -> Dict[str, Any]:
+        """BM25(multi_match)와 kNN을 함께 사용하는 hybrid search 쿼리를 구성합니다."""
+        return {
             "size": k,
+            **self._source_options(),
             "query": {
                 "bool": {
                     "should": [
                         # BM25F 기반 검색
-                        {
-                            "multi_match": {
-                                "query": query,
-                                "type": "most_fields",
-                                "fields": [
-                                    # "insurance_name",
-                                    # "insurance_type",
-                                    "index_title^1",
-                                    "chapter_title^2",
-                                    "article_title^3",
-                                    "article_content^0.5"
-                                ],
-                                "operator": "OR",
-                                "boost": 0.005
-                            }
-                        }
+                        self._build_bm25_query(query)
                         # 벡터 기반 검색 (KNN)
                         , {
                             "knn": {
@@ -86,32 +172,255 @@ class SearchProcessor:
                 }
             }
         }
-        logger.info("[R] search query: {}".format(search_query))
+
+    def _build_bm25_body(self, query: str, size: int) -> Dict[str, Any]:
+        """BM25만 수행하는 검색 본문"""
+        return {"size": size, **self._source_options(), "query": self._build_bm25_query(query)}
+
+    def _build_knn_body(self, embedding_vector: List[float], size: int) -> Dict[str, Any]:
+        """ES kNN만 수행하는 검색 본문 (양자화 필드 검색 후 원본 벡터로 재정렬 가능)"""
+        query_vector = truncate_embedding(embedding_vector, self.knn_dimensions)
+        if self.knn_rescore_oversample <= 0:
+            return {
+                "size": size,
+                **self._source_options(),
+                "knn": {
+                    "field": self.knn_field,
+                    "query_vector": query_vector,
+                    "k": size,
+                    "num_candidates": max(self.knn_num_candidates, size)
+                }
+            }
+
+        window = math.ceil(size * self.knn_rescore_oversample)
+        return {
+            "size": size,
+            **self._source_options(),
+            # rescore는 top-level knn과 함께 쓸 수 없어 knn query로 후보를 찾는다.
+            "query": {
+                "knn": {
+                    "field": self.knn_field,
+                    "query_vector": query_vector,
+                    "k": window,
+                    "num_candidates": max(self.knn_num_candidates, window)
+                }
+            },
+            "rescore": {
+                "window_size": window,
+                "query": {
+                    "rescore_query": {
+                        "script_score": {
+                            "query": {"match_all": {}},
+                            "script": {
+                                "source": "cosineSimilarity(params.query_vector, 'embedding') + 1.0",
+                                "params": {"query_vector": embedding_vector}
+                            }
+                        }
+                    },
+                    "query_weight": 0.0,
+                    "rescore_query_weight": 1.0
+                }
+            }
+        }
+
+    def _fuse(self, bm25_results: List[SearchResult], knn_results: List[SearchResult], k: int) -> List[SearchResult]:
+        """BM25 / kNN 결과를 설정된 방식으로 합쳐 상위 k개를 반환"""
+        weights = [1.0 - self.fusion_alpha, self.fusion_alpha]
+        return fuse([bm25_results, knn_results], method=self.fusion_method, weights=weights, limit=k)
+
+    @staticmethod
+    def _parse_hits(response: Dict[str, Any]) -> List[SearchResult]:
+        """
+        검색 응답의 hits를 SearchResult 리스트로 변환합니다.
+        filter_path로 줄인 응답은 결과가 없으면 hits 키가 없으므로 get으로 접근합니다.
+        """
+        return [
+            SearchProcessor._to_result(hit["_id"], hit["_score"], SearchProcessor._hit_source(hit))
+            for hit in response.get("hits", {}).get("hits", [])
+        ]
+
+    @staticmethod
+    def _hit_source(hit: Dict[str, Any]) -> Dict[str, Any]:
+        """검색 / mget 응답 문서에서 필드 값을 꺼냅니다. (FAISS 검색기 결과처럼 필드가 없으면 빈 dict)"""
+        source = hit.get("_source")
+        if source is None:
+            # stored_fields 응답은 필드마다 값 리스트로 온다.
+            source = {name: values[0] for name, values in hit.get("fields", {}).items() if values}
+        return source
+
+    @staticmethod
+    def _to_result(doc_id: str, score: float, source: Dict[str, Any]) -> SearchResult:
+        return SearchResult(
+            id=doc_id,
+            score=score,
+            insurance_name=source.get("insurance_name", ""),
+            insurance_type=source.get("insurance_type", ""),
+            index_title=source.get("index_title", ""),
+            chapter_title=source.get("chapter_title", ""),
+            article_title=source.get("article_title", ""),
+            content=source.get("article_content", "")
+        )
+
+    async def _fill_sources(self, results_list: List[List[SearchResult]], bm25_results_list: List[List[SearchResult]]) -> List[List[SearchResult]]:
+        """
+        벡터 검색기 결과는 _id만 가지므로, 합친 상위 결과 중 BM25 결과에 없던 문서의 필드를 mget 한 번으로 채웁니다.
+        색인에서 사라진 문서는 결과에서 제외합니다.
+        """
+        loaded_ids = [{result.id for result in bm25_results} for bm25_results in bm25_results_list]
+        missing_ids = list(dict.fromkeys(
+            result.id
+            for results, loaded in zip(results_list, loaded_ids)
+            for result in results if result.id not in loaded
+        ))
+        if not missing_ids:
+            return results_list
+        response = await self.es.mget(
+            index=self.index_name, ids=missing_ids, filter_path=MGET_FILTER_PATH, **self._mget_options()
+        )
+        sources = {doc["_id"]: self._hit_source(doc) for doc in response.get("docs", []) if doc.get("found")}
+        return [
+            [
+                result if result.id in loaded else self._to_result(result.id, result.score, sources[result.id])
+                for result in results if result.id in loaded or result.id in sources
+            ]
+            for results, loaded in zip(results_list, loaded_ids)
+        ]
+
+
+    async def _knn_search(self, embedding_vector: List[float], size: int) -> List[SearchResult]:
+        """설정된 벡터 검색기(없으면 ES kNN)로 kNN 검색"""
+        if self.vector_retriever is not None:
+            hits = await self.vector_retriever.search(embedding_vector, size)
+            return self._parse_hits({"hits": {"hits": hits}})
+        response = await self.es.search(
+            index=self.index_name,
+            body=self._build_knn_body(embedding_vector, size),
+            filter_path=SEARCH_FILTER_PATH
+        )
+        return self._parse_hits(response)
+
+    async def hybrid_search(self, query: str, embedding_vector: List[float], k: int = 5) -> List[SearchResult]:
+        """
+        질문과 임베딩 벡터를 사용하여 hybrid search를 수행합니다.
+        BM25와 kNN을 동시에 검색한 뒤 결과를 RRF(또는 정규화 선형 결합)로 합칩니다.
+        
+        Args:
+            query: 사용자의 질문
+            embedding_vector: 질문의 임베딩 벡터
+            k: 반환할 결과의 수
+            
+        Returns:
+            SearchResult 객체 리스트
+        """
         try:
-            response = self.es.search(
-                index=self.index_name,
-                body=search_query
-            )
-            #print("query={}".format(search_query))
-            # 검색 결과 처리
-            results = []
-            for hit in response["hits"]["hits"]:
-                result = SearchResult(
-                    id=hit["_id"],
-                    score=hit["_score"],
-                    insurance_name=hit["_source"].get("insurance_name", ""),
-                    insurance_type=hit["_source"].get("insurance_type", ""),
-                    index_title=hit["_source"].get("index_title", ""),
-                    chapter_title=hit["_source"].get("chapter_title", ""),
-                    article_title=hit["_source"].get("article_title", ""),
-                    content=hit["_source"].get("article_content", "")
+            start_time = time.perf_counter()
+            if self.fusion_method == "sum":
+                # Hybrid search 쿼리 구성 (기존 방식)
+                search_query = self._build_hybrid_query(query, embedding_vector, k)
+                # 쿼리 본문은 샘플링된 요청만 기록하고, 임베딩 벡터는 차원 수로 대체된다.
+                log_stage(logger, "search.body", sampled=True, body=search_query)
+                response = await self.es.search(
+                    index=self.index_name,
+                    body=search_query,
+                    filter_path=SEARCH_FILTER_PATH
                 )
-                results.append(result)
-            logger.info("Found {} documents".format(len(results)))
-            logger.debug("Search\\n query: {}\\n results: {}".format(search_query, results))
+                # 검색 결과 처리
+                results = self._parse_hits(response)
+            else:
+                size = max(k, self.fusion_candidates)
+                bm25_query = self._build_bm25_body(query, size)
+                log_stage(logger, "search.body", sampled=True, body=bm25_query)
+                bm25_response, knn_results = await asyncio.gather(
+                    self.es.search(index=self.index_name, body=bm25_query, filter_path=SEARCH_FILTER_PATH),
+                    self._knn_search(embedding_vector, size),
+                )
+                bm25_results = self._parse_hits(bm25_response)
+                results = self._fuse(bm25_results, knn_results, k)
+                if self.vector_retriever is not None:
+                    results = (await self._fill_sources([results], [bm25_results]))[0]
+            log_stage(
+                logger, "search", fusion=self.fusion_method, query=query, k=k,
+                hits=len(results), elapsed_s=time.perf_counter() - start_time
+            )
             return results
             
         except Exception as e:
-            logger.error(f"검색 중 오류 발생: {e}")
+            logger.error("검색 중 오류 발생: %s", e)
             return []
-            
\ No newline at end of file
+
+    async def hybrid_search_many(self, queries: List[str], embedding_vectors: List[List[float]], k: int = 5) -> List[Optional[List[SearchResult]]]:
+        """
+        여러 질문의 hybrid search를 _msearch 한 번의 요청으로 수행합니다.
+        ES kNN을 쓰는 경우 질문마다 BM25 / kNN 두 개의 본문을 보내 2N개의 검색을 한 번에 처리합니다.
+        
+        Args:
+            queries: 질문(키워드) 리스트
+            embedding_vectors: 질문별 임베딩 벡터 리스트
+            k: 질문별로 반환할 결과의 수
+            
+        Returns:
+            질문 순서와 같은 순서의 SearchResult 리스트 (검색 본문이 실패한 질문은 None)
+
+        Raises:
+            요청 자체가 실패하면 예외를 그대로 전달한다. (호출하는 쪽에서 질문별 검색으로 대신한다)
+        """
+        if not queries:
+            return []
+        size = k if self.fusion_method == "sum" else max(k, self.fusion_candidates)
+        # 질문 하나에 대해 msearch에 넣는 본문 수
+        bodies_per_query = 2 if self.fusion_method != "sum" and self.vector_retriever is None else 1
+        searches = []
+        for query, embedding_vector in zip(queries, embedding_vectors):
+            if self.fusion_method == "sum":
+                searches.extend([{"index": self.index_name}, self._build_hybrid_query(query, embedding_vector, k)])
+                continue
+            searches.extend([{"index": self.index_name}, self._build_bm25_body(query, size)])
+            if self.vector_retriever is None:
+                searches.extend([{"index": self.index_name}, self._build_knn_body(embedding_vector, size)])
+        log_stage(logger, "msearch.body", sampled=True, searches=searches)
+        start_time = time.perf_counter()
+        if self.vector_retriever is None:
+            response = await self.es.msearch(searches=searches, filter_path=MSEARCH_FILTER_PATH)
+            vector_hits_list = None
+        else:
+            response, vector_hits_list = await asyncio.gather(
+                self.es.msearch(searches=searches, filter_path=MSEARCH_FILTER_PATH),
+                self.vector_retriever.search_many(embedding_vectors, size),
+            )
+
+        # 오류가 난 본문은 None으로 표시하고 나머지 검색 결과는 그대로 사용한다.
+        parsed = []
+        for idx, item in enumerate(response["responses"]):
+            if "error" in item:
+                logger.error("다중 검색 %d번째 본문 오류: %s", idx, item["error"])
+                parsed.append(None)
+            else:
+                parsed.append(self._parse_hits(item))
+
+        results = []
+        for idx in range(len(queries)):
+            bodies = parsed[idx * bodies_per_query:(idx + 1) * bodies_per_query]
+            if any(body is None for body in bodies):
+                results.append(None)
+                continue
+            search_results = parsed[idx * bodies_per_query]
+            if self.fusion_method == "sum":
+                results.append(search_results)
+                continue
+            if vector_hits_list is None:
+                knn_results = parsed[idx * bodies_per_query + 1]
+            else:
+                knn_results = self._parse_hits({"hits": {"hits": vector_hits_list[idx]}})
+            results.append(self._fuse(search_results, knn_results, k))
+        if vector_hits_list is not None:
+            # 벡터 검색기 결과의 본문은 모든 질문의 상위 결과를 모아 mget 한 번으로 채운다.
+            filled = iter(await self._fill_sources(
+                [r for r in results if r is not None],
+                [parsed[idx * bodies_per_query] for idx, r in enumerate(results) if r is not None],
+            ))
+            results = [None if r is None else next(filled) for r in results]
+        log_stage(
+            logger, "msearch", fusion=self.fusion_method, queries=len(queries),
+            hits=[None if r is None else len(r) for r in results], elapsed_s=time.perf_counter() - start_time
+        )
+        return results
@@ -0,0 +1,127 @@
+import time
+import threading
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SemanticCacheEntry:
+    question: str
+    answer: str
+    corpus_version: str
+    created_at: float
+
+
+class SemanticAnswerCache:
+    """
+    질문 임베딩의 코사인 유사도로 이전 답변을 찾는 인메모리 캐시
+    정규화된 임베딩을 행렬로 보관하므로 조회는 행렬-벡터 곱 한 번으로 끝납니다.
+    행렬은 max_entries까지 용량을 두 배씩 늘리고, 가득 차면 가장 오래된 행을 덮어쓰는 링 버퍼로 사용합니다.
+    """
+
+    INITIAL_CAPACITY = 16
+
+    def __init__(self, threshold: float = 0.95, max_entries: int = 1000, ttl: int = 24 * 3600):
+        """
+        Args:
+            threshold: 캐시 적중으로 판단할 최소 코사인 유사도
+            max_entries: 보관할 최대 답변 수 (초과 시 가장 오래된 항목부터 제거)
+            ttl: 답변 유효 시간(초)
+        """
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._vectors: Optional[np.ndarray] = None
+        self._entries: List[SemanticCacheEntry] = []
+        # 가득 찬 뒤 다음에 덮어쓸(가장 오래된) 행
+        self._next = 0
+        self.corpus_version: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def set_corpus_version(self, version: str):
+        """색인된 문서 버전이 바뀌면 기존 답변을 모두 무효화합니다."""
+        with self._lock:
+            if self.corpus_version is not None and version != self.corpus_version:
+                logger.info(f"Corpus version changed ({self.corpus_version} -> {version}), clearing semantic cache")
+                self._vectors = None
+                self._entries = []
+                self._next = 0
+            self.corpus_version = version
+
+    def lookup(self, embedding: List[float]) -> Optional[Tuple[SemanticCacheEntry, float]]:
+        """
+        가장 유사한 이전 질문을 찾습니다.
+
+        Returns:
+            임계값 이상인 경우 (캐시 항목, 유사도), 아니면 None
+        """
+        query = self._normalize(embedding)
+        with self._lock:
+            if self._vectors is None or not self._entries:
+                self.misses += 1
+                return None
+            scores = self._vectors[:len(self._entries)] @ query
+            best = int(np.argmax(scores))
+            score = float(scores[best])
+            entry = self._entries[best]
+            expired = time.time() - entry.created_at > self.ttl
+            if score < self.threshold or expired or entry.corpus_version != (self.corpus_version or ""):
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry, score
+
+    def add(self, question: str, embedding: List[float], answer: str):
+        """질문과 답변을 캐시에 추가합니다."""
+        vector = self._normalize(embedding)
+        entry = SemanticCacheEntry(
+            question=question,
+            answer=answer,
+            corpus_version=self.corpus_version or "",
+            created_at=time.time()
+        )
+        with self._lock:
+            size = len(self._entries)
+            if size < self.max_entries:
+                if self._vectors is None or size == len(self._vectors):
+                    self._grow(vector.shape[0])
+                self._vectors[size] = vector
+                self._entries.append(entry)
+            else:
+                # 가득 차면 가장 오래된 항목을 덮어쓴다.
+                self._vectors[self._next] = vector
+                self._entries[self._next] = entry
+                self._next = (self._next + 1) % self.max_entries
+
+    def _grow(self, dims: int):
+        """행렬 용량을 두 배로 늘린다. (max_entries까지, 추가 비용은 항목당 상수 시간)"""
+        size = len(self._entries)
+        capacity = min(self.max_entries, max(self.INITIAL_CAPACITY, size * 2))
+        vectors = np.empty((capacity, dims), dtype=np.float32)
+        if size:
+            vectors[:size] = self._vectors[:size]
+        self._vectors = vectors
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "threshold": self.threshold,
+                "corpus_version": self.corpus_version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
@@ -1,10 +1,15 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Dict, Any
+import os
+import json
+import asyncio
 import traceback
 from services.question_service import QuestionService
 from services.gh_question_service import GHQuestionService
-import asyncio
+from gh.request_log import start_request
+from gh.model_registry import model_registry, parse_model_names
 
 class QuestionRequest(BaseModel):
     question: str
@@ -29,19 +34,46 @@ class FinalAnswerResponse(BaseModel):
     answer: str
 
 app = FastAPI()
-question_service: QuestionService = GHQuestionService() # --> 이 부분만 개별로 바꾸면 됨
+# JVM / HTTP 클라이언트 / 모델은 fork 후 안전하지 않으므로 import 시점이 아니라 워커별 startup에서 만든다.
+question_service: QuestionService = None
+
+@app.middleware("http")
+async def request_log_context(request: Request, call_next):
+    # 요청마다 request_id와 로그 샘플링 여부를 정한다.
+    context = start_request(request_id=request.headers.get("X-Request-ID"))
+    response = await call_next(request)
+    response.headers["X-Request-ID"] = context["request_id"]
+    return response
+
+@app.on_event("startup")
+async def startup():
+    global question_service
+    question_service = GHQuestionService() # --> 이 부분만 개별로 바꾸면 됨
+    await asyncio.to_thread(model_registry.preload, parse_model_names(os.getenv("MODEL_PRELOAD")))
+    await question_service.warmup()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await question_service.close()
 
 @app.get("/")
 def read_root():
     return {"message": "Hello, World!"} 
 
+@app.get("/models/stats")
+def model_stats():
+    """
+    모델별 로드 여부 / 로드 시간 / 로드 시 RSS 증가량과 현재 프로세스 RSS
+    """
+    return model_registry.stats()
+
 @app.get("/question")
-def question(q: str):
+async def question(q: str):
     """
     사용자의 질문에 대한 답변을 생성하고 제공
     """
     try:
-        return question_service.process_question(q)
+        return await question_service.process_question(q)
     except Exception as e:
         print(f"[ERROR] /question API 호출 중 오류 발생")
         print(f"질문: {q}")
@@ -49,13 +81,31 @@ def question(q: str):
         print(f"상세 스택 트레이스:\n{traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/question/stream")
+async def question_stream(q: str):
+    """
+    사용자의 질문에 대한 답변을 SSE(text/event-stream)로 스트리밍
+    """
+    async def event_stream():
+        stream_id = 0
+        async for event in question_service.process_question_stream(q):
+            stream_id += 1
+            yield f"id: {stream_id}\n"
+            yield f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream; charset=utf-8",
+        headers={"X-Accel-Buffering": "no", "Cache-Control": "no-cache"},
+    )
+
 @app.get("/split-question", response_model=SplitQuestionResponse)
-def split_question(q: str):
+async def split_question(q: str):
     """
     복합 질문을 개별 질문으로 분해
     """
     try:
-        questions = question_service.split_question(q)
+        questions = await question_service.split_question(q)
         return SplitQuestionResponse(questions=questions)
     except Exception as e:
         print(f"[ERROR] /split-question API 호출 중 오류 발생")
@@ -65,12 +115,12 @@ def split_question(q: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/keywords", response_model=KeywordResponse)
-def extract_keywords_only(q: str):
+async def extract_keywords_only(q: str):
     """
     질문에서 키워드만 추출 (규칙 기반 + BERT)
     """
     try:
-        keywords = question_service.extract_keywords(q)
+        keywords = await question_service.extract_keywords(q)
         return KeywordResponse(**keywords)
     except Exception as e:
         print(f"[ERROR] /keywords API 호출 중 오류 발생")
@@ -80,12 +130,12 @@ def extract_keywords_only(q: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/search", response_model=SearchResponse)
-def search(q: str):
+async def search(q: str):
     """
     키워드와 임베딩을 사용한 하이브리드 검색
     """
     try:
-        documents = question_service.search_documents(q)
+        documents = await question_service.search_documents(q)
         return SearchResponse(results=documents)
     except Exception as e:
         print(f"[ERROR] /search API 호출 중 오류 발생")
@@ -95,13 +145,13 @@ def search(q: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/generate-answer", response_model=AnswerResponse)
-def generate_answer(q: str):
+async def generate_answer(q: str):
     """
     검색 결과를 바탕으로 답변 생성
     """
     try:
-        documents = question_service.search_documents(q)
-        answer = question_service.generate_answer(q, documents)
+        documents = await question_service.search_documents(q)
+        answer = await question_service.generate_answer(q, documents)
         return AnswerResponse(answer=answer)
     except Exception as e:
         print(f"[ERROR] /generate-answer API 호출 중 오류 발생")
@@ -112,9 +162,10 @@ def generate_answer(q: str):
 
 # 이하는 그냥 테스트용 API
 @app.get("/retrieve")
-def retrieve(q: str):
+async def retrieve(q: str):
     try:
-        return {"retrieve": question_service.search_processor.hybrid_search(q)}
+        embedding = await question_service.embedding_processor.get_embedding(q)
+        return {"retrieve": await question_service.search_processor.hybrid_search(q, embedding)}
     except Exception as e:
         print(f"[ERROR] /retrieve API 호출 중 오류 발생")
         print(f"질문: {q}")
@@ -122,10 +173,17 @@ def retrieve(q: str):
         print(f"상세 스택 트레이스:\n{traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/cache/stats")
+def cache_stats():
+    return {
+        "embeddings": question_service.embedding_processor.cache.stats(),
+        "semantic_answers": question_service.semantic_cache.stats(),
+    }
+
 @app.get("/embeddings")
-def get_embeddings(q: str):
+async def get_embeddings(q: str):
     try:
-        return {"embedding": question_service.embedding_processor.get_embedding(q)}
+        return {"embedding": await question_service.embedding_processor.get_embedding(q)}
     except Exception as e:
         print(f"[ERROR] /embeddings API 호출 중 오류 발생")
         print(f"질문: {q}")
@@ -1,6 +1,4 @@
-from typing import List, Dict, Any, Tuple, Optional
-import concurrent.futures
-from functools import partial
+from typing import List, Dict, Any, Tuple, Optional, AsyncIterator
 import threading
 import asyncio
 from gh.model import OpenAIAnswerProcessor
@@ -11,15 +9,31 @@ from gh.prompts import split_complex_question, question, summary_answers, questi
 from embedding import GoogleEmbeddingProcessor
 from .question_service import QuestionService
 from gh.openai_keyword_extractor import OpenAIKeywordExtractor
+from gh.semantic_cache import SemanticAnswerCache
+from gh.request_log import log_stage
+from gh.reranker_crossencoder import get_reranker
+from gh.model_registry import model_registry
+import os
 import logging
 import time
-from gh.reranker_colbert import reranker_ranking
 import json
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-k = 20
+# 하위 질문별로 프롬프트에 넣을 문서 수 (fusion 검색은 작은 k에서도 순위가 안정적이다)
+k = int(os.getenv("SEARCH_TOP_K", "20"))
+# 검색된 k개 문서를 로컬 cross-encoder로 재정렬해 상위 RERANK_TOP_K개만 프롬프트에 넣는다. (RERANKER_ENABLED, gh/model_registry.py)
+RERANK_TOP_K = int(os.getenv("RERANK_TOP_K", "5"))
+
+# 스트리밍 이벤트 코드
+STREAM_CODE_SPLIT = "0"
+STREAM_CODE_FETCH = "1"
+STREAM_CODE_TOKEN = "3"
+STREAM_CODE_COMPLETE = "4"
+
+def stream_event(code: str, message: Any, event_type: str = "processing") -> Dict[str, Any]:
+    return {"type": event_type, "code": code, "message": message}
 
 class QuestionProcessor:
     _instance = None
@@ -40,50 +54,78 @@ class QuestionProcessor:
             self.search_processor = SearchProcessor()
             self.answer_processor = OpenAIAnswerProcessor()
             self.keyword_processor_openai = OpenAIKeywordExtractor()
-            self.cache = {
-                'embeddings': {},
-                'search_results': {},
-                'answers': {}
-            }
-            self.max_cache_size = 1000
-            self.cache_ttl = 3600  # 1시간 캐시 유지
+            self.reranker = get_reranker() if model_registry.is_enabled("crossencoder") else None
+
+    async def rerank(self, split_query: str, documents_json: List[Dict[str, Any]], idx: int = 0) -> List[Dict[str, Any]]:
+        """재정렬기가 켜져 있으면 상위 RERANK_TOP_K개 문서만 남긴다. (CPU 추론은 스레드에서 실행)"""
+        if self.reranker is None or not documents_json:
+            return documents_json
+        start = time.perf_counter()
+        reranked = await asyncio.to_thread(self.reranker.rerank, split_query, documents_json, RERANK_TOP_K)
+        log_stage(logger, "rerank", worker=idx, documents=len(documents_json), top_k=len(reranked), ms=(time.perf_counter() - start) * 1000)
+        return reranked
+
+    async def retrieve(self, split_query: str, idx: int = 0) -> List[Dict[str, Any]]:
+        """키워드 추출과 임베딩을 동시에 수행한 뒤 하이브리드 검색 결과를 JSON 형식으로 반환"""
+        # Extract keywords using OpenAI
+        task_extract = self.keyword_processor_openai.extract_keywords(split_query)
+        task_embedding = self.embedding_processor.get_embedding(split_query)
+        results = await asyncio.gather(task_extract, task_embedding)
+        openai_keywords = results[0]
+        embedding = results[1]
+        
+        log_stage(logger, "keywords", worker=idx, keywords=openai_keywords)
+        documents = await self.search_processor.hybrid_search(" ".join(openai_keywords), embedding, k=k)
+
+        log_stage(logger, "retrieve", worker=idx, documents=len(documents))
+        # reranked_docs = reranker_ranking(documents, split_query, k=3)
+        return [doc.to_json() for doc in documents]
 
-    async def process_question(self, query_idx: Tuple[int, str]) -> Tuple[int, Optional[str]]:
+    async def retrieve_many(self, split_queries: List[str]) -> List[Optional[List[Dict[str, Any]]]]:
+        """
+        여러 하위 질문의 키워드와 임베딩을 각각 한 번의 API 호출로 구한 뒤 한 번의 _msearch로 검색합니다.
+        하위 질문 N개에 대해 2N번이던 키워드/임베딩 호출이 2번, N번이던 검색 요청이 1번으로 줄어듭니다.
+        검색이 실패한 하위 질문은 None으로 반환합니다. (process_question이 질문별로 다시 검색)
+        """
+        keywords_list, embeddings = await asyncio.gather(
+            self.keyword_processor_openai.extract_keywords_batch(split_queries),
+            self.embedding_processor.get_embeddings(split_queries),
+        )
+        log_stage(logger, "keywords.batch", questions=len(split_queries), keywords=keywords_list)
+        # 하위 질문 검색은 _msearch 한 번으로 보낸다.
+        results = await self.search_processor.hybrid_search_many(
+            [" ".join(keywords) for keywords in keywords_list], embeddings, k=k
+        )
+        log_stage(logger, "retrieve.batch", documents=[None if documents is None else len(documents) for documents in results])
+        return [None if documents is None else [doc.to_json() for doc in documents] for documents in results]
+
+    async def process_question(self, query_idx: Tuple[int, str], documents_json: Optional[List[Dict[str, Any]]] = None) -> Tuple[int, Optional[str]]:
         """Process a single question using pre-initialized processors"""
         idx, split_query = query_idx
         try:
             # Measure total processing time
             start_time = time.time()
             
-            # Extract keywords using OpenAI
-            task_extract = self.keyword_processor_openai.extract_keywords(split_query)
-            task_embedding = self.embedding_processor.get_embedding(split_query)
-            results = await asyncio.gather(task_extract, task_embedding)
-            openai_keywords = results[0]
-            embedding = results[1]
-            
-            logger.info(f"[Worker-{idx}] Extracted OpenAI keywords: {openai_keywords}")        
-            documents = self.search_processor.hybrid_search(" ".join(openai_keywords), embedding, k=k)
-
-            logger.info(f"[Worker-{idx}] Found {len(documents)} documents")
-            if not documents:
+            # 이미 검색된 문서가 있으면 (speculative retrieval) 재사용
+            if documents_json is None:
+                documents_json = await self.retrieve(split_query, idx)
+            if not documents_json:
                 raise Exception("No documents found")
-            # reranked_docs = reranker_ranking(documents, split_query, k=3)
+            documents_json = await self.rerank(split_query, documents_json, idx)
             # Generate answer
             answer_start = time.time()
-            documents_json = [doc.to_json() for doc in documents]
             # prompt = question(reranked_docs, split_query)
             prompt = question_json(documents_json, split_query)
-            logger.info(f"[Worker-{idx}] Generated prompt: {prompt}")
-            answer = self.answer_processor.question(prompt)
+            # 프롬프트는 검색 문서 전체를 포함하므로 샘플링된 요청만 잘라서 기록한다.
+            log_stage(logger, "prompt", sampled=True, worker=idx, chars=len(prompt), prompt=prompt)
+            answer = await self.answer_processor.question(prompt)
             answer_end = time.time()
 
             # Calculate and log timing information
             total_time = time.time() - start_time
             answer_time = answer_end - answer_start
             
-            logger.info(f'[Worker-{idx}] Timing stats: Total={total_time:.2f}s, Answer={answer_time:.2f}s')
-            logger.info(f'[Worker-{idx}] Successfully processed question')
+            log_stage(logger, "answer", worker=idx, total_s=total_time, answer_s=answer_time)
             return idx, answer
             
         except Exception as e:
@@ -98,17 +140,209 @@ class GHQuestionService(QuestionService):
         # self.keyword_processor_bert = KeywordExtractorBERT()
         self.answer_processor = OpenAIAnswerProcessor()
         self.keyword_processor_openai = OpenAIKeywordExtractor()
-        # self.reranker = Reranker()
+        # 표현이 다른 질문에도 이전 답변을 돌려주므로 배포 환경에서 명시적으로 켠 경우에만 사용한다.
+        self.semantic_cache_enabled = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+        self.semantic_cache = SemanticAnswerCache(
+            threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95")),
+            max_entries=int(os.getenv("SEMANTIC_CACHE_SIZE", "1000")),
+            ttl=int(os.getenv("SEMANTIC_CACHE_TTL", "86400")),
+        )
+        # 색인 버전은 매 요청이 아니라 주기적으로만 확인한다.
+        self.corpus_version_check_interval = int(os.getenv("SEMANTIC_CACHE_VERSION_CHECK_INTERVAL", "60"))
+        self._corpus_version_checked_at = float("-inf")
+        # 로컬 규칙 기반 분해의 신뢰도가 임계값보다 낮을 때만 LLM으로 분해한다.
+        # Okt는 생성할 때 JVM을 시작하므로 import 시점이 아니라 처음 사용할 때 (또는 warmup에서) 만든다.
+        self.local_splitter_enabled = os.getenv("LOCAL_SPLITTER_ENABLED", "true").lower() == "true"
+        self._local_splitter = None
+        self._local_splitter_lock = threading.Lock()
+        self.split_confidence_threshold = float(os.getenv("SPLIT_CONFIDENCE_THRESHOLD", "0.7"))
+        # 질문 분해와 동시에 원본 질문으로 검색을 먼저 시작할지 여부
+        self.speculative_retrieval = os.getenv("SPECULATIVE_RETRIEVAL", "true").lower() == "true"
+
+    def _get_local_splitter(self):
+        """로컬 질문 분해기 (처음 호출할 때 생성, 워커 스레드에서 호출)"""
+        if self._local_splitter is None:
+            with self._local_splitter_lock:
+                if self._local_splitter is None:
+                    from gh.question_splitter import RuleBasedQuestionSplitter
+                    self._local_splitter = RuleBasedQuestionSplitter()
+        return self._local_splitter
+
+    def _split_locally(self, user_query: str) -> Tuple[List[str], float]:
+        return self._get_local_splitter().split(user_query)
+
+    async def warmup(self):
+        """로컬 질문 분해기 / 재정렬 모델을 미리 로드해 첫 요청의 로딩 지연을 없앱니다."""
+        if self.local_splitter_enabled:
+            try:
+                await asyncio.to_thread(self._get_local_splitter)
+            except Exception as e:
+                logger.warning(f"Local splitter unavailable, using LLM split only: {e}")
+        reranker = QuestionProcessor().reranker
+        if reranker is not None:
+            # 모델은 model_registry를 거쳐 로드되어 로드 시간 / 메모리가 기록된다.
+            await asyncio.to_thread(reranker.warmup)
+
+    async def close(self):
+        """공유 HTTP 커넥션 풀을 정리합니다."""
+        await self.search_processor.close()
+        await self.answer_processor.client.close()
+
+    async def _refresh_corpus_version(self):
+        """색인 버전이 바뀌었으면 의미 캐시를 무효화합니다."""
+        now = time.monotonic()
+        if now - self._corpus_version_checked_at < self.corpus_version_check_interval:
+            return
+        self._corpus_version_checked_at = now
+        try:
+            version = await self.search_processor.get_corpus_version()
+            self.semantic_cache.set_corpus_version(version)
+        except Exception as e:
+            logger.warning(f"Failed to fetch corpus version: {e}")
+
+    async def lookup_semantic_cache(self, user_query: str) -> Tuple[Optional[str], Optional[List[float]]]:
+        """
+        유사한 이전 질문의 답변을 찾습니다.
+
+        Returns:
+            (캐시된 답변 또는 None, 질문 임베딩)
+        """
+        if not self.semantic_cache_enabled:
+            return None, None
+        try:
+            await self._refresh_corpus_version()
+            embedding = await self.embedding_processor.get_embedding(user_query)
+        except Exception as e:
+            logger.warning(f"Semantic cache lookup skipped: {e}")
+            return None, None
+        found = self.semantic_cache.lookup(embedding)
+        if found is None:
+            return None, embedding
+        entry, score = found
+        log_stage(logger, "semantic_cache.hit", score=score, query=user_query, cached_question=entry.question)
+        return entry.answer, embedding
+
+    def _start_speculative_retrieval(self, user_query: str) -> Optional[asyncio.Future]:
+        """질문 분해 결과를 기다리지 않고 원본 질문으로 검색을 시작합니다."""
+        if not self.speculative_retrieval:
+            return None
+        task = asyncio.ensure_future(QuestionProcessor().retrieve(user_query))
+        # 취소되거나 버려진 작업의 예외가 경고로 남지 않도록 결과를 소비한다.
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return task
+
+    @staticmethod
+    def _cancel_tasks(*tasks: Optional[asyncio.Future]):
+        """끝나지 않은 작업은 취소하고, 이미 끝난 작업의 예외는 소비해서 경고 없이 정리합니다."""
+        for task in tasks:
+            if task is None:
+                continue
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled():
+                task.exception()
+
+    async def _resolve_speculative_retrieval(self, task: Optional[asyncio.Future], split_questions: List[str]) -> Optional[List[Dict[str, Any]]]:
+        """
+        분해 결과가 단일 질문이면 진행 중인 검색 결과를 재사용하고, 아니면 취소합니다.
+
+        Returns:
+            재사용할 문서 리스트 (JSON 형식) 또는 None
+        """
+        if task is None:
+            return None
+        if len(split_questions) != 1:
+            task.cancel()
+            return None
+        try:
+            documents_json = await task
+        except Exception as e:
+            logger.warning(f"Speculative retrieval failed, retrying with split question: {e}")
+            return None
+        logger.info("Reusing speculative retrieval for single question")
+        return documents_json
 
-    def split_question(self, user_query: str) -> List[str]:
-        """복합 질문을 개별 질문으로 분해"""
+    async def _retrieve_split_questions(self, split_questions: List[str], speculative_documents: Optional[List[Dict[str, Any]]]) -> List[Optional[List[Dict[str, Any]]]]:
+        """
+        하위 질문별 검색 결과를 반환합니다.
+        단일 질문은 speculative retrieval 결과를, 여러 질문은 일괄(batch) 검색 결과를 사용합니다.
+        일괄 검색 전체 또는 일부 질문의 검색이 실패하면 None을 채워 하위 질문별로 다시 검색하도록 합니다.
+        """
+        if speculative_documents is not None:
+            return [speculative_documents]
+        if len(split_questions) == 1:
+            return [None]
+        try:
+            return await QuestionProcessor().retrieve_many(split_questions)
+        except Exception as e:
+            logger.warning(f"Batch retrieval failed, retrieving per question: {e}")
+            return [None] * len(split_questions)
+
+    async def split_question_local(self, user_query: str) -> Optional[List[str]]:
+        """로컬 규칙으로 분해 (신뢰도가 임계값보다 낮거나 실패하면 None)"""
+        if not self.local_splitter_enabled:
+            return None
+        try:
+            # 형태소 분석(Okt)은 동기 호출이라 이벤트 루프를 막지 않도록 스레드에서 실행한다.
+            split_questions, confidence = await asyncio.to_thread(self._split_locally, user_query)
+        except Exception as e:
+            logger.warning(f"Local split failed, falling back to LLM: {e}")
+            return None
+        if confidence >= self.split_confidence_threshold:
+            log_stage(logger, "split.local", confidence=confidence, questions=len(split_questions))
+            return split_questions
+        log_stage(logger, "split.fallback", confidence=confidence)
+        return None
+
+    async def split_question(self, user_query: str) -> List[str]:
+        """복합 질문을 개별 질문으로 분해 (로컬 규칙 우선, 신뢰도가 낮으면 LLM)"""
+        split_questions = await self.split_question_local(user_query)
+        if split_questions is not None:
+            return split_questions
+        return await self.split_question_llm(user_query)
+
+    async def _split_with_speculation(self, user_query: str, timings: Dict[str, float]) -> Tuple[List[str], Optional[asyncio.Future]]:
+        """
+        질문을 분해하고, LLM 분해를 기다리는 동안에만 원본 질문으로 검색을 먼저 시작합니다.
+        (로컬 분해가 확정되면 바로 하위 질문으로 검색하므로 speculative retrieval을 시작하지 않는다)
+
+        Returns:
+            (하위 질문 리스트, 단일 질문일 때 진행 중인 speculative retrieval 작업 또는 None)
+        """
+        start_time = time.time()
+        split_questions = await self.split_question_local(user_query)
+        speculative_task = None
+        if split_questions is None:
+            speculative_task = self._start_speculative_retrieval(user_query)
+            try:
+                split_questions = await self.split_question_llm(user_query)
+            except BaseException:
+                # 분해 실패 / 요청 취소 시 검색 작업이 남지 않도록 한다.
+                self._cancel_tasks(speculative_task)
+                raise
+        timings['split_question'] = time.time() - start_time
+        if speculative_task is not None and len(split_questions) != 1:
+            # 여러 질문으로 분해되면 원본 질문 검색은 쓰지 않으므로 바로 취소한다.
+            self._cancel_tasks(speculative_task)
+            speculative_task = None
+        return split_questions, speculative_task
+
+    async def split_question_llm(self, user_query: str) -> List[str]:
+        """LLM(o4-mini)으로 복합 질문을 개별 질문으로 분해"""
         split_prompt = split_complex_question(user_query)
-        split_answer = self.answer_processor.question(split_prompt)
+        split_answer = await self.answer_processor.question(split_prompt)
         split_answer = split_answer.replace("복합 질문", "").replace("분해된 질문", "").replace(":", "")
         
         split_answer = user_query if (split_answer.strip() == "") else split_answer
         split_questions = []
         if split_answer:
+            try:
+                # 예시와 같은 JSON 리스트 형식이면 그대로 파싱해 질문 안의 쉼표를 보존한다.
+                parsed = json.loads(split_answer.strip())
+                if isinstance(parsed, list):
+                    return [str(q).strip() for q in parsed if str(q).strip()]
+            except ValueError:
+                pass
             try:
                 questions_text = split_answer.strip('[]').replace('"', '').split(',')
                 split_questions = [q.strip() for q in questions_text if q.strip()]
@@ -155,7 +389,7 @@ class GHQuestionService(QuestionService):
         embedding = results[1]
         
         logger.info(f"Extracted OpenAI keywords: {openai_keywords}")        
-        documents = self.search_processor.hybrid_search(" ".join(openai_keywords), embedding, k=k)
+        documents = await self.search_processor.hybrid_search(" ".join(openai_keywords), embedding, k=k)
         logger.info(" found {} documents before reranking".format(len(documents)))
         
         if not documents:
@@ -163,17 +397,17 @@ class GHQuestionService(QuestionService):
             
         # 재정렬 적용
         documents_json = [doc.to_json() for doc in documents]
-        # reranked_docs = reranker_ranking(documents, user_query, k=20)
-
-        return documents_json
+        return await QuestionProcessor().rerank(user_query, documents_json)
 
     async def search_documents_with_split(self, user_query: str) -> List[Dict[str, Any]]:
-        split_questions = self.split_question(user_query)
+        split_questions = await self.split_question(user_query)
         logger.info("split_questions: {}".format(len(split_questions)))
         doc_count = 0
         documents = []
-        for split_question in split_questions:
-            docs = await self.search_documents(split_question)
+        results = await QuestionProcessor().retrieve_many(split_questions) if split_questions else []
+        for split_question, docs in zip(split_questions, results):
+            if docs is None:
+                docs = await QuestionProcessor().retrieve(split_question)
             documents.append(
                 {
                     "question": split_question,
@@ -217,72 +451,71 @@ class GHQuestionService(QuestionService):
         # return reordered_documents
         return documents
 
-    def generate_answer(self, user_query: str, documents: List[Dict[str, Any]]) -> str:
+    async def generate_answer(self, user_query: str, documents: List[Dict[str, Any]]) -> str:
         """검색 결과를 바탕으로 답변 생성"""
         last_question = question_json(documents, user_query)
-        return self.answer_processor.question(last_question)
+        return await self.answer_processor.question(last_question)
 
-    def process_question(self, user_query: str) -> Dict[str, str]:
+    async def process_question(self, user_query: str) -> Dict[str, str]:
         """전체 질문 처리 파이프라인"""
+        split_task = speculative_task = None
         try:
 
             # Initialize timing dictionary
             timings = {}
+            pipeline_start = time.time()
             
-            # STEP 01: 질문 분해
-            start_time = time.time()
-            split_questions = self.split_question(user_query)
-            timings['split_question'] = time.time() - start_time
+            # STEP 00: 의미 캐시 조회 (질문 분해와 동시에 진행)
+            split_task = asyncio.ensure_future(self._split_with_speculation(user_query, timings))
+            cached_answer, query_embedding = await self.lookup_semantic_cache(user_query)
+            timings['semantic_cache'] = time.time() - pipeline_start
+            if cached_answer is not None:
+                self._cancel_tasks(split_task)
+                return {"question": user_query, "answer": cached_answer}
+
+            # STEP 01: 질문 분해 (시간은 _split_with_speculation에서 따로 기록)
+            split_questions, speculative_task = await split_task
+            speculative_documents = await self._resolve_speculative_retrieval(speculative_task, split_questions)
             
             if not split_questions:
                 return {"question": user_query, "answer": "죄송합니다. 질문을 이해하지 못했습니다."}
                 
-            logger.info(f"Processing {len(split_questions)} questions in parallel")
-            
-            # Process questions in parallel
+            # Process questions concurrently on the running event loop
             answers = [None] * len(split_questions)
             
             # Prepare the work items
             work_items = [(i, q) for i, q in enumerate(split_questions)]
             
-            # Use ThreadPoolExecutor instead of ProcessPoolExecutor to avoid pickling issues
             start_time = time.time()
-            
-            # Create a ThreadPoolExecutor
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                # Initialize a QuestionProcessor instance
-                processor = QuestionProcessor()
-                
-                # Create a wrapper function to handle async execution
-                def process_question_wrapper(query_idx):
-                    return asyncio.run(processor.process_question(query_idx))
-                
-                # Submit all tasks
-                futures = [executor.submit(process_question_wrapper, item) for item in work_items]
-                
-                # Process results as they complete
-                for future in concurrent.futures.as_completed(futures):
-                    try:
-                        idx, answer = future.result()
-                        if answer is not None:
-                            answers[idx] = answer
-                            logger.info(f"Successfully processed question {idx}")
-                    except Exception as e:
-                        logger.error(f"Error processing question: {str(e)}", exc_info=True)
+            processor = QuestionProcessor()
+            documents_per_question = await self._retrieve_split_questions(split_questions, speculative_documents)
+            results = await asyncio.gather(
+                *(processor.process_question(item, documents_per_question[item[0]]) for item in work_items),
+                return_exceptions=True
+            )
+            for result in results:
+                if isinstance(result, BaseException):
+                    logger.error(f"Error processing question: {str(result)}", exc_info=result)
+                    continue
+                idx, answer = result
+                if answer is not None:
+                    answers[idx] = answer
             timings['parallel_processing'] = time.time() - start_time
             
             # Combine answers
             if len(answers) > 1:
                 combined_prompt = summary_answers(split_questions, answers)
-                final_answer = self.answer_processor.question(combined_prompt)
+                final_answer = await self.answer_processor.question(combined_prompt)
             else:
                 final_answer = answers[0] if answers[0] else "죄송합니다. 답변을 생성하지 못했습니다."
             
             # Log timing information
-            total_time = time.time() - start_time
-            timings['total'] = total_time
-            logger.info(f"Total processing time: {total_time:.2f}s")
-            logger.info(f"Timings: {timings}")
+            timings['total'] = time.time() - pipeline_start
+            log_stage(logger, "pipeline", questions=len(split_questions), **{name + "_s": value for name, value in timings.items()})
+
+            # 모든 하위 질문에 답변한 경우에만 캐시에 저장
+            if query_embedding is not None and all(answer is not None for answer in answers):
+                self.semantic_cache.add(user_query, query_embedding, final_answer)
         
             return {"question": user_query, "answer": final_answer}
         except Exception as e:
@@ -290,4 +523,83 @@ class GHQuestionService(QuestionService):
             return {
                 "question": user_query, 
                 "answer": "죄송합니다. 답변을 생성하는 중에 오류가 발생했습니다."
-            }
\ No newline at end of file
+            }
+        finally:
+            # 의미 캐시 조회나 질문 분해가 실패해도 먼저 시작한 작업이 남지 않도록 한다.
+            self._cancel_tasks(split_task, speculative_task)
+
+    async def process_question_stream(self, user_query: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        전체 질문 처리 파이프라인의 스트리밍 버전
+        질문 분해/검색 단계의 진행 이벤트를 보낸 뒤 최종 답변을 토큰 단위로 전달합니다.
+        """
+        split_task = speculative_task = None
+        sub_tasks = []
+        timings = {}
+        try:
+            # 첫 이벤트는 LLM 호출 전에 바로 보내 응답 시작 시간을 줄인다.
+            yield stream_event(STREAM_CODE_SPLIT, "SPLIT QUESTION")
+            split_task = asyncio.ensure_future(self._split_with_speculation(user_query, timings))
+            cached_answer, query_embedding = await self.lookup_semantic_cache(user_query)
+            if cached_answer is not None:
+                self._cancel_tasks(split_task)
+                yield stream_event(STREAM_CODE_TOKEN, cached_answer)
+                yield stream_event(STREAM_CODE_COMPLETE, "CHAT COMPLETE")
+                return
+
+            split_questions, speculative_task = await split_task
+            yield stream_event(STREAM_CODE_FETCH, {"questions": split_questions})
+            speculative_documents = await self._resolve_speculative_retrieval(speculative_task, split_questions)
+            if not split_questions:
+                yield stream_event(STREAM_CODE_TOKEN, "죄송합니다. 질문을 이해하지 못했습니다.")
+                yield stream_event(STREAM_CODE_COMPLETE, "CHAT COMPLETE")
+                return
+
+            processor = QuestionProcessor()
+            answers = [None] * len(split_questions)
+            if len(split_questions) == 1:
+                # 단일 질문은 하위 답변을 따로 만들지 않고 곧바로 답변 토큰을 흘려보낸다.
+                documents_json = speculative_documents
+                if documents_json is None:
+                    documents_json = await processor.retrieve(split_questions[0])
+                yield stream_event(STREAM_CODE_FETCH, {"question": split_questions[0], "documents": len(documents_json)})
+                if not documents_json:
+                    yield stream_event(STREAM_CODE_TOKEN, "죄송합니다. 답변을 생성하지 못했습니다.")
+                    yield stream_event(STREAM_CODE_COMPLETE, "CHAT COMPLETE")
+                    return
+                answers[0] = ""
+                documents_json = await processor.rerank(split_questions[0], documents_json)
+                prompt = question_json(documents_json, split_questions[0])
+            else:
+                documents_per_question = await self._retrieve_split_questions(split_questions, None)
+                pending = {
+                    asyncio.ensure_future(processor.process_question(item, documents_per_question[item[0]])): item[0]
+                    for item in enumerate(split_questions)
+                }
+                sub_tasks = list(pending)
+                while pending:
+                    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        idx = pending.pop(task)
+                        # process_question의 gather(return_exceptions=True)와 같이 실패한 하위 질문만 답변 없이 진행한다.
+                        try:
+                            _, answers[idx] = task.result()
+                        except Exception as e:
+                            logger.error(f"Error processing question: {str(e)}", exc_info=e)
+                        yield stream_event(STREAM_CODE_FETCH, {"question": split_questions[idx], "answered": answers[idx] is not None})
+                prompt = summary_answers(split_questions, answers)
+
+            final_answer = ""
+            async for chunk_text in self.answer_processor.question_stream(prompt):
+                final_answer += chunk_text
+                yield stream_event(STREAM_CODE_TOKEN, chunk_text)
+
+            if query_embedding is not None and final_answer and all(answer is not None for answer in answers):
+                self.semantic_cache.add(user_query, query_embedding, final_answer)
+            yield stream_event(STREAM_CODE_COMPLETE, "CHAT COMPLETE")
+        except Exception as e:
+            logger.error(f"Error streaming answer: {str(e)}", exc_info=True)
+            yield stream_event("error", "죄송합니다. 답변을 생성하는 중에 오류가 발생했습니다.", event_type="error")
+        finally:
+            # 오류나 클라이언트 연결 종료로 끝나도 먼저 시작한 작업(하위 질문 답변 포함)이 남지 않도록 한다.
+            self._cancel_tasks(split_task, speculative_task, *sub_tasks)
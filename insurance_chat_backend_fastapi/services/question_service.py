@@ -1,30 +1,43 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator
 
 class QuestionService(ABC):
     """질문 처리 서비스의 추상 클래스"""
     
     @abstractmethod
-    def split_question(self, user_query: str) -> List[str]:
+    async def split_question(self, user_query: str) -> List[str]:
         """복합 질문을 개별 질문으로 분해"""
         pass
 
     @abstractmethod
-    def extract_keywords(self, user_query: str) -> Dict[str, List[str]]:
+    async def extract_keywords(self, user_query: str) -> Dict[str, List[str]]:
         """키워드 추출 (규칙 기반 + BERT)"""
         pass
 
     @abstractmethod
-    def search_documents(self, user_query: str) -> List[Dict[str, Any]]:
+    async def search_documents(self, user_query: str) -> List[Dict[str, Any]]:
         """하이브리드 검색 수행"""
         pass
 
     @abstractmethod
-    def generate_answer(self, user_query: str, documents: List[Dict[str, Any]]) -> str:
+    async def generate_answer(self, user_query: str, documents: List[Dict[str, Any]]) -> str:
         """검색 결과를 바탕으로 답변 생성"""
         pass
 
     @abstractmethod
-    def process_question(self, user_query: str) -> Dict[str, str]:
+    async def process_question(self, user_query: str) -> Dict[str, str]:
         """전체 질문 처리 파이프라인"""
-        pass 
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def process_question_stream(self, user_query: str) -> AsyncIterator[Dict[str, Any]]:
+        """전체 질문 처리 파이프라인 (진행 상황과 답변 토큰을 이벤트로 스트리밍)"""
+        pass
+
+    async def warmup(self):
+        """서버 시작 시 모델 로드 등 첫 요청 전에 필요한 준비"""
+        pass
+
+    async def close(self):
+        """서비스가 보유한 외부 커넥션을 정리"""
+        pass
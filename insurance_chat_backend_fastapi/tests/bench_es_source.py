@@ -0,0 +1,84 @@
+"""
+Elasticsearch 응답 크기 / 디코딩 시간 비교 벤치마크
+
+_source 전체(embedding 포함)를 받는 기존 요청과 필요한 필드만 받는 요청을 같은 쿼리로 보내
+응답 바이트 수, JSON 디코딩 시간, SearchResult 변환 시간을 비교합니다.
+    python tests/bench_es_source.py --host http://localhost:9200 --runs 50
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import numpy as np
+import httpx
+
+# Add the project root to PYTHONPATH
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from gh.search import SearchProcessor, SEARCH_FILTER_PATH
+
+DIMENSION = 3072
+
+
+def random_vector(dimension: int) -> list:
+    vector = np.random.rand(dimension).astype(np.float32)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+def measure(client: httpx.Client, url: str, body: dict, params: dict, runs: int) -> dict:
+    sizes, decode_times, parse_times, total_times = [], [], [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        response = client.post(url, json=body, params=params)
+        response.raise_for_status()
+        sizes.append(len(response.content))
+
+        decode_start = time.perf_counter()
+        data = json.loads(response.content)
+        decode_times.append(time.perf_counter() - decode_start)
+
+        parse_start = time.perf_counter()
+        SearchProcessor._parse_hits(data)
+        parse_times.append(time.perf_counter() - parse_start)
+        total_times.append(time.perf_counter() - start)
+    return {
+        "bytes": statistics.median(sizes),
+        "decode_ms": statistics.median(decode_times) * 1000,
+        "parse_ms": statistics.median(parse_times) * 1000,
+        "total_ms": statistics.median(total_times) * 1000,
+    }
+
+
+def run(host: str, query: str, k: int, runs: int):
+    processor = SearchProcessor(host)
+    filtered_body = processor._build_hybrid_query(query, random_vector(DIMENSION), k)
+    # 기존 요청: _source 전체를 받고 filter_path도 사용하지 않는다.
+    full_body = {key: value for key, value in filtered_body.items() if key not in ("_source", "stored_fields")}
+    url = "{}/{}/_search".format(host.rstrip("/"), processor.index_name)
+
+    with httpx.Client(timeout=30) as client:
+        measure(client, url, full_body, {}, 3)  # 워밍업
+        full = measure(client, url, full_body, {}, runs)
+        filtered = measure(client, url, filtered_body, {"filter_path": ",".join(SEARCH_FILTER_PATH)}, runs)
+
+    print("================================================")
+    print(f"index: {processor.index_name}, k={k}, runs={runs}")
+    print(f"{'':10}{'bytes':>12}{'decode(ms)':>12}{'parse(ms)':>12}{'total(ms)':>12}")
+    for name, result in (("full", full), ("filtered", filtered)):
+        print(f"{name:10}{result['bytes']:>12.0f}{result['decode_ms']:>12.2f}{result['parse_ms']:>12.3f}{result['total_ms']:>12.2f}")
+    print(f"response size reduced by {(1 - filtered['bytes'] / full['bytes']) * 100:.1f}%")
+    print("================================================")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default=os.getenv("ES_HOST", "http://localhost:9200"))
+    parser.add_argument("--query", default="암 진단 시 보험금 지급 조건")
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+    run(args.host, args.query, args.k, args.runs)
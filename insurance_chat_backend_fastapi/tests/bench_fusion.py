@@ -0,0 +1,89 @@
+"""
+hybrid search fusion 방식 비교 벤치마크 (sum / rrf / linear)
+
+kbh/evaluation/evaLretriever/result/dataset.csv의 LLM 관련도 평가(relevance_score)를 정답으로
+fusion 방식과 k별 nDCG@k와 question_json 프롬프트 길이를 측정합니다.
+평가셋에 없는 문서는 관련도 0으로 계산하므로 절대값보다 방식 간 비교에 사용합니다.
+    python tests/bench_fusion.py --ks 5 10 20
+"""
+import os
+import sys
+import csv
+import ast
+import asyncio
+import argparse
+import statistics
+from collections import defaultdict
+
+# Add the project root to PYTHONPATH
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+sys.path.append(os.path.join(os.path.dirname(project_root), "scripts"))
+
+from evaluation.score_function import dcg_at_k
+from embedding import GoogleEmbeddingProcessor
+from gh.search import SearchProcessor
+from gh.prompts import question_json
+from gh.openai_keyword_extractor import OpenAIKeywordExtractor
+
+DATASET_PATH = os.path.join(project_root, "kbh", "evaluation", "evaLretriever", "result", "dataset.csv")
+METHODS = ["sum", "rrf", "linear"]
+
+
+def document_key(article_title: str, content: str) -> tuple:
+    return article_title.strip(), content.strip()[:200]
+
+
+def load_relevances(path: str) -> dict:
+    """질문별 {(조문제목, 조문내용 앞부분): 관련도}"""
+    relevances = defaultdict(dict)
+    with open(path, encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            document = ast.literal_eval(row["document"])
+            key = document_key(document["조문제목"], document["조문내용"])
+            relevances[row["query"]][key] = float(row["relevance_score"])
+    return relevances
+
+
+async def run(args):
+    relevances = load_relevances(args.dataset)
+    queries = list(relevances)
+    keyword_extractor = OpenAIKeywordExtractor()
+    keywords_list = await keyword_extractor.extract_keywords_batch(queries)
+    embeddings = await GoogleEmbeddingProcessor().get_embeddings(queries)
+    processor = SearchProcessor(args.es_host)
+
+    ndcgs = defaultdict(list)
+    prompt_lengths = defaultdict(list)
+    try:
+        for query, keywords, embedding in zip(queries, keywords_list, embeddings):
+            labels = relevances[query]
+            ideal = sorted(labels.values(), reverse=True)
+            for method in METHODS:
+                processor.fusion_method = method
+                for k in args.ks:
+                    results = await processor.hybrid_search(" ".join(keywords), embedding, k=k)
+                    found = [labels.get(document_key(r.article_title, r.content), 0.0) for r in results]
+                    # 평가셋의 관련 문서를 관련도 순으로 모두 찾은 경우를 이상적인 순위로 본다.
+                    idcg = dcg_at_k(ideal, k)
+                    ndcgs[(method, k)].append(dcg_at_k(found, k) / idcg if idcg > 0 else 0.0)
+                    prompt_lengths[(method, k)].append(len(question_json([r.to_json() for r in results], query)))
+    finally:
+        await processor.close()
+
+    print("================================================")
+    print(f"queries: {len(queries)}")
+    print(f"{'method':8}{'k':>4}{'nDCG@k':>10}{'prompt chars':>14}")
+    for method in METHODS:
+        for k in args.ks:
+            print(f"{method:8}{k:>4}{statistics.mean(ndcgs[(method, k)]):>10.3f}{statistics.mean(prompt_lengths[(method, k)]):>14.0f}")
+    print("================================================")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--es-host", default=os.getenv("ES_HOST", "http://localhost:9200"))
+    parser.add_argument("--dataset", default=DATASET_PATH)
+    parser.add_argument("--ks", type=int, nargs="+", default=[5, 10, 20])
+    asyncio.run(run(parser.parse_args()))
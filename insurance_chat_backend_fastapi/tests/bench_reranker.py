@@ -0,0 +1,112 @@
+"""
+로컬 cross-encoder 재정렬 CPU 지연 시간 벤치마크 (backend / max_length / batch_size별)
+
+kbh/evaluation/evaLretriever/result/dataset.csv의 질문별 검색 문서 20개를 재정렬하는 시간(p50/p95)과
+LLM 관련도 평가(relevance_score) 기준 nDCG@k를 검색 순서(rank)와 비교합니다.
+    python tests/bench_reranker.py --max-lengths 256 384 512 --batch-sizes 8 16 32
+    python tests/bench_reranker.py --export-int8 ./models/reranker-onnx   # int8 ONNX 모델을 만들어 함께 비교
+"""
+import os
+import sys
+import csv
+import ast
+import json
+import time
+import argparse
+import statistics
+from collections import defaultdict
+
+import torch
+
+# Add the project root to PYTHONPATH
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+sys.path.append(os.path.join(os.path.dirname(project_root), "scripts"))
+
+from evaluation.score_function import dcg_at_k
+from gh.reranker_crossencoder import Reranker, DEFAULT_MODEL_NAME, document_text, export_onnx_int8
+
+DATASET_PATH = os.path.join(project_root, "kbh", "evaluation", "evaLretriever", "result", "dataset.csv")
+
+
+def load_dataset(path: str) -> dict:
+    """질문별 검색 순서대로 (문서 JSON 문자열, 관련도)"""
+    rows = defaultdict(list)
+    with open(path, encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            document = ast.literal_eval(row["document"])
+            rows[row["query"]].append((int(row["rank"]), json.dumps(document, ensure_ascii=False), float(row["relevance_score"])))
+    return {query: [(document, relevance) for _, document, relevance in sorted(items)] for query, items in rows.items()}
+
+
+def ndcg(relevances: list, k: int) -> float:
+    idcg = dcg_at_k(sorted(relevances, reverse=True), k)
+    return dcg_at_k(relevances, k) / idcg if idcg > 0 else 0.0
+
+
+def percentile(values: list, q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def run(args):
+    dataset = load_dataset(args.dataset)
+    lengths = [len(document_text(document)) for items in dataset.values() for document, _ in items]
+    print("================================================")
+    print(f"queries: {len(dataset)}, documents/query: {max(len(items) for items in dataset.values())}, torch threads: {torch.get_num_threads()}")
+    print("document chars p50/p90/p99: " + "/".join(str(percentile(lengths, q)) for q in (0.5, 0.9, 0.99)))
+    baseline = {k: statistics.mean(ndcg([relevance for _, relevance in items], k) for items in dataset.values()) for k in args.ks}
+    print("retrieval order " + " ".join(f"nDCG@{k}={baseline[k]:.3f}" for k in args.ks))
+
+    backends = [("torch", None, args.model)]
+    if args.onnx:
+        backends.append(("onnx", None, args.model))
+    if args.export_int8:
+        onnx_file = export_onnx_int8(args.model, args.export_int8, args.quantization_config)
+        backends.append(("onnx", onnx_file, args.export_int8))
+
+    print(f"{'backend':24}{'max_len':>8}{'batch':>6}{'load(s)':>9}{'warmup(s)':>10}{'p50(ms)':>9}{'p95(ms)':>9}" + "".join(f"{'nDCG@' + str(k):>9}" for k in args.ks))
+    for backend, onnx_file, model_name in backends:
+        for max_length in args.max_lengths:
+            for batch_size in args.batch_sizes:
+                reranker = Reranker(model_name, backend=backend, onnx_file=onnx_file, max_length=max_length, batch_size=batch_size)
+                start = time.perf_counter()
+                reranker.model
+                load_time = time.perf_counter() - start
+                warmup_time = reranker.warmup()
+
+                times = []
+                ndcgs = defaultdict(list)
+                for query, items in dataset.items():
+                    documents = [document for document, _ in items]
+                    start = time.perf_counter()
+                    scores = reranker.score(query, documents)
+                    times.append(time.perf_counter() - start)
+                    reranked = [items[i][1] for i in sorted(range(len(items)), key=lambda i: -scores[i])]
+                    for k in args.ks:
+                        ndcgs[k].append(ndcg(reranked, k))
+                name = backend if onnx_file is None else f"{backend}-int8"
+                print(
+                    f"{name:24}{max_length:>8}{batch_size:>6}{load_time:>9.2f}{warmup_time:>10.2f}"
+                    f"{statistics.median(times) * 1000:>9.1f}{percentile(times, 0.95) * 1000:>9.1f}"
+                    + "".join(f"{statistics.mean(ndcgs[k]):>9.3f}" for k in args.ks)
+                )
+    print("================================================")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dataset", default=DATASET_PATH)
+    parser.add_argument("--model", default=DEFAULT_MODEL_NAME)
+    parser.add_argument("--max-lengths", type=int, nargs="+", default=[256, 384, 512])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[16])
+    parser.add_argument("--ks", type=int, nargs="+", default=[3, 5])
+    parser.add_argument("--onnx", action="store_true", help="fp32 ONNX backend도 비교")
+    parser.add_argument("--export-int8", default=None, help="int8 양자화 ONNX 모델을 저장할 디렉터리 (지정하면 함께 비교)")
+    parser.add_argument("--quantization-config", default="avx512_vnni", choices=["arm64", "avx2", "avx512", "avx512_vnni"])
+    parser.add_argument("--threads", type=int, default=None, help="torch CPU 스레드 수")
+    args = parser.parse_args()
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    run(args)
@@ -0,0 +1,112 @@
+"""
+Elasticsearch 단독 hybrid search와 FAISS(kNN) + ES(BM25) RRF 검색의 지연 시간 / 재현율 비교 벤치마크
+
+scripts/evaluation/queries.py의 질문을 임베딩한 뒤
+  - kNN 재현율: ES의 정확한 코사인 유사도(script_score) top-k 대비 FAISS / ES kNN 결과의 recall@k
+  - 지연 시간: hybrid_search 한 번의 p50 / p95 (ES 단독 vs FAISS + BM25 RRF)
+를 측정합니다.
+    python tests/bench_retriever.py --faiss-index data/faiss/insurance.index --k 20
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+
+# Add the project root to PYTHONPATH
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+sys.path.append(os.path.join(os.path.dirname(project_root), "scripts"))
+
+from evaluation.queries import queries
+from embedding import GoogleEmbeddingProcessor
+from gh.search import SearchProcessor
+from gh.retriever import FaissVectorRetriever
+
+
+async def exact_knn_ids(processor: SearchProcessor, embedding: list, k: int) -> list:
+    """brute-force 코사인 유사도 top-k (재현율 기준값)"""
+    response = await processor.es.search(
+        index=processor.index_name,
+        size=k,
+        _source=False,
+        query={
+            "script_score": {
+                "query": {"match_all": {}},
+                "script": {
+                    "source": "cosineSimilarity(params.query_vector, 'embedding') + 1.0",
+                    "params": {"query_vector": embedding},
+                },
+            }
+        },
+    )
+    return [hit["_id"] for hit in response["hits"]["hits"]]
+
+
+async def es_knn_ids(processor: SearchProcessor, embedding: list, k: int) -> list:
+    response = await processor.es.search(
+        index=processor.index_name,
+        size=k,
+        _source=False,
+        knn={"field": "embedding", "query_vector": embedding, "k": k, "num_candidates": max(100, k * 5)},
+    )
+    return [hit["_id"] for hit in response["hits"]["hits"]]
+
+
+async def timed_search(processor: SearchProcessor, query: str, embedding: list, k: int, runs: int) -> list:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await processor.hybrid_search(query, embedding, k=k)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def recall(found: list, expected: list) -> float:
+    return len(set(found) & set(expected)) / len(expected) if expected else 0.0
+
+
+def percentile(values: list, q: float) -> float:
+    return sorted(values)[min(len(values) - 1, int(len(values) * q))] * 1000
+
+
+async def run(args):
+    embeddings = await GoogleEmbeddingProcessor().get_embeddings(queries)
+    processor = SearchProcessor(args.es_host)
+    faiss_retriever = FaissVectorRetriever(args.faiss_index, ef_search=args.ef_search)
+
+    es_recalls, faiss_recalls = [], []
+    es_times, faiss_times = [], []
+    try:
+        for idx, (query, embedding) in enumerate(zip(queries, embeddings)):
+            expected = await exact_knn_ids(processor, embedding, args.k)
+            es_recalls.append(recall(await es_knn_ids(processor, embedding, args.k), expected))
+            faiss_hits = await faiss_retriever.search(embedding, args.k)
+            faiss_recalls.append(recall([hit["_id"] for hit in faiss_hits], expected))
+
+            processor.vector_retriever = None
+            es_times.extend(await timed_search(processor, query, embedding, args.k, args.runs))
+            processor.vector_retriever = faiss_retriever
+            faiss_times.extend(await timed_search(processor, query, embedding, args.k, args.runs))
+            print(f"[{idx}] recall@{args.k} es_knn={es_recalls[-1]:.2f} faiss={faiss_recalls[-1]:.2f}")
+    finally:
+        await processor.close()
+
+    print("================================================")
+    print(f"queries: {len(queries)}, k={args.k}, runs={args.runs}, efSearch={args.ef_search}")
+    print(f"kNN recall@{args.k}  es={statistics.mean(es_recalls):.3f}  faiss={statistics.mean(faiss_recalls):.3f}")
+    print(f"ES BM25 + kNN    p50={percentile(es_times, 0.5):.1f}ms p95={percentile(es_times, 0.95):.1f}ms")
+    print(f"FAISS + BM25 RRF p50={percentile(faiss_times, 0.5):.1f}ms p95={percentile(faiss_times, 0.95):.1f}ms")
+    print("================================================")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--es-host", default=os.getenv("ES_HOST", "http://localhost:9200"))
+    parser.add_argument("--faiss-index", default=os.getenv("FAISS_INDEX_PATH"), required=os.getenv("FAISS_INDEX_PATH") is None)
+    parser.add_argument("--ef-search", type=int, default=int(os.getenv("FAISS_EF_SEARCH", "64")))
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=5)
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,87 @@
+"""
+로컬 규칙 기반 질문 분해기와 LLM 분해 비교 벤치마크
+
+scripts/evaluation/queries.py의 질문으로 두 분해기의 지연 시간과 분해 결과 일치도를 측정합니다.
+    python tests/bench_split.py            # 로컬 + LLM 비교
+    python tests/bench_split.py --local    # 로컬 분해기만 측정 (API 호출 없음)
+"""
+import os
+import re
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+
+# Add the project root to PYTHONPATH
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+sys.path.append(os.path.join(os.path.dirname(project_root), "scripts"))
+
+from evaluation.queries import queries
+from gh.question_splitter import RuleBasedQuestionSplitter
+
+
+def tokens(text: str) -> set:
+    return set(re.findall(r"[\w가-힣]+", text))
+
+
+def agreement(local: list, llm: list) -> float:
+    """LLM 분해 결과의 각 질문과 가장 많이 겹치는 로컬 질문의 토큰 Jaccard 평균"""
+    if not local or not llm:
+        return 0.0
+    scores = []
+    for llm_question in llm:
+        llm_tokens = tokens(llm_question)
+        scores.append(max(
+            len(llm_tokens & tokens(q)) / len(llm_tokens | tokens(q)) if llm_tokens | tokens(q) else 0.0
+            for q in local
+        ))
+    return sum(scores) / len(scores)
+
+
+async def run(local_only: bool, threshold: float):
+    splitter = RuleBasedQuestionSplitter()
+    splitter.split("워밍업 질문입니다.")  # Okt(JVM) 초기화 비용 제외
+
+    service = None
+    if not local_only:
+        from services.gh_question_service import GHQuestionService
+        service = GHQuestionService()
+
+    local_times, llm_times = [], []
+    count_matches, agreements, accepted = 0, [], 0
+    for idx, query in enumerate(queries):
+        start = time.perf_counter()
+        local_questions, confidence = splitter.split(query)
+        local_times.append(time.perf_counter() - start)
+        accepted += confidence >= threshold
+
+        print(f"[{idx}] confidence={confidence:.2f} local={len(local_questions)}  {query[:40]}...")
+        if service is None:
+            continue
+
+        start = time.perf_counter()
+        llm_questions = await service.split_question_llm(query)
+        llm_times.append(time.perf_counter() - start)
+        count_matches += len(local_questions) == len(llm_questions)
+        agreements.append(agreement(local_questions, llm_questions))
+        print(f"     llm={len(llm_questions)} agreement={agreements[-1]:.2f}")
+
+    print("================================================")
+    print(f"queries: {len(queries)}, accepted locally (>= {threshold}): {accepted}")
+    print(f"local split  p50={statistics.median(local_times) * 1000:.2f}ms max={max(local_times) * 1000:.2f}ms")
+    if llm_times:
+        print(f"llm split    p50={statistics.median(llm_times) * 1000:.0f}ms max={max(llm_times) * 1000:.0f}ms")
+        print(f"same question count: {count_matches}/{len(queries)}")
+        print(f"mean agreement (token jaccard): {sum(agreements) / len(agreements):.2f}")
+    print("================================================")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--local", action="store_true", help="로컬 분해기만 측정")
+    parser.add_argument("--threshold", type=float, default=float(os.getenv("SPLIT_CONFIDENCE_THRESHOLD", "0.7")))
+    args = parser.parse_args()
+    asyncio.run(run(args.local, args.threshold))
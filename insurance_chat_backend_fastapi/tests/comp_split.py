@@ -13,14 +13,14 @@ g = GHQuestionService()
 q = "보험료 미납이 인정되는 면책 기간이나 사유가 있는지 알려주세요. 그리고 미납으로 인해 계약이 실효된 경우, 다시 부활이 가능한지 알려주세요. 부활시 불이익이 있다면 알려주세요."
 async def normal():
     documents = await g.search_documents(q)
-    return g.generate_answer(q, documents)
+    return await g.generate_answer(q, documents)
 
-def split():
-    return g.process_question(q)
+async def split():
+    return await g.process_question(q)
 
 if __name__ == '__main__':
     #print(asyncio.run(normal()))
-    print(split())
+    print(asyncio.run(split()))
 nornal_answer = """
 보험료 미납 시 적용되는 절차와 해지·부활 관련 주요 사항은 NH농협생명 암보험(주계약) 약관에서 공통적으로 다음과 같습니다.
 
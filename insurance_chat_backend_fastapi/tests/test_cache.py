@@ -0,0 +1,65 @@
+import time
+import asyncio
+from gh.cache import LRUTTLCache, normalize_query
+
+
+def test_normalize_query():
+    """공백, 대소문자, 끝 문장부호 차이는 같은 키로 정규화"""
+    assert normalize_query("  암보험  가입 조건이 어떻게 되나요? ") == normalize_query("암보험 가입 조건이 어떻게 되나요")
+    assert normalize_query("NH암보험!!") == "nh암보험"
+
+
+def test_lru_eviction():
+    """최대 크기를 넘으면 가장 오래 사용하지 않은 항목부터 제거"""
+    cache = LRUTTLCache(max_size=2, ttl=60)
+    cache.set("a", [1.0])
+    cache.set("b", [2.0])
+    assert cache.get("a") == [1.0]
+    cache.set("c", [3.0])
+    assert cache.get("b") is None
+    assert cache.get("a") == [1.0]
+    assert cache.get("c") == [3.0]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_expiry():
+    """TTL이 지난 항목은 미스로 처리"""
+    cache = LRUTTLCache(max_size=10, ttl=0)
+    cache.set("a", [1.0])
+    time.sleep(0.01)
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert stats["hits"] == 0
+    assert stats["misses"] == 1
+
+
+def test_disk_tier(tmp_path):
+    """메모리 캐시가 비어도 디스크 캐시에서 복구"""
+    path = str(tmp_path / "embedding_cache.db")
+    cache = LRUTTLCache(max_size=10, ttl=60, disk_path=path)
+    cache.set("a", [0.1, 0.2])
+    cache.disk.close()
+
+    restarted = LRUTTLCache(max_size=10, ttl=60, disk_path=path)
+    assert restarted.get("a") == [0.1, 0.2]
+    assert restarted.stats()["disk_hits"] == 1
+    assert len(restarted) == 1
+
+
+def test_async_disk_tier_batches_commits(tmp_path):
+    """비동기 경로도 디스크 캐시를 사용하고, 커밋 전 쓰기도 같은 연결에서 읽힌다"""
+    path = str(tmp_path / "embedding_cache.db")
+    cache = LRUTTLCache(max_size=1, ttl=60, disk_path=path)
+
+    async def run():
+        await cache.aset("a", [0.1])
+        await cache.aset("b", [0.2])
+        return await cache.aget("a")
+
+    assert asyncio.run(run()) == [0.1]
+    assert cache.disk._pending == 2
+    assert cache.stats()["disk_hits"] == 1
+    cache.disk.close()
+
+    restarted = LRUTTLCache(max_size=10, ttl=60, disk_path=path)
+    assert restarted.get("b") == [0.2]
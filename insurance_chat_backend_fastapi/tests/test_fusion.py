@@ -0,0 +1,55 @@
+import pytest
+from dataclasses import dataclass
+from gh.fusion import reciprocal_rank_fusion, linear_fusion, fuse
+
+
+@dataclass
+class Hit:
+    """SearchResult와 같은 id / score / content 속성을 가진 테스트용 결과"""
+    id: str
+    score: float
+    content: str = ""
+
+
+def result(doc_id: str, score: float = 1.0, content: str = "") -> Hit:
+    return Hit(id=doc_id, score=score, content=content)
+
+
+def test_rrf_prefers_documents_found_by_both():
+    """두 검색기 모두에서 찾은 문서가 상위로 올라옴"""
+    bm25 = [result("a", 12.0, "bm25"), result("b", 8.0), result("c", 5.0)]
+    knn = [result("a", 0.91), result("d", 0.90), result("c", 0.80)]
+
+    fused = reciprocal_rank_fusion([bm25, knn], k=60)
+    assert [r.id for r in fused] == ["a", "c", "b", "d"]
+    assert fused[0].score == 2 / 61
+    # 먼저 나온 검색기의 결과 객체를 유지하고 원본은 바꾸지 않는다.
+    assert fused[0].content == "bm25"
+    assert bm25[0].score == 12.0
+
+
+def test_rrf_limit_and_empty():
+    assert reciprocal_rank_fusion([[], []]) == []
+    fused = reciprocal_rank_fusion([[result("a"), result("b")], [result("c")]], limit=2)
+    assert len(fused) == 2
+
+
+def test_linear_fusion_normalizes_score_scales():
+    """BM25 점수와 코사인 유사도를 같은 범위로 정규화해 가중합"""
+    bm25 = [result("a", 30.0), result("b", 20.0), result("c", 10.0)]
+    knn = [result("c", 0.9), result("b", 0.85), result("d", 0.8)]
+
+    fused = linear_fusion([bm25, knn], weights=[0.5, 0.5])
+    scores = {r.id: r.score for r in fused}
+    assert scores["a"] == 0.5
+    assert scores["c"] == 0.5
+    assert abs(scores["b"] - 0.5) < 1e-9
+    assert scores["d"] == 0.0
+
+    fused = fuse([bm25, knn], method="linear", weights=[0.2, 0.8], limit=1)
+    assert [r.id for r in fused] == ["c"]
+
+
+def test_fuse_unknown_method():
+    with pytest.raises(ValueError):
+        fuse([[result("a")]], method="max")
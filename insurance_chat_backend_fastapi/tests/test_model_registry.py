@@ -0,0 +1,63 @@
+import threading
+import pytest
+from gh.model_registry import ModelRegistry, parse_model_names
+
+load_count = 0
+
+
+def load_fake_model():
+    global load_count
+    load_count += 1
+    return {"name": "fake", "weights": bytearray(1024)}
+
+
+def test_model_loaded_lazily_once():
+    calls = []
+    registry = ModelRegistry()
+    registry.register("fake", lambda: calls.append(1) or object())
+    assert not registry.is_loaded("fake")
+    assert registry.stats()["models"]["fake"]["loaded"] is False
+
+    threads = [threading.Thread(target=registry.get, args=("fake",)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # 동시에 요청해도 한 번만 로드하고 같은 객체를 공유한다.
+    assert len(calls) == 1
+    assert registry.get("fake") is registry.get("fake")
+    stats = registry.stats()
+    assert stats["models"]["fake"]["loaded"] is True
+    assert stats["models"]["fake"]["load_time_s"] >= 0
+    assert stats["rss_mb"] > 0
+
+
+def test_loader_path_imported_on_first_use():
+    registry = ModelRegistry()
+    registry.register("fake", "tests.test_model_registry:load_fake_model")
+    before = load_count
+    registry.preload(["fake"])
+    registry.get("fake")
+    assert load_count == before + 1
+    assert registry.get("fake")["name"] == "fake"
+
+
+def test_unknown_model_and_preload_names():
+    registry = ModelRegistry()
+    with pytest.raises(KeyError):
+        registry.get("missing")
+    assert parse_model_names(" colbert, crossencoder ,") == ["colbert", "crossencoder"]
+    assert parse_model_names(None) == []
+
+
+def test_disabled_model_not_preloaded():
+    calls = []
+    registry = ModelRegistry()
+    registry.register("fake", lambda: calls.append(1) or object(), enabled=False)
+    registry.preload(["fake"])
+    assert calls == []
+    assert not registry.is_enabled("fake")
+    assert registry.stats()["models"]["fake"]["enabled"] is False
+    with pytest.raises(RuntimeError):
+        registry.get("fake")
@@ -0,0 +1,32 @@
+import numpy as np
+from gh.quantization import truncate_embedding, truncate_embeddings, quantize_int8, quantize_binary, hamming_distances
+
+
+def test_truncate_embedding_renormalizes():
+    """Matryoshka 축소 후 단위 벡터로 다시 정규화"""
+    embedding = [3.0, 4.0, 12.0]
+    truncated = truncate_embedding(embedding, 2)
+    assert np.allclose(truncated, [0.6, 0.8])
+    # 차원이 같거나 0이면 그대로
+    assert truncate_embedding(embedding, 0) is embedding
+    assert truncate_embedding(embedding, 3) is embedding
+
+    vectors = np.asarray([[3.0, 4.0, 1.0], [0.0, 2.0, 5.0]], dtype=np.float32)
+    assert np.allclose(truncate_embeddings(vectors, 2), [[0.6, 0.8], [0.0, 1.0]])
+
+
+def test_quantize_int8_round_trip():
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((50, 64)).astype(np.float32)
+    quantized, scale = quantize_int8(vectors)
+    assert quantized.dtype == np.int8
+    assert np.abs(quantized.astype(np.float32) * scale - vectors).max() <= scale.max() / 2 + 1e-6
+
+
+def test_quantize_binary_hamming():
+    vectors = np.asarray([[0.5, -0.1, 0.2, -0.3, 0.1, 0.1, -0.2, 0.4, 0.3]], dtype=np.float32)
+    bits = quantize_binary(vectors)
+    assert bits.shape == (1, 2)
+    query = quantize_binary(-vectors[0])
+    assert hamming_distances(query, bits).tolist() == [9]
+    assert hamming_distances(quantize_binary(vectors[0]), bits).tolist() == [0]
@@ -0,0 +1,35 @@
+import pytest
+
+pytest.importorskip("konlpy")
+
+from gh.question_splitter import RuleBasedQuestionSplitter
+
+splitter = RuleBasedQuestionSplitter()
+
+
+def test_single_question():
+    """단일 질문은 그대로 높은 신뢰도로 반환"""
+    questions, confidence = splitter.split("보험금을 청구할 수 있는 권리(소멸 시효) 기간은 얼마나되나요?")
+    assert len(questions) == 1
+    assert confidence >= 0.9
+
+
+def test_split_sentences_and_conjunction():
+    """문장 경계와 접속사 '그리고'로 분해"""
+    questions, confidence = splitter.split(
+        "보험료 미납이 인정되는 면책 기간이나 사유가 있는지 알려주세요. 그리고 미납으로 인해 계약이 실효된 경우, 다시 부활이 가능한지 알려주세요."
+    )
+    assert len(questions) == 2
+    assert not questions[1].startswith("그리고")
+
+
+def test_alternative_is_merged():
+    """'아니면'으로 시작하는 대안 질문은 앞 질문에 합침"""
+    questions, _ = splitter.split("동일한 암으로 여러 번 수술받는 경우에도 계속 지급되나요? 아니면 횟수 제한이 있나요?")
+    assert len(questions) == 1
+
+
+def test_anaphora_lowers_confidence():
+    """앞 문장을 가리키는 질문은 LLM으로 넘기도록 신뢰도를 낮춤"""
+    _, confidence = splitter.split("간편 심사 암보험 상품이 많나요? 이런 상품은 보험료에 어떤 차이가 있나요?")
+    assert confidence < 0.7
@@ -0,0 +1,71 @@
+import logging
+import contextvars
+from gh.request_log import redact, start_request, log_stage
+
+
+def test_redact_vector_and_long_text():
+    """임베딩 벡터는 차원 수로, 긴 문자열은 잘라서 기록"""
+    body = {
+        "size": 20,
+        "query": {"knn": {"field": "embedding", "query_vector": [0.1] * 3072, "k": 20}},
+        "prompt": "가" * 500,
+        "keywords": ["암", "진단"],
+    }
+    redacted = redact(body, max_length=10)
+    assert redacted["query"]["knn"]["query_vector"] == "<vector dim=3072>"
+    assert redacted["prompt"].startswith("가" * 10)
+    assert redacted["prompt"].endswith("(+490 chars)")
+    assert redacted["keywords"] == ["암", "진단"]
+    assert len(body["query"]["knn"]["query_vector"]) == 3072
+
+
+def test_sampled_stage_only_logged_when_sampled(caplog):
+    """sampled=True 로그는 샘플링된 요청에서만 기록"""
+    logger = logging.getLogger("test_request_log")
+
+    def run(sample_rate):
+        start_request(sample_rate=sample_rate, request_id="req-1")
+        log_stage(logger, "prompt", sampled=True, prompt="본문")
+        log_stage(logger, "answer", total_s=1.23456)
+
+    with caplog.at_level(logging.INFO, logger="test_request_log"):
+        contextvars.copy_context().run(run, 0.0)
+        messages = [record.getMessage() for record in caplog.records]
+        assert messages == ["stage=answer request_id=req-1 total_s=1.235"]
+
+        caplog.clear()
+        contextvars.copy_context().run(run, 1.0)
+        assert [record.getMessage() for record in caplog.records][0] == "stage=prompt request_id=req-1 prompt=본문"
+
+
+def test_disabled_level_skips_formatting():
+    """로그 레벨이 꺼져 있으면 필드를 문자열로 만들지 않음"""
+    logger = logging.getLogger("test_request_log.disabled")
+    logger.propagate = False
+    messages = []
+
+    class CaptureHandler(logging.Handler):
+        def emit(self, record):
+            messages.append(record.getMessage())
+
+    class CountingField:
+        formatted = 0
+
+        def __str__(self):
+            CountingField.formatted += 1
+            return "field"
+
+    handler = CaptureHandler(level=logging.DEBUG)
+    logger.addHandler(handler)
+    try:
+        logger.setLevel(logging.WARNING)
+        log_stage(logger, "search", body=CountingField())
+        assert CountingField.formatted == 0
+        assert messages == []
+
+        logger.setLevel(logging.INFO)
+        log_stage(logger, "search", body=CountingField())
+        assert CountingField.formatted == 1
+        assert messages == ["stage=search body=field"]
+    finally:
+        logger.removeHandler(handler)
@@ -0,0 +1,64 @@
+import json
+import numpy as np
+from gh.reranker_crossencoder import Reranker, document_text
+
+
+class FakeCrossEncoder:
+    """문서에 질문 단어가 몇 번 나오는지를 점수로 쓰는 가짜 모델"""
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, pairs, batch_size=32, show_progress_bar=False):
+        self.calls.append(list(pairs))
+        return np.asarray([doc.count(query) for query, doc in pairs], dtype=np.float32)
+
+
+def make_reranker(**kwargs) -> Reranker:
+    reranker = Reranker(**kwargs)
+    reranker._model = FakeCrossEncoder()
+    return reranker
+
+
+def test_document_text_formats():
+    search_json = {"title": {"main": "목차", "sub": "약관", "sub_sub": "제1조"}, "content": "내용"}
+    assert document_text(search_json) == "목차 약관 제1조 내용"
+
+    flask_document = {"보험상품명": "암보험", "약관명": "주계약", "조문제목": "제3조", "조문내용": "암의 정의", "페이지번호": 3}
+    assert document_text(flask_document) == "암보험 주계약 제3조 암의 정의"
+    # Flask 백엔드는 문서를 JSON 문자열로 넘긴다.
+    assert document_text(json.dumps(flask_document, ensure_ascii=False)) == "암보험 주계약 제3조 암의 정의"
+    assert document_text("그냥 문자열") == "그냥 문자열"
+
+
+def test_rerank_orders_by_score_and_keeps_format():
+    reranker = make_reranker()
+    documents = [
+        json.dumps({"조문제목": "제1조", "조문내용": "입원"}, ensure_ascii=False),
+        json.dumps({"조문제목": "제2조", "조문내용": "암 진단 암 수술 암"}, ensure_ascii=False),
+        json.dumps({"조문제목": "제3조", "조문내용": "암 진단"}, ensure_ascii=False),
+    ]
+    assert reranker.rerank("암", documents, top_k=2) == [documents[1], documents[2]]
+
+
+def test_score_batches_sorted_by_length_and_truncates():
+    reranker = make_reranker(max_length=4, batch_size=2)
+    documents = [{"content": "암" * 20}, {"content": "암"}, {"content": "암암"}]
+    scores = reranker.score("암", documents)
+
+    # 점수는 입력 순서대로, 문서는 max_length * CHARS_PER_TOKEN(8) 글자로 잘린다. (빈 제목 사이 공백 3글자 포함)
+    assert scores.tolist() == [5, 1, 2]
+    pairs = reranker._model.calls[0]
+    assert [len(doc) for _, doc in pairs] == sorted(len(doc) for _, doc in pairs)
+
+
+def test_rerank_falls_back_to_original_order_on_error():
+    reranker = make_reranker()
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("model error")
+
+    reranker._model.predict = fail
+    documents = [{"content": "a"}, {"content": "b"}, {"content": "c"}]
+    assert reranker.rerank("a", documents, top_k=2) == documents[:2]
+    assert reranker.rerank("a", [], top_k=2) == []
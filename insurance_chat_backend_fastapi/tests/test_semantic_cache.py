@@ -0,0 +1,55 @@
+from gh.semantic_cache import SemanticAnswerCache
+
+
+def test_lookup_above_threshold():
+    """유사도가 임계값 이상이면 저장된 답변을 반환"""
+    cache = SemanticAnswerCache(threshold=0.9)
+    cache.set_corpus_version("v1")
+    cache.add("암보험 청약 철회 기간은?", [1.0, 0.0, 0.1], "30일입니다.")
+
+    found = cache.lookup([0.98, 0.02, 0.1])
+    assert found is not None
+    entry, score = found
+    assert entry.answer == "30일입니다."
+    assert score >= 0.9
+
+    assert cache.lookup([0.0, 1.0, 0.0]) is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_corpus_version_change_invalidates():
+    """색인 버전이 바뀌면 이전 답변은 사용하지 않음"""
+    cache = SemanticAnswerCache(threshold=0.9)
+    cache.set_corpus_version("v1")
+    cache.add("질문", [1.0, 0.0], "답변")
+    cache.set_corpus_version("v2")
+    assert cache.lookup([1.0, 0.0]) is None
+    assert cache.stats()["size"] == 0
+
+
+def test_max_entries():
+    """최대 개수를 넘으면 오래된 항목부터 제거"""
+    cache = SemanticAnswerCache(threshold=0.99, max_entries=2)
+    cache.add("a", [1.0, 0.0, 0.0], "A")
+    cache.add("b", [0.0, 1.0, 0.0], "B")
+    cache.add("c", [0.0, 0.0, 1.0], "C")
+    assert cache.lookup([1.0, 0.0, 0.0]) is None
+    assert cache.lookup([0.0, 0.0, 1.0])[0].answer == "C"
+
+
+def test_ring_buffer_keeps_newest_entries():
+    """용량을 넘겨 추가해도 최근 max_entries개만 남고 행렬 크기는 max_entries를 넘지 않음"""
+    cache = SemanticAnswerCache(threshold=0.99, max_entries=20)
+    for i in range(50):
+        vector = [0.0] * 50
+        vector[i] = 1.0
+        cache.add(str(i), vector, str(i))
+    assert cache.stats()["size"] == 20
+    assert cache._vectors.shape == (20, 50)
+    for i in range(50):
+        vector = [0.0] * 50
+        vector[i] = 1.0
+        found = cache.lookup(vector)
+        assert (found is not None) == (i >= 30)
+        if found is not None:
+            assert found[0].answer == str(i)
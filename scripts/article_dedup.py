@@ -0,0 +1,89 @@
+"""
+조문 내용 중복 제거 (임베딩 재사용)
+
+여러 상품이 같은 표준 조문(청약철회, 부활, 납입최고 등)을 거의 그대로 사용하므로
+- 정규화한 조문 내용의 해시(text_hash)가 같으면 이미 만든 임베딩을 그대로 쓰고,
+- MinHash LSH로 찾은 유사 조문(추정 Jaccard 유사도 >= threshold)도 대표 조문의 임베딩을 쓴다.
+"""
+import re
+import zlib
+import hashlib
+import unicodedata
+from typing import Optional
+
+import numpy as np
+
+# 2^32보다 큰 소수 (해시 값과 계수가 모두 2^32 미만이므로 uint64 곱셈 + 덧셈이 넘치지 않는다)
+HASH_PRIME = np.uint64(4294967311)
+WHITESPACE_PATTERN = re.compile(r"\s+")
+ZERO_WIDTH_PATTERN = re.compile("[\u200b-\u200f\ufeff]")
+
+
+def normalize_content(text: str) -> str:
+    """유니코드 호환 문자 / 대소문자 / 공백 차이를 없앤 조문 내용"""
+    text = unicodedata.normalize("NFKC", text or "")
+    text = ZERO_WIDTH_PATTERN.sub("", text)
+    return WHITESPACE_PATTERN.sub(" ", text).strip().lower()
+
+
+def get_text_hash(text: str) -> str:
+    """정규화한 조문 내용의 SHA-256 (같은 값이면 같은 임베딩을 쓴다)"""
+    return hashlib.sha256(normalize_content(text).encode("utf-8")).hexdigest()
+
+
+class NearDuplicateIndex:
+    """
+    MinHash + LSH 유사 조문 검색
+    - 공백을 뺀 글자 shingle_size-gram 집합의 MinHash 서명(num_perm개)을 만든다.
+    - 서명을 bands개 구간으로 나눠 한 구간이라도 같으면 후보로 보고, 추정 Jaccard 유사도로 확인한다.
+    """
+
+    def __init__(self, threshold: float = 0.9, num_perm: int = 64, bands: int = 16, shingle_size: int = 5, min_length: int = 50, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm은 bands의 배수여야 합니다.")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        # 짧은 조문(제목뿐인 조문 등)은 조금만 달라도 의미가 달라지므로 유사 중복으로 보지 않는다.
+        self.min_length = min_length
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2 ** 32, size=(num_perm, 1), dtype=np.uint64)
+        self._b = rng.integers(0, 2 ** 32, size=(num_perm, 1), dtype=np.uint64)
+        self._buckets: dict[tuple[int, bytes], list[str]] = {}
+        self._signatures: dict[str, np.ndarray] = {}
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        text = normalize_content(text).replace(" ", "")
+        if len(text) < max(self.min_length, self.shingle_size):
+            return None
+        shingles = {text[i:i + self.shingle_size] for i in range(len(text) - self.shingle_size + 1)}
+        hashes = np.fromiter((zlib.crc32(shingle.encode("utf-8")) for shingle in shingles), dtype=np.uint64, count=len(shingles))
+        return ((self._a * hashes + self._b) % HASH_PRIME).min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def query(self, signature: Optional[np.ndarray]) -> Optional[str]:
+        """threshold 이상인 가장 비슷한 대표 조문 key (없으면 None)"""
+        if signature is None:
+            return None
+        candidates = {key for band_key in self._band_keys(signature) for key in self._buckets.get(band_key, [])}
+        best_key, best_similarity = None, self.threshold
+        for key in candidates:
+            similarity = float(np.mean(self._signatures[key] == signature))
+            if similarity >= best_similarity:
+                best_key, best_similarity = key, similarity
+        return best_key
+
+    def add(self, key: str, signature: Optional[np.ndarray]):
+        if signature is None:
+            return
+        self._signatures[key] = signature
+        for band_key in self._band_keys(signature):
+            self._buckets.setdefault(band_key, []).append(key)
+
+    def __len__(self) -> int:
+        return len(self._signatures)
@@ -0,0 +1,77 @@
+"""
+조문 JSON 파일을 한 건씩 읽는 스트리밍 리더
+
+extract_insurance_article.py가 만드는 JSON 배열 파일과 JSON Lines(.jsonl) 파일을 모두 지원하며,
+파일 전체를 메모리에 올리지 않고 조문 하나 크기의 버퍼만 사용한다.
+
+    for article in read_articles("articles.json"):
+        ...
+"""
+import json
+from typing import IO, Any, Iterator
+
+JSON_LINES_SUFFIXES = (".jsonl", ".ndjson")
+WHITESPACE = " \t\r\n"
+
+
+def iter_json_array(f: IO[str], chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """최상위 JSON 배열의 원소를 순서대로 반환"""
+    decoder = json.JSONDecoder()
+    buffer, position, eof = "", 0, False
+    started = False
+
+    def fill():
+        nonlocal buffer, position, eof
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buffer = buffer[position:] + chunk
+        position = 0
+
+    while True:
+        # 공백과 원소 구분자(,)를 건너뛴다.
+        while True:
+            while position < len(buffer) and buffer[position] in WHITESPACE + ("," if started else ""):
+                position += 1
+            if position < len(buffer) or eof:
+                break
+            fill()
+        if position >= len(buffer):
+            raise ValueError("JSON 배열이 완전하지 않습니다. (] 없음)")
+
+        if not started:
+            if buffer[position] != "[":
+                raise ValueError("JSON 배열 파일이 아닙니다.")
+            started = True
+            position += 1
+            continue
+        if buffer[position] == "]":
+            return
+
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            fill()
+            continue
+        # 숫자처럼 청크 경계에서 잘렸을 수 있는 값은 (뒤에 구분자가 없으면) 다음 청크를 읽고 다시 해석한다.
+        if not eof and (end == len(buffer) or buffer[end] not in WHITESPACE + ",]"):
+            fill()
+            continue
+        position = end
+        yield item
+
+
+def iter_json_lines(f: IO[str]) -> Iterator[Any]:
+    for line in f:
+        if line.strip():
+            yield json.loads(line)
+
+
+def read_articles(path: str) -> Iterator[dict]:
+    """파일 확장자가 .jsonl / .ndjson이면 JSON Lines, 그 외는 JSON 배열로 읽는다."""
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(JSON_LINES_SUFFIXES):
+            yield from iter_json_lines(f)
+        else:
+            yield from iter_json_array(f)
@@ -0,0 +1,79 @@
+"""
+embedding_article 벡터 검색용 HNSW 인덱스 생성
+
+pgvector HNSW 인덱스는 vector 타입을 2000차원까지만 지원하므로 vector(3072) 컬럼에는 직접 만들 수 없다.
+build_vector_search_sql의 후보 검색 식과 같은 expression 인덱스(halfvec 캐스팅 또는 binary 양자화)를 만든다.
+
+    python create_vector_index.py                             # halfvec(3072) 코사인 인덱스 (기본 검색 방식)
+    python create_vector_index.py --mode binary --dims 768    # Matryoshka 768차원 binary 인덱스
+    python create_vector_index.py --mode halfvec --drop       # 인덱스 삭제
+"""
+import time
+import argparse
+import psycopg2
+
+from config import POSTGRES_DB, POSTGRES_USER, POSTGRES_PASSWORD, POSTGRES_HOST
+
+
+def get_index_definition(mode: str, dims: int) -> tuple[str, str]:
+    """(인덱스 이름, 인덱스 식과 operator class)"""
+    target = "embedding" if dims >= 3072 else f"subvector(embedding, 1, {dims})"
+    if mode == "halfvec":
+        return f"embedding_article_halfvec_{dims}_idx", f"(({target}::halfvec({dims})) halfvec_cosine_ops)"
+    if mode == "binary":
+        return f"embedding_article_binary_{dims}_idx", f"((binary_quantize({target})::bit({dims})) bit_hamming_ops)"
+    raise ValueError(f"지원하지 않는 인덱스 방식입니다: {mode}")
+
+
+def main(args):
+    connection = psycopg2.connect(
+        dbname=POSTGRES_DB,
+        user=POSTGRES_USER,
+        password=POSTGRES_PASSWORD,
+        host=POSTGRES_HOST
+    )
+    # CREATE INDEX CONCURRENTLY는 트랜잭션 밖에서 실행해야 한다.
+    connection.autocommit = True
+    cursor = connection.cursor()
+
+    cursor.execute("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+    row = cursor.fetchone()
+    if row is None:
+        raise SystemExit("pgvector 확장이 설치되어 있지 않습니다. (CREATE EXTENSION vector)")
+    major, minor = (int(part) for part in row[0].split(".")[:2])
+    if (major, minor) < (0, 7):
+        raise SystemExit(f"halfvec / binary_quantize / subvector는 pgvector 0.7.0 이상이 필요합니다. (현재 {row[0]})")
+
+    index_name, expression = get_index_definition(args.mode, args.dims)
+    if args.drop:
+        cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}")
+        print(f"Dropped {index_name}")
+        return
+
+    # 인덱스 생성 시간은 maintenance_work_mem에 그래프가 들어가는지에 크게 좌우된다.
+    cursor.execute("SET maintenance_work_mem = %s", (args.maintenance_work_mem,))
+    cursor.execute("SET max_parallel_maintenance_workers = %s", (args.parallel_workers,))
+
+    start = time.time()
+    cursor.execute(
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} ON embedding_article "
+        f"USING hnsw {expression} WITH (m = %s, ef_construction = %s)",
+        (args.m, args.ef_construction),
+    )
+    cursor.execute("ANALYZE embedding_article")
+    cursor.execute("SELECT pg_relation_size(%s::regclass)", (index_name,))
+    size = cursor.fetchone()[0]
+    print(f"Created {index_name} in {time.time() - start:.1f}s ({size / 1024 / 1024:.1f}MB)")
+    connection.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mode", choices=["halfvec", "binary"], default="halfvec")
+    parser.add_argument("--dims", type=int, default=3072, help="인덱스에 사용할 차원 수 (768이면 앞 768차원)")
+    parser.add_argument("--m", type=int, default=16, help="HNSW 노드당 연결 수")
+    parser.add_argument("--ef-construction", type=int, default=64)
+    parser.add_argument("--maintenance-work-mem", default="2GB")
+    parser.add_argument("--parallel-workers", type=int, default=4)
+    parser.add_argument("--drop", action="store_true", help="인덱스 삭제")
+    main(parser.parse_args())
@@ -1,20 +1,39 @@
+"""
+약관 조문 JSON을 임베딩해서 embedding_article 테이블에 적재
+
+- 조문을 batch_size개씩 묶어 한 번의 embed_content 호출로 임베딩하고, 최대 concurrency개의 호출을 동시에 보낸다.
+- 임베딩된 행은 execute_values로 모아서 commit_rows개 단위 트랜잭션으로 INSERT 한다.
+- 조문마다 content_hash(필드 전체의 SHA-256)를 저장해서 다시 실행하면 이미 적재된 조문은 건너뛴다.
+- 429 / 5xx / 네트워크 오류는 지수 백오프로 재시도하고, 그 외 오류는 바로 중단한다. (다시 실행하면 이어서 적재)
+- 정규화한 조문 내용이 같거나(text_hash) MinHash로 찾은 유사 조문이면 임베딩하지 않고 이미 적재된 행의 임베딩을 복사한다.
+  (여러 상품이 공유하는 표준 조문은 한 번만 임베딩, 끝나면 절약한 임베딩 비용 / 벡터 저장 크기를 출력)
+
+    python embedding_insurance_article.py --file articles.json
+    python embedding_insurance_article.py --file articles.jsonl    # JSON Lines
+    python embedding_insurance_article.py --file articles.json --batch-size 100 --concurrency 4 --commit-rows 1000
+    python embedding_insurance_article.py --file articles.json --near-duplicate-threshold 0    # 유사 조문 재사용 끄기
+"""
 import json
-from time import sleep
-import psycopg2
+import time
+import random
+import hashlib
 import argparse
+from typing import Iterable
+from dataclasses import dataclass
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 
+import httpx
+import psycopg2
+from psycopg2.extras import execute_values
 from google import genai
+from google.genai import errors
 
+from article_reader import read_articles
+from article_dedup import get_text_hash, NearDuplicateIndex
 from config import GEMINI_API_KEY, POSTGRES_DB, POSTGRES_USER, POSTGRES_PASSWORD, POSTGRES_HOST
 
 
-parser = argparse.ArgumentParser()
-parser.add_argument("--file", type=str, required=True)
-
-args = parser.parse_args()
-file_path = args.file
-
-
 client = genai.Client(api_key=GEMINI_API_KEY)
 
 
@@ -33,78 +52,384 @@ create table embedding_article (
 	article_title varchar(255),
 	article_content text,
     page_number int,
-	embedding vector(3072)
+	embedding vector(3072),
+	content_hash char(64),
+	text_hash char(64),
+	updated_at timestamptz not null default now()
 );
+create unique index embedding_article_content_hash_idx on embedding_article (content_hash);
+create index embedding_article_text_hash_idx on embedding_article (text_hash);
+(updated_at 갱신 / 삭제 기록 트리거는 migration_db_to_elasticsearch.py --setup)
+
+[벡터 인덱스] HNSW는 vector 2000차원까지만 지원하므로 halfvec 캐스팅 식으로 만든다. (create_vector_index.py)
+create index concurrently embedding_article_halfvec_3072_idx on embedding_article
+	using hnsw ((embedding::halfvec(3072)) halfvec_cosine_ops) with (m = 16, ef_construction = 64);
+
+[json 예시]
+{
+    "company_name": "농협생명보험",
+    "category": "암보험",
+    "insurance_name": "369뉴테크NH암보험",
+    "insurance_type": "무배당",
+    "sales_date": "2025-01",
+    "index_title": "저용량-369뉴테크NH암보험(무배당)",
+    "file_path": "/Users/woojinlee/Desktop/ai_insurance_bot/김백현_농협생명보험_흥국생명보험_KB라이프생명보험/농협생명보험/369뉴테크NH암보험(무배당)/저용량-369뉴테크NH암보험(무배당)_2404_최종_241220.pdf",
+    "chapter_title": "제1관 목적 및 용어의 정의",
+    "article_title": "제1관 목적 및 용어의 정의",
+    "article_content": "",
+    "page_number": 45
+}
 """
-postgres_connection = psycopg2.connect(
-    dbname=POSTGRES_DB,
-    user=POSTGRES_USER,
-    password=POSTGRES_PASSWORD,
-    host=POSTGRES_HOST
-)
-cursor = postgres_connection.cursor()
+ARTICLE_FIELDS = [
+    "company_name",
+    "category",
+    "insurance_name",
+    "insurance_type",
+    "sales_date",
+    "index_title",
+    "file_path",
+    "chapter_title",
+    "article_title",
+    "article_content",
+    "page_number",
+]
+
+# 재시도할 HTTP 상태 코드 (요청 한도 초과 / 일시적인 서버 오류)
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
 
+EMBEDDING_DIMS = 3072
+# 비용 추정용 (한국어는 토큰당 2글자 안팎)
+CHARS_PER_TOKEN = 2
 
-def get_embedding(content: str, model: str = "gemini-embedding-exp-03-07") -> list[float]:
+
+@dataclass
+class DedupReport:
+    """중복 제거로 절약한 임베딩 호출 / 저장 공간"""
+    embedded: int = 0
+    embedded_chars: int = 0
+    exact_reused: int = 0
+    near_reused: int = 0
+    reused_chars: int = 0
+
+    def print(self, price_per_million_tokens: float):
+        reused = self.exact_reused + self.near_reused
+        saved_tokens = self.reused_chars / CHARS_PER_TOKEN
+        total_chars = self.embedded_chars + self.reused_chars
+        vector_mb = EMBEDDING_DIMS * 4 / 1024 / 1024
+        print("================================================")
+        print(f"embedded: {self.embedded} articles ({self.embedded_chars} chars)")
+        print(f"reused embeddings: {reused} articles (exact {self.exact_reused}, near-duplicate {self.near_reused})")
+        if total_chars:
+            print(
+                f"embedding cost saved: {self.reused_chars} chars ({self.reused_chars / total_chars:.1%}), "
+                f"~{saved_tokens:.0f} tokens, ~${saved_tokens / 1_000_000 * price_per_million_tokens:.4f}"
+            )
+        # 행마다 벡터를 저장하므로 아래 크기는 text_hash별로 벡터를 한 번만 저장 / 색인할 때 줄일 수 있는 크기다.
+        print(
+            f"duplicate vectors: {reused} x vector({EMBEDDING_DIMS}) = {reused * vector_mb:.1f}MB float32 "
+            f"({reused * vector_mb / 2:.1f}MB in the halfvec HNSW index)"
+        )
+        print("================================================")
+
+
+def get_content_hash(item: dict) -> str:
+    """조문 필드 전체로 만든 해시 (같은 조문을 다시 적재하지 않기 위한 키)"""
+    content = json.dumps([item[field] for field in ARTICLE_FIELDS], ensure_ascii=False)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, errors.APIError):
+        return error.code in RETRYABLE_STATUS
+    return isinstance(error, (httpx.TransportError, ConnectionError, TimeoutError))
+
+
+def with_backoff(function, *args, max_retries: int = 8, base_delay: float = 1.0, max_delay: float = 60.0):
+    """일시적인 오류는 지수 백오프(+ jitter)로 재시도"""
+    for attempt in range(max_retries + 1):
+        try:
+            return function(*args)
+        except Exception as e:
+            if attempt == max_retries or not is_retryable(e):
+                raise
+            delay = min(max_delay, base_delay * 2 ** attempt) * random.uniform(0.5, 1.0)
+            print(f"Retry {attempt + 1}/{max_retries} in {delay:.1f}s: {e}")
+            time.sleep(delay)
+
+
+def get_embeddings(contents: list[str], model: str = "gemini-embedding-exp-03-07") -> list[list[float]]:
     """
-    벡터 테이블 생성 쿼리
+    여러 조문을 한 번의 호출로 임베딩
     """
     result = client.models.embed_content(
         model=model,
-        contents=content,
+        contents=contents,
     )
-    return result.embeddings[0].values
+    return [embedding.values for embedding in result.embeddings]
+
+
+def embed_batch(batch: list[dict]) -> list[tuple]:
+    """INSERT 할 행 목록 (조문 필드 + embedding + content_hash + text_hash)"""
+    embeddings = with_backoff(get_embeddings, [item["article_content"] for item in batch])
+    return [
+        tuple(item[field] for field in ARTICLE_FIELDS) + ("[" + ",".join(map(str, embedding)) + "]", item["content_hash"], item["text_hash"])
+        for item, embedding in zip(batch, embeddings)
+    ]
 
 
-def insert_embedding_article(article: list[str]):
+def insert_embedding_articles(connection: psycopg2.extensions.connection, rows: list[tuple]):
     """
-    INSERT 쿼리 함수
+    INSERT 쿼리 함수 (한 트랜잭션, 이미 적재된 content_hash는 건너뛴다)
     """
-    company_name, category, insurance_name, insurance_type, sales_date, index_title, file_path, chapter_title, article_title, article_content, page_number, embedding = article
-    cursor.execute("INSERT INTO embedding_article (company_name, category, insurance_name, insurance_type, sales_date, index_title, file_path, chapter_title, article_title, article_content, page_number, embedding) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)", (company_name, category, insurance_name, insurance_type, sales_date, index_title, file_path, chapter_title, article_title, article_content, page_number, embedding))
-    postgres_connection.commit()
+    if not rows:
+        return
+    with connection.cursor() as cursor:
+        execute_values(
+            cursor,
+            f"INSERT INTO embedding_article ({', '.join(ARTICLE_FIELDS)}, embedding, content_hash, text_hash) VALUES %s "
+            "ON CONFLICT (content_hash) DO NOTHING",
+            rows,
+            template="(" + ", ".join(["%s"] * len(ARTICLE_FIELDS)) + ", %s::vector, %s, %s)",
+            page_size=len(rows),
+        )
+    connection.commit()
 
 
-with open(file_path, "r") as f:
-    data = f.read()
+def insert_linked_articles(connection: psycopg2.extensions.connection, links: list[dict]) -> list[dict]:
+    """
+    중복 조문을 이미 적재된 행(text_hash = embedding_hash)의 임베딩을 복사해서 INSERT 한다.
+
+    Returns:
+        대표 조문의 임베딩을 찾지 못해 INSERT 하지 못한 조문 목록
+    """
+    if not links:
+        return []
+    columns = ARTICLE_FIELDS + ["content_hash", "text_hash", "embedding_hash"]
+    # VALUES 안의 NULL은 타입을 알 수 없으므로 명시적으로 캐스팅한다.
+    template = "(" + ", ".join("%s::int" if column == "page_number" else "%s::text" for column in columns) + ")"
+    with connection.cursor() as cursor:
+        inserted = execute_values(
+            cursor,
+            f"""
+            INSERT INTO embedding_article ({', '.join(ARTICLE_FIELDS)}, embedding, content_hash, text_hash)
+            SELECT {', '.join('data.' + field for field in ARTICLE_FIELDS)}, source.embedding, data.content_hash, data.text_hash
+            FROM (VALUES %s) AS data ({', '.join(columns)})
+            CROSS JOIN LATERAL (
+                SELECT embedding FROM embedding_article WHERE text_hash = data.embedding_hash LIMIT 1
+            ) source
+            ON CONFLICT (content_hash) DO NOTHING
+            RETURNING content_hash
+            """,
+            [tuple(link[column] for column in columns) for link in links],
+            template=template,
+            page_size=len(links),
+            fetch=True,
+        )
+    connection.commit()
+    inserted_hashes = {content_hash for [content_hash] in inserted}
+    return [link for link in links if link["content_hash"] not in inserted_hashes]
+
+
+def ensure_checkpoint_column(connection: psycopg2.extensions.connection):
+    with connection.cursor() as cursor:
+        cursor.execute("ALTER TABLE embedding_article ADD COLUMN IF NOT EXISTS content_hash char(64)")
+        cursor.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS embedding_article_content_hash_idx ON embedding_article (content_hash)"
+        )
+        cursor.execute("ALTER TABLE embedding_article ADD COLUMN IF NOT EXISTS text_hash char(64)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS embedding_article_text_hash_idx ON embedding_article (text_hash)")
+    connection.commit()
+
 
+def backfill_content_hash(connection: psycopg2.extensions.connection):
+    """content_hash 컬럼을 추가하기 전에 적재된 행도 건너뛸 수 있도록 해시를 채운다."""
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT id, {', '.join(ARTICLE_FIELDS)} FROM embedding_article WHERE content_hash IS NULL")
+        # 같은 조문이 이미 여러 번 적재되어 있으면 첫 행에만 해시를 채운다. (유니크 인덱스 충돌 방지)
+        first_ids = {}
+        for row in cursor.fetchall():
+            first_ids.setdefault(get_content_hash(dict(zip(ARTICLE_FIELDS, row[1:]))), row[0])
+        updates = list(first_ids.items())
+        if updates:
+            execute_values(
+                cursor,
+                "UPDATE embedding_article SET content_hash = data.content_hash FROM (VALUES %s) AS data (content_hash, id) "
+                "WHERE embedding_article.id = data.id",
+                updates,
+                page_size=1000,
+            )
+            print(f"backfilled content_hash for {len(updates)} rows")
+    connection.commit()
 
-def get_next_article(data: json):
-    for item in json.loads(data):
-        yield item
 
+def backfill_text_hash(connection: psycopg2.extensions.connection):
+    """이미 적재된 행의 임베딩도 재사용할 수 있도록 text_hash를 채운다."""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT id, article_content FROM embedding_article WHERE text_hash IS NULL")
+        updates = [(get_text_hash(article_content), id) for id, article_content in cursor.fetchall()]
+        if updates:
+            execute_values(
+                cursor,
+                "UPDATE embedding_article SET text_hash = data.text_hash FROM (VALUES %s) AS data (text_hash, id) "
+                "WHERE embedding_article.id = data.id",
+                updates,
+                page_size=1000,
+            )
+            print(f"backfilled text_hash for {len(updates)} rows")
+    connection.commit()
 
-continue_flag = True
-current_article = get_next_article(data)
-while True:
-    if continue_flag:
-        item = next(current_article, None)
-    if item is None:
-        break
-        
+
+def load_done_hashes(connection: psycopg2.extensions.connection) -> set[str]:
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT content_hash FROM embedding_article WHERE content_hash IS NOT NULL")
+        return {content_hash for [content_hash] in cursor.fetchall()}
+
+
+def load_text_hashes(connection: psycopg2.extensions.connection) -> set[str]:
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT DISTINCT text_hash FROM embedding_article WHERE text_hash IS NOT NULL")
+        return {text_hash for [text_hash] in cursor.fetchall()}
+
+
+def plan_articles(items: Iterable[dict], done_hashes: set[str], text_hashes: set[str], near_duplicates: NearDuplicateIndex, report: DedupReport, batch_size: int):
     """
-    [json 예시]
-    {
-        "company_name": "농협생명보험", 
-        "category": "암보험", 
-        "insurance_name": "369뉴테크NH암보험", 
-        "insurance_type": "무배당", 
-        "sales_date": "2025-01", 
-        "index_title": "저용량-369뉴테크NH암보험(무배당)", 
-        "file_path": "/Users/woojinlee/Desktop/ai_insurance_bot/김백현_농협생명보험_흥국생명보험_KB라이프생명보험/농협생명보험/369뉴테크NH암보험(무배당)/저용량-369뉴테크NH암보험(무배당)_2404_최종_241220.pdf", 
-        "chapter_title": "제1관 목적 및 용어의 정의",
-        "article_title": "제1관 목적 및 용어의 정의", 
-        "article_content": "", 
-        "page_number": 45
-    }
+    적재되지 않은 조문을 임베딩할 배치("embed", [조문, ...])와 임베딩을 재사용할 조문("link", 조문)으로 나눠 반환
     """
-    try:
-        article = [item["company_name"], item["category"], item["insurance_name"], item["insurance_type"], item["sales_date"], item["index_title"], item["file_path"], item["chapter_title"], item["article_title"], item["article_content"], item["page_number"], get_embedding(item["article_content"])]
-        print(item["company_name"], item["category"], item["insurance_name"], item["insurance_type"], item["sales_date"], item["index_title"], item["file_path"], item["chapter_title"], item["article_title"])
-        insert_embedding_article(article)
-        continue_flag = True
-    except Exception as e:
-        continue_flag = False
-        sleep(5)
-        print("Error:", e)
-        print("Sleep 5 seconds...")
+    batch = []
+    for item in items:
+        item["content_hash"] = get_content_hash(item)
+        if item["content_hash"] in done_hashes:
+            continue
+        # 입력 파일 안의 중복 조문도 한 번만 적재한다.
+        done_hashes.add(item["content_hash"])
+        item["text_hash"] = get_text_hash(item["article_content"])
+
+        if item["text_hash"] in text_hashes:
+            item["embedding_hash"] = item["text_hash"]
+            report.exact_reused += 1
+        else:
+            signature = near_duplicates.signature(item["article_content"]) if near_duplicates else None
+            item["embedding_hash"] = near_duplicates.query(signature) if near_duplicates else None
+            if item["embedding_hash"] is not None:
+                report.near_reused += 1
+        if item["embedding_hash"] is not None:
+            report.reused_chars += len(item["article_content"] or "")
+            yield "link", item
+            continue
+
+        text_hashes.add(item["text_hash"])
+        if near_duplicates:
+            near_duplicates.add(item["text_hash"], signature)
+        report.embedded += 1
+        report.embedded_chars += len(item["article_content"] or "")
+        batch.append(item)
+        if len(batch) == batch_size:
+            yield "embed", batch
+            batch = []
+    if batch:
+        yield "embed", batch
+
+
+def main(args):
+    connection = psycopg2.connect(
+        dbname=POSTGRES_DB,
+        user=POSTGRES_USER,
+        password=POSTGRES_PASSWORD,
+        host=POSTGRES_HOST
+    )
+    ensure_checkpoint_column(connection)
+    backfill_content_hash(connection)
+    backfill_text_hash(connection)
+    done_hashes = load_done_hashes(connection)
+    # 임베딩이 DB에 적재된 text_hash (재사용 조문은 대표 조문이 여기에 들어간 뒤에 INSERT 한다)
+    stored_text_hashes = load_text_hashes(connection)
+    text_hashes = set(stored_text_hashes)
+    # 유사 조문은 이번 실행에서 임베딩한 조문 중에서만 찾는다. (이미 적재된 조문은 text_hash가 같을 때만 재사용)
+    near_duplicates = NearDuplicateIndex(threshold=args.near_duplicate_threshold) if args.near_duplicate_threshold > 0 else None
+    report = DedupReport()
+
+    # 파일 전체를 읽지 않고 조문을 한 건씩 읽는다. (JSON 배열 / JSON Lines)
+    items = read_articles(args.file)
+    print(f"already embedded: {len(done_hashes)}")
+
+    start = time.time()
+    inserted = 0
+    rows = []
+    # 대표 조문이 적재되어 바로 INSERT 할 수 있는 재사용 조문 / 대표 조문 임베딩을 기다리는 재사용 조문 (embedding_hash별)
+    ready_links = []
+    waiting_links = defaultdict(list)
+    missing_links = []
+
+    def add_link(item: dict):
+        if item["embedding_hash"] in stored_text_hashes:
+            ready_links.append(item)
+        else:
+            waiting_links[item["embedding_hash"]].append(item)
+
+    def flush_links():
+        nonlocal inserted, ready_links
+        missing = insert_linked_articles(connection, ready_links)
+        inserted += len(ready_links) - len(missing)
+        missing_links.extend(missing)
+        ready_links = []
+
+    def flush():
+        """임베딩한 행을 INSERT 한 뒤, 그 행을 대표 조문으로 기다리던 재사용 조문을 INSERT 한다."""
+        nonlocal inserted, rows
+        insert_embedding_articles(connection, rows)
+        inserted += len(rows)
+        for row in rows:
+            text_hash = row[-1]
+            stored_text_hashes.add(text_hash)
+            ready_links.extend(waiting_links.pop(text_hash, []))
+        rows = []
+        flush_links()
+
+    planned = plan_articles(items, done_hashes, text_hashes, near_duplicates, report, args.batch_size)
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        # 진행 중인 임베딩 호출을 concurrency개로 제한한다.
+        pending = set()
+        try:
+            for kind, item in planned:
+                if kind == "link":
+                    add_link(item)
+                    if len(ready_links) >= args.commit_rows:
+                        flush_links()
+                    continue
+                pending.add(executor.submit(embed_batch, item))
+                if len(pending) < args.concurrency:
+                    continue
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    rows.extend(future.result())
+                if len(rows) >= args.commit_rows:
+                    flush()
+                    print(f"inserted {inserted} rows ({inserted / (time.time() - start):.1f} rows/s)")
+            for future in pending:
+                rows.extend(future.result())
+        except Exception:
+            # 실패한 배치 전까지 임베딩한 결과는 저장해 두고, 다시 실행하면 나머지부터 이어서 적재한다.
+            for future in pending:
+                if future.done() and future.exception() is None:
+                    rows.extend(future.result())
+            flush()
+            print(f"saved {inserted} rows before failure")
+            raise
+    flush()
+    skipped = len(missing_links) + sum(len(items) for items in waiting_links.values())
+    if skipped:
+        print(f"skipped {skipped} duplicate articles whose embedding was not found")
+    print(f"Done: inserted {inserted} rows in {time.time() - start:.1f}s")
+    report.print(args.price_per_million_tokens)
+    connection.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--file", type=str, required=True)
+    parser.add_argument("--batch-size", type=int, default=100, help="embed_content 한 번에 보낼 조문 수 (Gemini 최대 100)")
+    parser.add_argument("--concurrency", type=int, default=4, help="동시에 보낼 임베딩 호출 수")
+    parser.add_argument("--commit-rows", type=int, default=1000, help="한 트랜잭션으로 INSERT 할 행 수")
+    parser.add_argument("--near-duplicate-threshold", type=float, default=0.9, help="임베딩을 재사용할 유사 조문의 MinHash 유사도 (0이면 끔)")
+    parser.add_argument("--price-per-million-tokens", type=float, default=0.15, help="절약한 비용 추정용 임베딩 단가 (USD / 100만 토큰)")
+    main(parser.parse_args())
@@ -0,0 +1,147 @@
+"""
+벡터 양자화 벤치마크 (float32 전체 비교 대비 메모리 / 지연 시간 / recall@20)
+
+1) 메모리 내 비교: embedding_article의 벡터를 읽어 float16 / int8 / binary 양자화와
+   Matryoshka 768차원 축소 조합별로 후보를 찾고 원본 벡터로 재정렬했을 때의 recall@k를 측정합니다.
+2) pgvector 비교: build_vector_search_sql의 각 방식(full / binary / halfvec)을 실제 DB에서 실행한 지연 시간과
+   full 결과 대비 recall@k, embedding_article 인덱스 크기를 출력합니다.
+
+    python evaluation/bench_vector_quantization.py --k 20 --candidates 100
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import numpy as np
+import psycopg2
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# 양자화 함수는 FastAPI 서비스의 gh/quantization.py를 그대로 측정한다.
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "insurance_chat_backend_fastapi"))
+
+from gh.quantization import truncate_embeddings, quantize_int8, quantize_binary, hamming_distances
+from evaluation.queries import queries
+from utils import get_embedding, build_vector_search_sql
+from config import POSTGRES_DB, POSTGRES_USER, POSTGRES_PASSWORD, POSTGRES_HOST
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+
+def load_vectors(cursor) -> np.ndarray:
+    cursor.execute("SELECT embedding::text FROM embedding_article ORDER BY id")
+    return normalize(np.asarray([json.loads(embedding) for [embedding] in cursor.fetchall()], dtype=np.float32))
+
+
+def encode(vectors: np.ndarray, representation: str):
+    """(저장 형태, 바이트 수)"""
+    if representation == "float32":
+        return vectors, vectors.nbytes
+    if representation == "float16":
+        encoded = vectors.astype(np.float16)
+        return encoded, encoded.nbytes
+    if representation == "int8":
+        encoded, scale = quantize_int8(vectors)
+        return (encoded, scale), encoded.nbytes + scale.nbytes
+    if representation == "binary":
+        encoded = quantize_binary(vectors)
+        return encoded, encoded.nbytes
+    raise ValueError(representation)
+
+
+def candidate_scores(encoded, representation: str, query: np.ndarray) -> np.ndarray:
+    """값이 클수록 가까운 후보 점수"""
+    if representation in ("float32", "float16"):
+        return encoded.astype(np.float32) @ query
+    if representation == "int8":
+        vectors, scale = encoded
+        return vectors.astype(np.float32) @ (query * scale)
+    return -hamming_distances(quantize_binary(query), encoded)
+
+
+def recall(found, expected) -> float:
+    return len(set(found) & set(expected)) / len(expected) if expected else 0.0
+
+
+def in_memory_benchmark(vectors: np.ndarray, query_vectors: np.ndarray, k: int, candidates: int):
+    expected = [np.argsort(-(vectors @ query))[:k].tolist() for query in query_vectors]
+
+    print(f"{'representation':16}{'dims':>6}{'MB':>10}{'p50(ms)':>10}{'recall@' + str(k):>12}{'rescored':>12}")
+    for dims in (vectors.shape[1], 768):
+        truncated = truncate_embeddings(vectors, dims)
+        truncated_queries = truncate_embeddings(query_vectors, dims)
+        for representation in ("float32", "float16", "int8", "binary"):
+            encoded, nbytes = encode(truncated, representation)
+            times, recalls, rescored_recalls = [], [], []
+            for query, truncated_query, expected_ids in zip(query_vectors, truncated_queries, expected):
+                start = time.perf_counter()
+                scores = candidate_scores(encoded, representation, truncated_query)
+                candidate_ids = np.argpartition(-scores, candidates)[:candidates]
+                # 후보만 원본 float32 벡터로 재정렬
+                rescored = candidate_ids[np.argsort(-(vectors[candidate_ids] @ query))][:k]
+                times.append(time.perf_counter() - start)
+                recalls.append(recall(candidate_ids[np.argsort(-scores[candidate_ids])][:k].tolist(), expected_ids))
+                rescored_recalls.append(recall(rescored.tolist(), expected_ids))
+            print(
+                f"{representation:16}{dims:>6}{nbytes / 1024 / 1024:>10.1f}{statistics.median(times) * 1000:>10.2f}"
+                f"{statistics.mean(recalls):>12.3f}{statistics.mean(rescored_recalls):>12.3f}"
+            )
+
+
+def pgvector_benchmark(cursor, query_embeddings: list, k: int, candidates: int):
+    modes = [("full", 3072), ("halfvec", 3072), ("binary", 3072), ("binary", 768), ("halfvec", 768)]
+    expected = None
+    # HNSW 인덱스가 후보 수만큼 반환하도록 맞춘다.
+    cursor.execute("SET hnsw.ef_search = %s", (max(100, candidates),))
+    print(f"{'mode':10}{'dims':>6}{'p50(ms)':>10}{'p95(ms)':>10}{'recall@' + str(k):>12}")
+    for mode, dims in modes:
+        sql = build_vector_search_sql(mode, dims)
+        times, results = [], []
+        for embedding in query_embeddings:
+            start = time.perf_counter()
+            cursor.execute(sql, {"embedding": embedding, "candidates": candidates, "top_n": k})
+            results.append([tuple(row) for row in cursor.fetchall()])
+            times.append(time.perf_counter() - start)
+        if expected is None:
+            expected = results
+        recalls = [recall(found, answer) for found, answer in zip(results, expected)]
+        times.sort()
+        print(
+            f"{mode:10}{dims:>6}{statistics.median(times) * 1000:>10.1f}"
+            f"{times[min(len(times) - 1, int(len(times) * 0.95))] * 1000:>10.1f}{statistics.mean(recalls):>12.3f}"
+        )
+
+    cursor.execute("""
+        SELECT indexrelid::regclass::text, pg_relation_size(indexrelid)
+        FROM pg_index WHERE indrelid = 'embedding_article'::regclass
+    """)
+    for index_name, size in cursor.fetchall():
+        print(f"index {index_name}: {size / 1024 / 1024:.1f}MB")
+    cursor.execute("SELECT pg_total_relation_size('embedding_article')")
+    print(f"embedding_article total: {cursor.fetchone()[0] / 1024 / 1024:.1f}MB")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--candidates", type=int, default=100)
+    parser.add_argument("--skip-db", action="store_true", help="pgvector 쿼리 비교 생략")
+    args = parser.parse_args()
+
+    connection = psycopg2.connect(dbname=POSTGRES_DB, user=POSTGRES_USER, password=POSTGRES_PASSWORD, host=POSTGRES_HOST)
+    cursor = connection.cursor()
+
+    query_embeddings = [get_embedding(query) for query in queries]
+    vectors = load_vectors(cursor)
+    print("================================================")
+    print(f"documents: {len(vectors)}, queries: {len(queries)}, k={args.k}, candidates={args.candidates}")
+    in_memory_benchmark(vectors, normalize(np.asarray(query_embeddings, dtype=np.float32)), args.k, args.candidates)
+    if not args.skip_db:
+        print("------------------------------------------------")
+        pgvector_benchmark(cursor, query_embeddings, args.k, args.candidates)
+    print("================================================")
+    connection.close()
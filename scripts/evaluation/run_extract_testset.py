@@ -13,10 +13,14 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
 from evaluation.queries import queries
+from embedding_service import EmbeddingService
 from config import GEMINI_API_KEY, OPENAI_API_KEY, COHERE_API_KEY, POSTGRES_DB, POSTGRES_USER, POSTGRES_PASSWORD, POSTGRES_HOST
 
 genai_client = genai.Client(api_key=GEMINI_API_KEY)
 
+# 같은 질문을 여러 번 평가해도 임베딩은 한 번만 생성한다.
+embedding_service = EmbeddingService(genai_client)
+
 cohere_client = cohere.ClientV2(api_key=COHERE_API_KEY)
 
 openai_client = OpenAI(api_key=OPENAI_API_KEY)
@@ -35,19 +39,16 @@ def get_embedding(content: str, model: str = "gemini-embedding-exp-03-07") -> li
     """
     벡터 생성
     """
-    result = genai_client.models.embed_content(
-        model=model,
-        contents=content,
-    )
-    return result.embeddings[0].values
+    return embedding_service.get_embedding(content, model)
 
 
-def get_cosine_result(cursor: psycopg2.extensions.cursor, query: str, top_n: int = 20) -> list[str]:
+def get_cosine_result(cursor: psycopg2.extensions.cursor, query: str, top_n: int = 20, embedding: list[float] = None) -> list[str]:
     """
-    코사인 결과 반환
+    코사인 결과 반환 (이미 계산한 질문 벡터가 있으면 embedding으로 전달)
     """
-    embedding = get_embedding(query)
-    cursor.execute("SELECT company_name, category, insurance_name, insurance_type, sales_date, index_title, file_path, chapter_title, article_title, article_content, page_number FROM embedding_article ORDER BY embedding <-> %s::vector LIMIT %s", (embedding, top_n))
+    if embedding is None:
+        embedding = get_embedding(query)
+    cursor.execute("SELECT company_name, category, insurance_name, insurance_type, sales_date, index_title, file_path, chapter_title, article_title, article_content, page_number FROM embedding_article ORDER BY embedding <=> %s::vector LIMIT %s", (embedding, top_n))
     return [{
         "보험회사명": company_name, 
         "보험분류": category, 
@@ -1,82 +1,302 @@
+"""
+embedding_article(PostgreSQL) → Elasticsearch 색인
+
+- named(server-side) cursor로 itersize개씩 가져오며 한 번의 쿼리로 전체 행을 읽는다.
+- parallel_bulk로 여러 스레드가 chunk_size개(최대 max_chunk_bytes)씩 bulk 요청을 보낸다.
+- embedding 컬럼을 함께 복사해서 kNN 필드(embedding, embedding_768)도 같은 패스에서 채운다.
+
+동기화 방식 (--mode)
+- rebuild: 새 인덱스(<alias>_<시각>)를 refresh_interval -1로 만들어 전체 적재한 뒤 alias를 한 번에 바꾼다.
+  검색은 항상 alias를 보므로 만들어지는 중인 인덱스가 보이지 않는다. (이전 인덱스는 삭제)
+- incremental: 마지막 동기화 시각(es_sync_state) 이후 updated_at이 바뀐 행만 색인하고,
+  삭제 트리거가 남긴 embedding_article_deleted의 id는 ES에서도 삭제한다.
+
+    python migration_db_to_elasticsearch.py --setup                  # updated_at 컬럼 / 트리거 / 동기화 상태 테이블 생성
+    python migration_db_to_elasticsearch.py --mode rebuild           # 전체 재색인 + alias 교체
+    python migration_db_to_elasticsearch.py                          # 증분 동기화 (새 상품 추가 후 실행)
+"""
 import time
+import argparse
+from datetime import timedelta
+import numpy as np
 import psycopg2
 
 from elasticsearch import Elasticsearch
-from elasticsearch.helpers import bulk
+from elasticsearch.helpers import parallel_bulk
 
-from config import POSTGRES_DB, POSTGRES_USER, POSTGRES_PASSWORD, POSTGRES_HOST, ES_HOST, ES_PORT, ES_USERNAME, ES_PASSWORD
+from config import POSTGRES_DB, POSTGRES_USER, POSTGRES_PASSWORD, POSTGRES_HOST, ES_HOST, ES_PORT, ES_USERNAME, ES_PASSWORD, ES_CA_CERT
 
 
-postgres_connection = psycopg2.connect(
-    dbname=POSTGRES_DB,
-    user=POSTGRES_USER,
-    password=POSTGRES_PASSWORD,
-    host=POSTGRES_HOST
-)
-cursor = postgres_connection.cursor()
+ARTICLE_FIELDS = [
+    "company_name",
+    "category",
+    "insurance_name",
+    "insurance_type",
+    "sales_date",
+    "index_title",
+    "file_path",
+    "chapter_title",
+    "article_title",
+    "article_content",
+    "page_number",
+]
+# Matryoshka 768차원 양자화 필드 (elasticsearch_template.http의 embedding_768)
+MATRYOSHKA_DIMS = 768
 
+SETUP_SQL = """
+ALTER TABLE embedding_article ADD COLUMN IF NOT EXISTS updated_at timestamptz NOT NULL DEFAULT now();
+CREATE INDEX IF NOT EXISTS embedding_article_updated_at_idx ON embedding_article (updated_at);
 
-cursor.execute("SELECT id FROM embedding_article")
-document_ids = [id for [id] in cursor.fetchall()]
+CREATE TABLE IF NOT EXISTS embedding_article_deleted (
+    id int PRIMARY KEY,
+    deleted_at timestamptz NOT NULL DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS embedding_article_deleted_at_idx ON embedding_article_deleted (deleted_at);
 
+CREATE TABLE IF NOT EXISTS es_sync_state (
+    index_name text PRIMARY KEY,
+    synced_at timestamptz NOT NULL
+);
 
-def generate_documents(document_ids):
-    for index, document_id in enumerate(document_ids):
-        print("bulk_count: ", index + 1)
-        print("document_id:", document_id)
+CREATE OR REPLACE FUNCTION embedding_article_touch() RETURNS trigger AS $$
+BEGIN
+    NEW.updated_at = now();
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+DROP TRIGGER IF EXISTS embedding_article_touch ON embedding_article;
+CREATE TRIGGER embedding_article_touch BEFORE UPDATE ON embedding_article
+    FOR EACH ROW EXECUTE FUNCTION embedding_article_touch();
+
+CREATE OR REPLACE FUNCTION embedding_article_tombstone() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO embedding_article_deleted (id) VALUES (OLD.id)
+    ON CONFLICT (id) DO UPDATE SET deleted_at = now();
+    RETURN OLD;
+END
+$$ LANGUAGE plpgsql;
+DROP TRIGGER IF EXISTS embedding_article_tombstone ON embedding_article;
+CREATE TRIGGER embedding_article_tombstone AFTER DELETE ON embedding_article
+    FOR EACH ROW EXECUTE FUNCTION embedding_article_tombstone();
+"""
+
+
+def truncate_embedding(embedding: list[float], dimensions: int) -> list[float]:
+    """앞 dimensions차원만 남기고 다시 정규화"""
+    truncated = np.asarray(embedding[:dimensions], dtype=np.float32)
+    norm = np.linalg.norm(truncated)
+    return (truncated / norm if norm > 0 else truncated).tolist()
 
-        cursor.execute(
-            """
-            SELECT company_name, category, insurance_name, insurance_type, sales_date, index_title, file_path, chapter_title, article_title, article_content, page_number
-            FROM embedding_article
-            WHERE id = %s
-            """,
-            (document_id,),
-        )
-        [company_name, category, insurance_name, insurance_type, sales_date, index_title, file_path, chapter_title, article_title, article_content, page_number] = cursor.fetchone()
 
-        bulk_item = {
-            "_index": "insurance_article",
+def generate_documents(cursor: psycopg2.extensions.cursor, index_name: str, with_768: bool):
+    for row in cursor:
+        document_id, *values, embedding = row
+        source = dict(zip(ARTICLE_FIELDS, values))
+        if embedding is not None:
+            source["embedding"] = embedding
+            if with_768:
+                source["embedding_768"] = truncate_embedding(embedding, MATRYOSHKA_DIMS)
+        yield {
+            "_index": index_name,
             "_id": document_id,
-            "_source": {
-                "company_name": company_name,
-                "category": category,
-                "insurance_name": insurance_name,
-                "insurance_type": insurance_type,
-                "sales_date": sales_date,
-                "index_title": index_title,
-                "file_path": file_path,
-                "chapter_title": chapter_title,
-                "article_title": article_title,
-                "article_content": article_content,
-                "page_number": page_number,
-            },
+            "_source": source,
         }
-        print(bulk_item)
-        print("--------------------------------")
 
-        if index % 100 == 0:
-            time.sleep(1)
 
-        yield bulk_item
+def generate_deletes(document_ids: list[int], index_name: str):
+    for document_id in document_ids:
+        yield {"_op_type": "delete", "_index": index_name, "_id": document_id}
+
+
+def run_bulk(elasticsearch_client: Elasticsearch, actions, args, total: int) -> tuple[int, int]:
+    """(성공 수, 실패 수)"""
+    start = time.time()
+    succeeded, failed = 0, 0
+    for ok, item in parallel_bulk(
+        elasticsearch_client,
+        actions,
+        thread_count=args.threads,
+        chunk_size=args.chunk_size,
+        max_chunk_bytes=args.max_chunk_bytes,
+        raise_on_error=False,
+    ):
+        # 이미 ES에 없는 문서의 삭제는 성공으로 본다.
+        if ok or item.get("delete", {}).get("status") == 404:
+            succeeded += 1
+        else:
+            failed += 1
+            print("Failed:", item)
+        done = succeeded + failed
+        if done % args.report_every == 0:
+            print(f"{done}/{total} docs ({done / (time.time() - start):.1f} docs/s)")
+    return succeeded, failed
+
+
+def index_articles(postgres_connection, elasticsearch_client: Elasticsearch, index_name: str, args, since=None) -> tuple[int, int]:
+    """since 이후 변경된 조문(없으면 전체)을 색인"""
+    condition, params = ("WHERE updated_at > %s", (since,)) if since is not None else ("", ())
+    with postgres_connection.cursor() as cursor:
+        cursor.execute(f"SELECT count(*) FROM embedding_article {condition}", params)
+        total = cursor.fetchone()[0]
+    if total == 0:
+        return 0, 0
+
+    # named cursor는 서버 쪽에서 itersize개씩 나눠 보내므로 전체 결과를 메모리에 올리지 않는다.
+    with postgres_connection.cursor(name="migration_db_to_elasticsearch") as cursor:
+        cursor.itersize = args.itersize
+        cursor.execute(f"""
+            SELECT id, {', '.join(ARTICLE_FIELDS)}, embedding::real[]
+            FROM embedding_article
+            {condition}
+            ORDER BY id
+        """, params)
+        return run_bulk(elasticsearch_client, generate_documents(cursor, index_name, not args.skip_768), args, total)
+
+
+def get_database_time(postgres_connection):
+    """동기화 기준 시각 (DB 시계 기준이어야 updated_at과 비교할 수 있다)"""
+    with postgres_connection.cursor() as cursor:
+        cursor.execute("SELECT now()")
+        return cursor.fetchone()[0]
 
 
-def index_company_cases(document_ids):
-    if len(document_ids) == 0:
-        return
+def get_checkpoint(postgres_connection, alias: str):
+    with postgres_connection.cursor() as cursor:
+        cursor.execute("SELECT synced_at FROM es_sync_state WHERE index_name = %s", (alias,))
+        row = cursor.fetchone()
+    return row[0] if row else None
 
-    elasticsearch_client = Elasticsearch(
-        "https://" + ES_HOST + ":" + str(ES_PORT),
-        ca_certs="~/Desktop/ai_insurance_bot/scripts/http_ca.crt",
-        basic_auth=(ES_USERNAME, ES_PASSWORD),
-        http_compress=True,
-        request_timeout=60,
-        max_retries=10,
-        retry_on_timeout=True,
+
+def save_checkpoint(postgres_connection, alias: str, synced_at):
+    with postgres_connection.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO es_sync_state (index_name, synced_at) VALUES (%s, %s) "
+            "ON CONFLICT (index_name) DO UPDATE SET synced_at = EXCLUDED.synced_at",
+            (alias, synced_at),
+        )
+        # 오래된 삭제 기록은 정리한다. (checkpoint보다 충분히 이전)
+        cursor.execute("DELETE FROM embedding_article_deleted WHERE deleted_at < %s - interval '7 days'", (synced_at,))
+    postgres_connection.commit()
+
+
+def swap_alias(elasticsearch_client: Elasticsearch, alias: str, new_index: str, keep_old: bool):
+    """alias가 가리키는 인덱스를 한 번의 요청으로 new_index로 바꾼다."""
+    actions = [{"add": {"index": new_index, "alias": alias}}]
+    old_indices = []
+    if elasticsearch_client.indices.exists_alias(name=alias):
+        old_indices = [index for index in elasticsearch_client.indices.get_alias(name=alias) if index != new_index]
+        actions += [{"remove": {"index": index, "alias": alias}} for index in old_indices]
+    elif elasticsearch_client.indices.exists(index=alias):
+        # alias 도입 전에 같은 이름으로 만든 실제 인덱스는 alias 추가와 같은 요청에서 삭제해야 한다.
+        actions.append({"remove_index": {"index": alias}})
+    elasticsearch_client.indices.update_aliases(actions=actions)
+    print(f"alias {alias} -> {new_index}")
+    if not keep_old:
+        for index in old_indices:
+            elasticsearch_client.indices.delete(index=index)
+            print(f"deleted {index}")
+
+
+def rebuild(postgres_connection, elasticsearch_client: Elasticsearch, args):
+    new_index = f"{args.index}_{time.strftime('%Y%m%d%H%M%S')}"
+    # insurance* 인덱스 템플릿(elasticsearch_template.http)의 매핑이 적용된다.
+    # 적재 중에는 세그먼트 refresh를 하지 않는다.
+    elasticsearch_client.indices.create(index=new_index, settings={"index": {"refresh_interval": "-1"}})
+    # 적재 중에 바뀐 행은 다음 증분 동기화에서 다시 색인한다.
+    synced_at = get_database_time(postgres_connection)
+
+    start = time.time()
+    try:
+        indexed, failed = index_articles(postgres_connection, elasticsearch_client, new_index, args)
+        postgres_connection.rollback()
+        if failed:
+            raise RuntimeError(f"{failed}건 색인 실패, alias를 바꾸지 않습니다.")
+        # None이면 기본값(1s)으로 되돌린다.
+        elasticsearch_client.indices.put_settings(index=new_index, settings={"index": {"refresh_interval": None}})
+        elasticsearch_client.indices.refresh(index=new_index)
+    except Exception:
+        elasticsearch_client.indices.delete(index=new_index)
+        raise
+    elapsed = time.time() - start
+    print(f"Indexed {indexed} docs into {new_index} in {elapsed:.1f}s ({indexed / max(elapsed, 1e-9):.1f} docs/s)")
+
+    swap_alias(elasticsearch_client, args.index, new_index, args.keep_old)
+    save_checkpoint(postgres_connection, args.index, synced_at)
+
+
+def incremental(postgres_connection, elasticsearch_client: Elasticsearch, args):
+    checkpoint = get_checkpoint(postgres_connection, args.index)
+    if checkpoint is None:
+        raise SystemExit(f"{args.index}의 동기화 기록이 없습니다. --mode rebuild로 먼저 전체 색인하세요.")
+    synced_at = get_database_time(postgres_connection)
+    # checkpoint 직전에 시작해 늦게 커밋된 트랜잭션도 포함되도록 overlap만큼 겹쳐서 다시 읽는다. (색인은 멱등)
+    since = checkpoint - args.overlap
+
+    start = time.time()
+    indexed, failed = index_articles(postgres_connection, elasticsearch_client, args.index, args, since=since)
+
+    with postgres_connection.cursor() as cursor:
+        cursor.execute("SELECT id FROM embedding_article_deleted WHERE deleted_at > %s", (since,))
+        deleted_ids = [document_id for [document_id] in cursor.fetchall()]
+    postgres_connection.rollback()
+    deleted, delete_failed = run_bulk(elasticsearch_client, generate_deletes(deleted_ids, args.index), args, len(deleted_ids))
+    failed += delete_failed
+
+    # 새 상품이 바로 검색되도록 refresh 한다.
+    elasticsearch_client.indices.refresh(index=args.index)
+    elapsed = time.time() - start
+    print(f"Synced {indexed} changed / {deleted} deleted docs in {elapsed:.1f}s (failed {failed})")
+    if failed:
+        raise SystemExit("실패한 문서가 있어 동기화 시각을 저장하지 않습니다. 다시 실행하세요.")
+    save_checkpoint(postgres_connection, args.index, synced_at)
+
+
+def main(args):
+    postgres_connection = psycopg2.connect(
+        dbname=POSTGRES_DB,
+        user=POSTGRES_USER,
+        password=POSTGRES_PASSWORD,
+        host=POSTGRES_HOST
     )
+    try:
+        if args.setup:
+            with postgres_connection.cursor() as cursor:
+                cursor.execute(SETUP_SQL)
+            postgres_connection.commit()
+            print("Created updated_at column, triggers and es_sync_state")
+            return
 
-    bulk(elasticsearch_client, generate_documents(document_ids))
-    elasticsearch_client.indices.refresh(index="insurance_article")
+        elasticsearch_client = Elasticsearch(
+            "https://" + ES_HOST + ":" + str(ES_PORT),
+            ca_certs=ES_CA_CERT,
+            basic_auth=(ES_USERNAME, ES_PASSWORD),
+            http_compress=True,
+            request_timeout=120,
+            max_retries=10,
+            retry_on_timeout=True,
+        )
+        if args.mode == "rebuild":
+            rebuild(postgres_connection, elasticsearch_client, args)
+        else:
+            incremental(postgres_connection, elasticsearch_client, args)
+    finally:
+        postgres_connection.close()
 
 
-index_company_cases(document_ids);
\ No newline at end of file
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mode", choices=["incremental", "rebuild"], default="incremental")
+    parser.add_argument("--setup", action="store_true", help="증분 동기화에 필요한 컬럼 / 트리거 / 테이블 생성")
+    parser.add_argument("--index", default="insurance_article", help="검색에서 사용하는 alias 이름")
+    parser.add_argument("--keep-old", action="store_true", help="rebuild 후 이전 인덱스를 삭제하지 않음")
+    parser.add_argument("--overlap-seconds", type=int, default=60, help="증분 동기화 시 이전 동기화 시각과 겹쳐 읽을 시간")
+    parser.add_argument("--itersize", type=int, default=2000, help="server-side cursor가 한 번에 가져올 행 수")
+    # 3072차원 벡터가 포함된 문서는 JSON으로 60KB 안팎이므로 chunk 크기를 바이트로도 제한한다.
+    parser.add_argument("--chunk-size", type=int, default=200, help="bulk 요청당 문서 수")
+    parser.add_argument("--max-chunk-bytes", type=int, default=20 * 1024 * 1024, help="bulk 요청당 최대 바이트")
+    parser.add_argument("--threads", type=int, default=4, help="동시에 보낼 bulk 요청 수")
+    parser.add_argument("--report-every", type=int, default=1000)
+    parser.add_argument("--skip-768", action="store_true", help="embedding_768 필드를 채우지 않음")
+    args = parser.parse_args()
+    args.overlap = timedelta(seconds=args.overlap_seconds)
+    main(args)
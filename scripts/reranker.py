@@ -0,0 +1,183 @@
+from typing import List, Any, Optional
+import json
+import time
+import threading
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 한국어를 지원하는 다국어 cross-encoder (MiniLM 12층, CPU에서도 20문서 기준 수백 ms 이내)
+DEFAULT_MODEL_NAME = "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1"
+# 약관 조문은 대부분 512 토큰보다 길어서 앞부분(제목 + 조문 도입부)만으로 점수를 매긴다.
+DEFAULT_MAX_LENGTH = 512
+# 한국어 WordPiece 토큰은 평균 2글자 안팎이므로 토큰화 전에 이 비율로 미리 잘라 토큰화 비용을 줄인다.
+CHARS_PER_TOKEN = 2
+
+
+def document_text(doc: Any) -> str:
+    """
+    재정렬 점수 계산에 사용할 문서 텍스트를 만듭니다.
+
+    지원 형식:
+        - SearchResult.to_json() 딕셔너리 (title.main / sub / sub_sub, content)
+        - Flask 백엔드의 한글 키 딕셔너리 (약관명, 조문제목, 조문내용) 또는 그 JSON 문자열
+        - SearchResult 객체
+    """
+    if isinstance(doc, str):
+        try:
+            parsed = json.loads(doc)
+        except ValueError:
+            return doc
+        return document_text(parsed) if isinstance(parsed, dict) else doc
+    if isinstance(doc, dict):
+        if "조문내용" in doc:
+            return " ".join([
+                doc.get("보험상품명", ""),
+                doc.get("약관명", ""),
+                doc.get("조문제목", ""),
+                doc.get("조문내용", ""),
+            ])
+        title = doc.get("title", {})
+        return " ".join([
+            title.get("main", ""),
+            title.get("sub", ""),
+            title.get("sub_sub", ""),
+            doc.get("content", ""),
+        ])
+    if hasattr(doc, "content"):
+        return f"{doc.index_title} {doc.chapter_title} {doc.article_title} {doc.content}"
+    return str(doc)
+
+
+class Reranker:
+    """
+    Cross-Encoder 재정렬기
+    - (질문, 문서) 쌍을 길이순으로 정렬해 batch_size 단위로 predict 한다. (배치 내 padding 최소화)
+    - backend="onnx"이면 ONNX Runtime으로 추론하고, onnx_file로 int8 양자화 모델을 지정할 수 있다.
+    - 모델은 처음 사용할 때 로드하며, 서버 시작 시 warmup()으로 미리 로드할 수 있다.
+    """
+
+    def __init__(
+        self,
+        model_name: str = DEFAULT_MODEL_NAME,
+        backend: str = "torch",
+        onnx_file: Optional[str] = None,
+        max_length: int = DEFAULT_MAX_LENGTH,
+        batch_size: int = 16,
+    ):
+        """
+        Reranker 초기화
+
+        Args:
+            model_name: 사용할 Cross-Encoder 모델 이름
+            backend: torch 또는 onnx (onnx는 sentence-transformers>=4.1, optimum[onnxruntime] 필요)
+            onnx_file: 모델 저장소 안의 ONNX 파일 경로 (예: onnx/model_qint8_avx512_vnni.onnx)
+            max_length: (질문 + 문서) 최대 토큰 수, 넘는 부분은 잘라낸다.
+            batch_size: predict 배치 크기
+        """
+        self.model_name = model_name
+        self.backend = backend
+        self.onnx_file = onnx_file
+        self.max_length = max_length
+        self.batch_size = batch_size
+        self.max_chars = max_length * CHARS_PER_TOKEN
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = self._load_model()
+        return self._model
+
+    def _load_model(self):
+        from sentence_transformers import CrossEncoder
+
+        kwargs = {"max_length": self.max_length}
+        if self.backend != "torch":
+            kwargs["backend"] = self.backend
+            if self.onnx_file:
+                kwargs["model_kwargs"] = {"file_name": self.onnx_file}
+        start = time.perf_counter()
+        model = CrossEncoder(self.model_name, **kwargs)
+        logger.info(
+            "Loaded reranker model %s (backend=%s, file=%s) in %.2fs",
+            self.model_name, self.backend, self.onnx_file, time.perf_counter() - start
+        )
+        return model
+
+    def warmup(self) -> float:
+        """
+        모델을 로드하고 최대 길이 배치로 한 번 추론해 첫 요청의 지연을 없앱니다.
+
+        Returns:
+            warmup에 걸린 시간(초)
+        """
+        start = time.perf_counter()
+        pairs = [("보험금 지급 사유", "보험금 " * self.max_length)] * self.batch_size
+        self.model.predict(pairs, batch_size=self.batch_size, show_progress_bar=False)
+        elapsed = time.perf_counter() - start
+        logger.info("Reranker warmup finished in %.2fs", elapsed)
+        return elapsed
+
+    def score(self, query: str, documents: List[Any]) -> np.ndarray:
+        """
+        문서별 관련도 점수를 입력 순서대로 반환합니다.
+        """
+        texts = [document_text(doc)[:self.max_chars] for doc in documents]
+        # 비슷한 길이끼리 묶이도록 정렬해서 배치마다 padding 길이를 줄인다.
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        pairs = [(query, texts[i]) for i in order]
+        sorted_scores = self.model.predict(pairs, batch_size=self.batch_size, show_progress_bar=False)
+        scores = np.empty(len(texts), dtype=np.float32)
+        scores[order] = sorted_scores
+        return scores
+
+    def rerank(
+        self,
+        query: str,
+        documents: List[Any],
+        top_k: int = 5
+    ) -> List[Any]:
+        """
+        검색 결과를 재정렬합니다.
+
+        Args:
+            query: 사용자 쿼리
+            documents: 재정렬할 문서 리스트 (document_text가 지원하는 형식)
+            top_k: 반환할 상위 문서 수
+
+        Returns:
+            재정렬된 문서 리스트 (원본 문서 형식 유지)
+        """
+        if not documents:
+            return []
+
+        try:
+            scores = self.score(query, documents)
+        except Exception as e:
+            logger.error(f"Error during reranking: {e}")
+            return documents[:top_k]  # 에러 발생 시 원본 순서 반환
+
+        # 점수가 같으면 원래 검색 순서를 유지한다.
+        order = np.argsort(-scores, kind="stable")[:top_k]
+        return [documents[i] for i in order]
+
+
+def export_onnx_int8(model_name: str, output_dir: str, quantization_config: str = "avx512_vnni") -> str:
+    """
+    모델을 ONNX로 변환하고 동적 int8 양자화해서 output_dir에 저장합니다.
+
+    Returns:
+        Reranker(onnx_file=...)에 넘길 ONNX 파일 경로
+    """
+    from sentence_transformers import CrossEncoder, export_dynamic_quantized_onnx_model
+
+    model = CrossEncoder(model_name, backend="onnx")
+    model.save_pretrained(output_dir)
+    export_dynamic_quantized_onnx_model(model, quantization_config, output_dir)
+    return f"onnx/model_qint8_{quantization_config}.onnx"
+
@@ -0,0 +1,32 @@
+from article_dedup import normalize_content, get_text_hash, NearDuplicateIndex
+
+ARTICLE = (
+    "회사는 계약자가 청약을 한 날부터 15일 이내에 청약을 철회할 수 있으며, "
+    "청약을 철회한 경우 회사는 청약의 철회를 접수한 날부터 3영업일 이내에 납입한 보험료를 돌려드립니다."
+)
+
+
+def test_exact_hash_folds_whitespace_case_and_width():
+    variant = "  회사는 계약자가​ 청약을 한 날부터  15일 이내에\n청약을 철회할 수 있으며, " + ARTICLE.split(", ", 1)[1]
+    assert normalize_content("ＡＢＣ\t Def﻿") == "abc def"
+    assert get_text_hash(variant) == get_text_hash(ARTICLE)
+    assert get_text_hash(ARTICLE.replace("15일", "30일")) != get_text_hash(ARTICLE)
+
+
+def test_near_duplicate_hit_and_miss():
+    index = NearDuplicateIndex()
+    index.add("canonical", index.signature(ARTICLE))
+    assert len(index) == 1
+
+    # 상품명만 덧붙인 조문은 같은 대표 조문으로 찾는다.
+    assert index.query(index.signature("[무배당 암보험] " + ARTICLE)) == "canonical"
+    unrelated = "보험금을 받는 자가 고의로 피보험자를 해친 경우에는 보험금을 지급하지 않습니다. 다만 그 보험수익자가 보험금의 일부 보험수익자인 경우에는 다른 보험수익자에 대한 보험금은 지급합니다."
+    assert index.query(index.signature(unrelated)) is None
+
+
+def test_short_articles_are_not_near_duplicates():
+    index = NearDuplicateIndex(min_length=50)
+    assert index.signature("제1조 목적") is None
+    assert index.query(None) is None
+    index.add("short", None)
+    assert len(index) == 0
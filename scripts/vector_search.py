@@ -0,0 +1,32 @@
+"""
+pgvector 검색 쿼리 (insurance_chat_backend/app/utils/vector_search.py와 동일)
+"""
+
+
+def build_vector_search_sql(mode: str, dims: int) -> str:
+    """
+    벡터 검색 쿼리 생성 (파라미터: embedding, candidates, top_n)
+
+    양자화 방식은 후보 검색 식과 같은 expression HNSW 인덱스가 있어야 순차 탐색을 피한다.
+    (HNSW는 vector 2000차원까지만 지원, 인덱스 생성은 scripts/create_vector_index.py)
+    """
+    columns = "company_name, category, insurance_name, insurance_type, sales_date, index_title, file_path, chapter_title, article_title, article_content, page_number"
+    if mode == "full":
+        return f"SELECT {columns} FROM embedding_article ORDER BY embedding <=> %(embedding)s::vector LIMIT %(top_n)s"
+
+    target = "embedding" if dims >= 3072 else f"subvector(embedding, 1, {dims})"
+    query_vector = "%(embedding)s::vector" if dims >= 3072 else f"subvector(%(embedding)s::vector, 1, {dims})"
+    if mode == "binary":
+        candidate_order = f"binary_quantize({target})::bit({dims}) <~> binary_quantize({query_vector})"
+    elif mode == "halfvec":
+        candidate_order = f"{target}::halfvec({dims}) <=> {query_vector}::halfvec({dims})"
+    else:
+        raise ValueError(f"지원하지 않는 벡터 검색 방식입니다: {mode}")
+
+    # 양자화 벡터로 후보를 찾은 뒤 원본 vector(3072)의 코사인 거리로 다시 정렬한다.
+    return f"""
+        SELECT {columns} FROM (
+            SELECT * FROM embedding_article ORDER BY {candidate_order} LIMIT %(candidates)s
+        ) candidates
+        ORDER BY embedding <=> %(embedding)s::vector LIMIT %(top_n)s
+    """